@@ -0,0 +1,235 @@
+"""
+Benchmark suite for the tick, render and load paths of the levels.
+
+Generates random boards of several sizes and densities and measures, for every available engine:
+    - tick: generations per second of SandboxLevel.tick,
+    - render: seconds per SandboxLevel.draw_current call,
+    - load: seconds to load a level file of that size.
+
+Runs under the dummy SDL video driver, so no window is opened.
+
+Usage (from the repository root):
+    python -m benchmark.benchmark --output bench.json
+    python -m benchmark.benchmark --output bench.json --compare baseline.json
+"""
+
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import argparse
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+
+import pygame
+
+from src.engine.registry import available_engines, get_engine
+from src.level.pricey_level import PriceyLevel
+import src.constant.constant as const
+
+
+DEFAULT_SIZES = [10, 64, 256, 1024, 2048]
+DEFAULT_DENSITIES = [0.05, 0.25, 0.5]
+DEFAULT_BUDGET = 1.0
+DEFAULT_TOLERANCE = 0.1
+DEFAULT_SEED = 0
+
+# Whether a bigger value of the metric is better
+HIGHER_IS_BETTER = {
+    'tick': True,
+    'render': False,
+    'load': False,
+}
+
+ASSETS_DIR_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets', 'level')
+
+
+def generate_state(size: int, density: float, seed: int) -> list[int]:
+    """
+    Generates a random square board.
+    :param size: int, the number of rows and columns of the board.
+    :param density: float, the probability of a cell being alive.
+    :param seed: int, the seed of the random number generator.
+    :return: list[int], the generated state.
+    """
+
+    rng = random.Random(seed)
+    return [1 if rng.random() < density else 0 for _ in range(size * size)]
+
+
+def write_level_file(path: str, size: int, state: list[int]) -> None:
+    """
+    Writes the given state as a pricey level file, so that loading it parses the whole board.
+    :param path: str, the path of the level file.
+    :param size: int, the number of rows and columns of the board.
+    :param state: list[int], the state of the board.
+    :return: None
+    """
+
+    rows = [' '.join(map(str, state[row * size:(row + 1) * size])) for row in range(size)]
+    with open(path, 'w') as file:
+        file.write('0\n')
+        file.write(f'{size} {size}\n')
+        file.write('\n'.join(rows))
+        file.write('\n\n')
+        file.write('\n'.join(rows))
+        file.write('\n')
+
+
+def measure(func: callable, budget: float) -> tuple[float, int]:
+    """
+    Calls the given function repeatedly until the time budget is spent. The function is called at least once.
+    :param func: callable, the function to measure.
+    :param budget: float, the time budget in seconds.
+    :return: tuple[float, int], the total elapsed time in seconds and the number of calls.
+    """
+
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while calls == 0 or elapsed < budget:
+        func()
+        calls += 1
+        elapsed = time.perf_counter() - start
+    return elapsed, calls
+
+
+def run_benchmarks(sizes: list[int], densities: list[float], engines: list[str],
+                   budget: float, seed: int) -> dict[str, float]:
+    """
+    Runs the benchmarks for every combination of size, density and engine.
+    :param sizes: list[int], the board sizes.
+    :param densities: list[float], the board densities.
+    :param engines: list[str], the names of the engines to measure.
+    :param budget: float, the time budget of a single measurement in seconds.
+    :param seed: int, the seed used to generate the boards.
+    :return: dict[str, float], the results, keyed by case name.
+    """
+
+    level_width = int(const.WIDTH * const.LEVEL_TO_WINDOW_WIDTH_RATIO)
+    level_height = int(const.HEIGHT * const.LEVEL_TO_WINDOW_HEIGHT_RATIO)
+    window = pygame.display.set_mode((const.WIDTH, const.HEIGHT))
+
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size in sizes:
+            for density in densities:
+                board = f'{size}x{size}/d{density}'
+                state = generate_state(size, density, seed)
+                level_file_path = os.path.join(temp_dir, f'pricey_bench_{size}_{density}.txt')
+                write_level_file(level_file_path, size, state)
+
+                def load() -> None:
+                    PriceyLevel(0, 0, level_width, level_height, level_file_path, ASSETS_DIR_PATH, window)
+
+                elapsed, calls = measure(load, budget)
+                results[f'load/{board}'] = elapsed / calls
+                report(f'load/{board}', elapsed / calls)
+
+                level = PriceyLevel(0, 0, level_width, level_height, level_file_path, ASSETS_DIR_PATH, window)
+
+                elapsed, calls = measure(level.draw_current, budget)
+                results[f'render/{board}'] = elapsed / calls
+                report(f'render/{board}', elapsed / calls)
+
+                for engine_name in engines:
+                    level.engine = get_engine(engine_name)
+                    level.reset()
+
+                    elapsed, calls = measure(level.tick, budget)
+                    results[f'tick/{engine_name}/{board}'] = calls / elapsed
+                    report(f'tick/{engine_name}/{board}', calls / elapsed)
+
+    return results
+
+
+def report(case: str, value: float) -> None:
+    """
+    Prints the result of a single case.
+    :param case: str, the name of the case.
+    :param value: float, the measured value.
+    :return: None
+    """
+
+    unit = 'gen/s' if HIGHER_IS_BETTER[case.split('/')[0]] else 's'
+    print(f'{case:<40} {value:>14.6f} {unit}', flush=True)
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], tolerance: float) -> list[str]:
+    """
+    Compares the results against a baseline and prints the relative change of every common case.
+    :param results: dict[str, float], the current results.
+    :param baseline: dict[str, float], the baseline results.
+    :param tolerance: float, the relative slowdown above which a case counts as a regression.
+    :return: list[str], the names of the regressed cases.
+    """
+
+    regressions = []
+    print(f'\n{"case":<40} {"baseline":>14} {"current":>14} {"speedup":>9}')
+    for case, value in results.items():
+        if case not in baseline:
+            continue
+
+        # Express every metric as a speedup, so that bigger is always better
+        if HIGHER_IS_BETTER[case.split('/')[0]]:
+            speedup = value / baseline[case]
+        else:
+            speedup = baseline[case] / value
+
+        flag = ''
+        if speedup < 1 - tolerance:
+            regressions.append(case)
+            flag = '  REGRESSION'
+        print(f'{case:<40} {baseline[case]:>14.6f} {value:>14.6f} {speedup:>8.2f}x{flag}')
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmarks the tick, render and load paths of the levels.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='the number of rows and columns of the generated boards')
+    parser.add_argument('--densities', type=float, nargs='+', default=DEFAULT_DENSITIES,
+                        help='the densities of the generated boards')
+    parser.add_argument('--engines', nargs='+', default=None,
+                        help='the engines to measure (default: all available engines)')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET,
+                        help='the time budget of a single measurement in seconds')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help='the seed used to generate the boards')
+    parser.add_argument('--output', help='the JSON file to write the results to')
+    parser.add_argument('--compare', help='a JSON file with baseline results to compare against')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='the relative slowdown above which a case counts as a regression')
+    args = parser.parse_args()
+
+    pygame.init()
+    engines = args.engines if args.engines is not None else available_engines()
+    results = run_benchmarks(args.sizes, args.densities, engines, args.budget, args.seed)
+    pygame.quit()
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({
+                'meta': {
+                    'python': platform.python_version(),
+                    'pygame': pygame.version.ver,
+                    'platform': platform.platform(),
+                    'engines': engines,
+                    'budget': args.budget,
+                    'seed': args.seed,
+                },
+                'results': results,
+            }, file, indent=4)
+
+    if args.compare:
+        with open(args.compare, 'r') as file:
+            baseline = json.load(file)['results']
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,4 @@
+import argparse
 import os
 
 from src.start import start
@@ -10,4 +11,8 @@ ASSETS_DIR_PATH = os.path.join(os.path.dirname(__file__), 'assets')
 # TODO: Add a level list below the buttons.
 
 if __name__ == '__main__':
-    start(DATA_DIR_PATH, ASSETS_DIR_PATH)
+    parser = argparse.ArgumentParser(description="Conway's Game of Life.")
+    parser.add_argument('--record-input', metavar='PATH', help='the file to log the input to, to replay it later')
+    args = parser.parse_args()
+
+    start(DATA_DIR_PATH, ASSETS_DIR_PATH, args.record_input)
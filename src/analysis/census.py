@@ -0,0 +1,332 @@
+from typing import Optional
+
+from src.engine.cell_buffer import CellBuffer
+from src.engine.python_engine import PythonEngine
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Shapes are tuples of the sorted (row, column) pairs of their cells, with the top-left of the bounding box at (0, 0)
+Shape = tuple[tuple[int, int], ...]
+
+# Common objects, in one of their phases. The other phases and orientations are found when the census is created.
+KNOWN_OBJECTS = {
+    'block': ['OO',
+              'OO'],
+    'beehive': ['.OO.',
+                'O..O',
+                '.OO.'],
+    'loaf': ['.OO.',
+             'O..O',
+             '.O.O',
+             '..O.'],
+    'boat': ['OO.',
+             'O.O',
+             '.O.'],
+    'ship': ['OO.',
+             'O.O',
+             '.OO'],
+    'tub': ['.O.',
+            'O.O',
+            '.O.'],
+    'pond': ['.OO.',
+             'O..O',
+             'O..O',
+             '.OO.'],
+    'barge': ['.O..',
+              'O.O.',
+              '.O.O',
+              '..O.'],
+    'long boat': ['OO..',
+                  'O.O.',
+                  '.O.O',
+                  '..O.'],
+    'bi-block': ['OO.OO',
+                 'OO.OO'],
+    'blinker': ['OOO'],
+    'toad': ['.OOO',
+             'OOO.'],
+    'beacon': ['OO..',
+               'OO..',
+               '..OO',
+               '..OO'],
+    'glider': ['.O.',
+               '..O',
+               'OOO'],
+    'lightweight spaceship': ['.O..O',
+                              'O....',
+                              'O...O',
+                              'OOOO.'],
+}
+
+
+class ObjectType:
+    """
+    Class for the type of an object found by the census.
+    """
+
+    STILL_LIFE = 'still life'
+    OSCILLATOR = 'oscillator'
+    SPACESHIP = 'spaceship'
+    UNSTABLE = 'unstable'
+
+    def __init__(self, name: str, kind: str, period: int) -> None:
+        """
+        :param name: str, the name of the object.
+        :param kind: str, STILL_LIFE, OSCILLATOR, SPACESHIP or UNSTABLE.
+        :param period: int, the number of generations after which the object repeats, or None if it is unstable.
+        """
+
+        self.name = name
+        self.kind = kind
+        self.period = period
+
+
+class Census:
+    """
+    Class for an object census.
+    Splits a state into objects and classifies them as still lifes, oscillators and spaceships.
+
+    Objects are groups of alive cells that are at most 2 cells apart, so the phases of objects like the toad,
+    whose cells do not all touch, stay whole. The grouping is a vectorized connected-component labelling
+    when NumPy is installed, and a flood fill otherwise.
+
+    Every object is looked up by its shape in a table. On a miss, the shape is canonicalized under rotation
+    and reflection and looked up among the known objects, or classified by simulating it on its own.
+    The result is stored under the shape, so each shape is classified once and a census of a stable board
+    is mostly table lookups.
+    """
+
+    # The distance, in cells, up to which alive cells belong to the same object
+    RADIUS = 2
+
+    def __init__(self, max_period: int, max_cells: int) -> None:
+        """
+        :param max_period: int, the longest period an object is simulated for before it counts as unstable.
+        :param max_cells: int, the number of cells above which an object is not classified.
+        """
+
+        self.max_period = max_period
+        self.max_cells = max_cells
+        self.engine = PythonEngine()
+
+        # Every shape seen so far, and the canonical shapes of the known objects
+        self.table: dict[Shape, ObjectType] = {}
+        self.known: dict[Shape, str] = {}
+
+        for name, rows in KNOWN_OBJECTS.items():
+            shape = normalize([(row, col) for row, line in enumerate(rows)
+                               for col, char in enumerate(line) if char == 'O'])
+            phases, _ = self.get_phases(shape)
+            for phase in phases:
+                self.known[canonicalize(phase)] = name
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def count(self, state: CellBuffer, nr_rows: int, nr_cols: int) -> dict[str, int]:
+        """
+        Counts the objects of a state by name.
+        :param state: CellBuffer, the state.
+        :param nr_rows: int, the number of rows of the state.
+        :param nr_cols: int, the number of columns of the state.
+        :return: dict[str, int], the number of objects of every name, the most common first.
+        """
+
+        counts = {}
+        for shape in self.get_objects(state, nr_rows, nr_cols):
+            name = self.classify(shape).name
+            counts[name] = counts.get(name, 0) + 1
+        return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+    def classify(self, shape: Shape) -> ObjectType:
+        """
+        Returns the type of an object. Objects with more than max_cells cells are not classified.
+        :param shape: Shape, the normalized shape of the object.
+        :return: ObjectType, the type of the object.
+        """
+
+        object_type = self.table.get(shape)
+        if object_type is not None:
+            return object_type
+
+        # Big objects are usually still evolving, and would fill the table with shapes that never come back
+        if len(shape) > self.max_cells:
+            return ObjectType(f'unclassified ({len(shape)} cells)', ObjectType.UNSTABLE, None)
+
+        kind, period = self.simulate(shape)
+        name = self.known.get(canonicalize(shape))
+        if name is None:
+            cells = '1 cell' if len(shape) == 1 else f'{len(shape)} cells'
+            if kind == ObjectType.UNSTABLE:
+                name = f'unstable ({cells})'
+            elif kind == ObjectType.STILL_LIFE:
+                name = f'still life ({cells})'
+            else:
+                name = f'p{period} {kind} ({cells})'
+
+        object_type = ObjectType(name, kind, period)
+        self.table[shape] = object_type
+        return object_type
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def get_objects(self, state: CellBuffer, nr_rows: int, nr_cols: int) -> list[Shape]:
+        """
+        Splits a state into objects.
+        :param state: CellBuffer, the state.
+        :param nr_rows: int, the number of rows of the state.
+        :param nr_cols: int, the number of columns of the state.
+        :return: list[Shape], the normalized shapes of the objects.
+        """
+
+        if np is not None:
+            return self.get_objects_array(np.asarray(state).reshape(nr_rows, nr_cols))
+
+        objects = []
+        radius = self.RADIUS
+        seen = set()
+        for cell_index, cell_state in enumerate(state):
+            if cell_state != 1 or cell_index in seen:
+                continue
+
+            # Flood fill the cells that are at most RADIUS cells apart
+            seen.add(cell_index)
+            cells, stack = [], [divmod(cell_index, nr_cols)]
+            while stack:
+                row, col = stack.pop()
+                cells.append((row, col))
+                for neighbor_row in range(max(row - radius, 0), min(row + radius + 1, nr_rows)):
+                    for neighbor_col in range(max(col - radius, 0), min(col + radius + 1, nr_cols)):
+                        neighbor = neighbor_row * nr_cols + neighbor_col
+                        if state[neighbor] == 1 and neighbor not in seen:
+                            seen.add(neighbor)
+                            stack.append((neighbor_row, neighbor_col))
+            objects.append(normalize(cells))
+        return objects
+
+    def get_objects_array(self, board: 'np.ndarray') -> list[Shape]:
+        """
+        Splits a board into objects with a vectorized connected-component labelling.
+        Every alive cell starts labelled with its own index. Each round, a cell takes the smallest label within
+        RADIUS cells, then the label of the cell its label points to, until no label changes.
+        :param board: np.ndarray, the board, of shape (nr_rows, nr_cols). Only the cells equal to 1 are alive.
+        :return: list[Shape], the normalized shapes of the objects.
+        """
+
+        nr_rows, nr_cols = board.shape
+        size = nr_rows * nr_cols
+        alive = board.ravel() == 1
+        alive_indices = np.flatnonzero(alive)
+        if len(alive_indices) == 0:
+            return []
+
+        radius = self.RADIUS
+        labels = np.where(alive, np.arange(size), size).reshape(nr_rows, nr_cols)
+        while True:
+            # The minimum over a square is the minimum over its rows of the minimum over its columns
+            padded = np.pad(labels, radius, constant_values=size)
+            row_min = padded[:, :nr_cols].copy()
+            for offset in range(1, 2 * radius + 1):
+                np.minimum(row_min, padded[:, offset:offset + nr_cols], out=row_min)
+            block_min = row_min[:nr_rows].copy()
+            for offset in range(1, 2 * radius + 1):
+                np.minimum(block_min, row_min[offset:offset + nr_rows], out=block_min)
+
+            next_labels = np.where(alive, block_min.ravel(), size)
+            next_labels[alive_indices] = next_labels[next_labels[alive_indices]]
+            next_labels = next_labels.reshape(nr_rows, nr_cols)
+            if np.array_equal(next_labels, labels):
+                break
+            labels = next_labels
+
+        # Group the alive cells by label
+        cell_labels = labels.ravel()[alive_indices]
+        order = np.argsort(cell_labels, kind='stable')
+        sorted_indices = alive_indices[order]
+        bounds = np.flatnonzero(np.diff(cell_labels[order])) + 1
+
+        objects = []
+        for group in np.split(sorted_indices, bounds):
+            rows, cols = np.divmod(group, nr_cols)
+            rows -= rows.min()
+            cols -= cols.min()
+            objects.append(tuple(sorted(zip(rows.tolist(), cols.tolist()))))
+        return objects
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def simulate(self, shape: Shape) -> tuple[str, int]:
+        """
+        Simulates an object on its own until its shape repeats.
+        :param shape: Shape, the normalized shape of the object.
+        :return: tuple[str, int], the kind of the object and its period, or None if it is unstable.
+        """
+
+        phases, displacement = self.get_phases(shape)
+        if displacement is None:
+            return ObjectType.UNSTABLE, None
+
+        period = len(phases)
+        if displacement != (0, 0):
+            return ObjectType.SPACESHIP, period
+        if period == 1:
+            return ObjectType.STILL_LIFE, period
+        return ObjectType.OSCILLATOR, period
+
+    def get_phases(self, shape: Shape) -> tuple[list[Shape], Optional[tuple[int, int]]]:
+        """
+        Simulates an object on its own, in a board big enough for it to move max_period cells in any direction.
+        :param shape: Shape, the normalized shape of the object.
+        :return: tuple[list[Shape], tuple[int, int]], the shapes of the object until it repeats, and the rows and
+                 columns it moved by in that time, or None if it does not repeat within max_period generations.
+        """
+
+        margin = self.max_period + 2
+        nr_rows = max(row for row, _ in shape) + 1 + 2 * margin
+        nr_cols = max(col for _, col in shape) + 1 + 2 * margin
+
+        state = CellBuffer(nr_rows * nr_cols)
+        for row, col in shape:
+            state[(row + margin) * nr_cols + col + margin] = 1
+
+        phases = [shape]
+        for _ in range(self.max_period):
+            state, _ = self.engine.step(state, nr_rows, nr_cols)
+            cells = [divmod(cell_index, nr_cols) for cell_index, cell_state in enumerate(state) if cell_state == 1]
+            if not cells:
+                return phases, None
+
+            next_shape = normalize(cells)
+            if next_shape == shape:
+                top = min(row for row, _ in cells) - margin
+                left = min(col for _, col in cells) - margin
+                return phases, (top, left)
+            phases.append(next_shape)
+        return phases, None
+
+
+def normalize(cells: list[tuple[int, int]]) -> Shape:
+    """
+    Moves the cells so that the top-left of their bounding box is at (0, 0), and sorts them.
+    :param cells: list[tuple[int, int]], the (row, column) pairs of the cells.
+    :return: Shape, the normalized shape.
+    """
+
+    top = min(row for row, _ in cells)
+    left = min(col for _, col in cells)
+    return tuple(sorted((row - top, col - left) for row, col in cells))
+
+
+def canonicalize(shape: Shape) -> Shape:
+    """
+    Returns the same shape for all the rotations and reflections of a shape: the smallest of the eight.
+    :param shape: Shape, the normalized shape.
+    :return: Shape, the canonical shape.
+    """
+
+    return min(normalize([(sign_row * row, sign_col * col) if not swap else (sign_col * col, sign_row * row)
+                          for row, col in shape])
+               for swap in (False, True) for sign_row in (1, -1) for sign_col in (1, -1))
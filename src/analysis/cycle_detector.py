@@ -0,0 +1,166 @@
+import random
+from collections import deque
+
+from src.level.level_observer import LevelObserver
+
+
+class ZobristKeys(dict):
+    """
+    Class for the random 64-bit keys of the cells, drawn the first time a cell is looked up,
+    so that only the cells that were alive at some point take memory.
+    """
+
+    def __init__(self, seed: int) -> None:
+        """
+        :param seed: int, the seed of the random number generator.
+        """
+
+        super().__init__()
+        self.rng = random.Random(seed)
+
+    def __missing__(self, cell_index: int) -> int:
+        key = self[cell_index] = self.rng.getrandbits(64)
+        return key
+
+
+class CycleDetector(LevelObserver):
+    """
+    Class for a cycle detector.
+    Detects still lifes and oscillators of a period up to max_period while a level is ticking.
+
+    Keeps a Zobrist hash of the level's state: the XOR of a random 64-bit key for every alive cell.
+    A tick updates the hash with the keys of the changed cells only, and the hashes of the last max_period
+    generations are kept in a hash-to-generation table. Seeing a hash again means the state repeats.
+    """
+
+    ZOBRIST_SEED = 0x5EED
+
+    def __init__(self, max_period: int) -> None:
+        """
+        :param max_period: int, the longest period that can be detected.
+        """
+
+        self.max_period = max_period
+
+        self.nr_cells = None
+        self.keys = ZobristKeys(self.ZOBRIST_SEED)
+        self.hash = 0
+        self.table: dict[int, int] = {}
+        self.history: deque[int] = deque()
+
+        # Set once a cycle is detected
+        self.period = None
+        self.cycle_start = None
+        self.died_out = False
+
+        # The states and changed cells of one period after the detection, used to replay the cycle
+        self.detection_generation = None
+        self.cycle: list[tuple[list[int], list[int]]] = []
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def on_reset(self, level) -> None:
+        """
+        Recomputes the hash of the level's state and forgets the previous generations.
+        :param level: Level, the observed level.
+        :return: None
+        """
+
+        if self.nr_cells != len(level.current_state):
+            self.nr_cells = len(level.current_state)
+            self.keys = ZobristKeys(self.ZOBRIST_SEED)
+
+        self.hash = 0
+        for cell_index in level.get_alive_cells():
+            self.hash ^= self.keys[cell_index]
+        self.clear(level.generation)
+
+    def on_toggle(self, level, cell_indices: list[int]) -> None:
+        """
+        Updates the hash with the toggled cells. The previous generations no longer lead to the current state.
+        :param level: Level, the observed level.
+        :param cell_indices: list[int], the indices of the toggled cells.
+        :return: None
+        """
+
+        for cell_index in cell_indices:
+            self.hash ^= self.keys[cell_index]
+        self.clear(level.generation)
+
+    def on_tick(self, level, changed: list[int]) -> None:
+        """
+        Updates the hash with the changed cells and looks it up in the table of the previous generations.
+        :param level: Level, the observed level.
+        :param changed: list[int], the indices of the cells that changed.
+        :return: None
+        """
+
+        for cell_index in changed:
+            self.hash ^= self.keys[cell_index]
+
+        # Record one period of the cycle, so it can be replayed afterwards, unless the board is too big to copy
+        if self.period is not None:
+            if level.in_memory and len(self.cycle) < self.period:
+                self.cycle.append((level.current_state.copy(), changed))
+            return
+
+        if self.hash in self.table:
+            self.cycle_start = self.table[self.hash]
+            self.period = level.generation - self.cycle_start
+            self.died_out = self.period == 1 and next(level.get_alive_cells(), None) is None
+            self.detection_generation = level.generation
+            return
+
+        self.table[self.hash] = level.generation
+        self.history.append(self.hash)
+        if len(self.history) > self.max_period:
+            del self.table[self.history.popleft()]
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def clear(self, generation: int) -> None:
+        """
+        Forgets the previous generations and the detected cycle.
+        :param generation: int, the generation of the current state.
+        :return: None
+        """
+
+        self.table = {self.hash: generation}
+        self.history = deque([self.hash])
+
+        self.period = None
+        self.cycle_start = None
+        self.died_out = False
+        self.detection_generation = None
+        self.cycle = []
+
+    def can_replay(self) -> bool:
+        """
+        Checks if a whole period of the detected cycle was recorded.
+        :return: bool, True if the next generations can be replayed instead of computed.
+        """
+
+        return self.period is not None and len(self.cycle) == self.period
+
+    def replay(self, level) -> None:
+        """
+        Advances the level to its next generation using the recorded cycle instead of the level's engine.
+        :param level: Level, the observed level.
+        :return: None
+        """
+
+        next_state, changed = self.cycle[(level.generation - self.detection_generation) % self.period]
+        level.next_state[:] = next_state
+        level.advance_to(level.next_state, changed)
+
+    def describe(self) -> str:
+        """
+        Describes the detected cycle.
+        :return: str, the description of the detected cycle.
+        """
+
+        if self.died_out:
+            return f'Died out at generation {self.cycle_start}.'
+        if self.period == 1:
+            return f'Still life from generation {self.cycle_start}.'
+        return f'Period {self.period} oscillator from generation {self.cycle_start}.'
@@ -0,0 +1,122 @@
+from src.engine.cell_buffer import CellBuffer
+from src.level.level_observer import LevelObserver
+
+
+class GoalTracker(LevelObserver):
+    """
+    Class for a goal tracker.
+    Detects when a level's current state reaches its desired state.
+
+    Keeps a running count of the cells that do not match the desired state. Ticks and toggles update it
+    with the changed cells only, so the goal is checked after every generation, not only the rendered ones.
+    The listeners are notified once each time the count drops to zero, whether by a tick, a toggle or a
+    reset to a state that already matches. Cells with a desired state of -1 can have any state.
+    """
+
+    def __init__(self) -> None:
+        self.desired_state: list[int] = []
+        self.has_goal = False
+        self.nr_mismatches = 0
+
+        self.solved_generation = None
+        self.listeners: list[callable] = []
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def on_reset(self, level) -> None:
+        """
+        Counts the mismatched cells of the level's state and notifies the listeners if it already reaches the goal.
+        :param level: Level, the observed level.
+        :return: None
+        """
+
+        self.desired_state = level.desired_state
+        self.has_goal = any(cell_state != -1 for cell_state in self.desired_state)
+        self.nr_mismatches = 0
+        if self.has_goal:
+            self.nr_mismatches = sum(1 for cell_state, desired_cell_state
+                                     in zip(level.current_state, self.desired_state)
+                                     if desired_cell_state != -1 and cell_state != desired_cell_state)
+        self.solved_generation = None
+        self.check(level)
+
+    def on_toggle(self, level, cell_indices: list[int]) -> None:
+        """
+        Updates the mismatch count with the toggled cells and notifies the listeners if the goal was reached.
+        :param level: Level, the observed level.
+        :param cell_indices: list[int], the indices of the toggled cells.
+        :return: None
+        """
+
+        if not self.has_goal:
+            return
+
+        current_state = level.current_state
+        for cell_index in cell_indices:
+            self.update(current_state, cell_index)
+        self.check(level)
+
+    def on_tick(self, level, changed: list[int]) -> None:
+        """
+        Updates the mismatch count with the changed cells and notifies the listeners if the goal was reached.
+        :param level: Level, the observed level.
+        :param changed: list[int], the indices of the cells that changed.
+        :return: None
+        """
+
+        if not self.has_goal:
+            return
+
+        current_state = level.current_state
+        for cell_index in changed:
+            self.update(current_state, cell_index)
+        self.check(level)
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def check(self, level) -> None:
+        """
+        Notifies the listeners if the goal was just reached, and forgets the generation it was reached at
+        once the state no longer matches, so reaching it again is reported again.
+        :param level: Level, the observed level.
+        :return: None
+        """
+
+        if not self.has_goal:
+            return
+
+        if self.nr_mismatches > 0:
+            self.solved_generation = None
+            return
+        if self.solved_generation is not None:
+            return
+
+        self.solved_generation = level.generation
+        for listener in self.listeners:
+            listener(level.generation)
+
+    def update(self, current_state: CellBuffer, cell_index: int) -> None:
+        """
+        Updates the mismatch count with a cell that was just flipped.
+        :param current_state: CellBuffer, the current state of the level.
+        :param cell_index: int, the index of the flipped cell.
+        :return: None
+        """
+
+        desired_cell_state = self.desired_state[cell_index]
+        if desired_cell_state == -1:
+            return
+
+        # The cell matched before the flip if and only if it does not match now
+        if current_state[cell_index] == desired_cell_state:
+            self.nr_mismatches -= 1
+        else:
+            self.nr_mismatches += 1
+
+    def is_solved(self) -> bool:
+        """
+        Checks if the current state matches the desired state.
+        :return: bool, True if the level has a goal and the current state reaches it.
+        """
+
+        return self.has_goal and self.nr_mismatches == 0
@@ -0,0 +1,151 @@
+from src.level.level_observer import LevelObserver
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class Heatmap(LevelObserver):
+    """
+    Class for a heatmap of the age and activity of the cells of a level. Requires NumPy, and a level that computes
+    every generation into a separate buffer, so that the previous state is still there when it ticks.
+
+    Generations are grouped in windows of window_size generations, and every cell has two one-byte counters:
+    its age, the number of windows since it last changed, up to 255, and its activity, which halves at the end of
+    every window and goes up by 128 if the cell changed during it. A tick only marks the cells that changed, one by
+    one from their indices when few changed, or with two element-wise NumPy operations over the whole board when
+    many did; the counters are updated once per window. The element-wise operations run between byte arrays only,
+    which NumPy runs with SIMD instructions, except for the halving.
+    """
+
+    MODES = ['activity', 'age']
+
+    # A tick marks the changed cells from their indices if there are at most SPARSE_MIN_CELLS of them, plus one
+    # for every SPARSE_RATIO cells of the board, about where the operations over the whole board get faster
+    SPARSE_MIN_CELLS = 64
+    SPARSE_RATIO = 512
+
+    def __init__(self, mode: str, window_size: int, max_age: int, palette: list[tuple[int, int, int]]) -> None:
+        """
+        :param mode: str, the values shown, 'activity' or 'age'.
+        :param window_size: int, the number of generations in a window.
+        :param max_age: int, the age in generations from which alive cells are shown in the last color of the palette.
+        :param palette: list[tuple[int, int, int]], the colors the values go through, from 0 to 255.
+        :raises: ValueError if the mode is unknown or NumPy is not installed.
+        """
+
+        if mode not in self.MODES:
+            raise ValueError(f'Unknown heatmap mode {mode!r}, expected one of {", ".join(self.MODES)}.')
+        if np is None:
+            raise ValueError('The heatmap requires NumPy.')
+
+        self.mode = mode
+        self.window_size = window_size
+        self.max_age = max(1, min(max_age // window_size, 255))
+
+        # The color of every value, interpolated between the colors of the palette
+        stops = np.array(palette, dtype=np.float64)
+        positions = np.linspace(0, 255, len(stops))
+        self.colors = np.stack([np.interp(np.arange(256), positions, stops[:, channel]) for channel in range(3)],
+                               axis=1).astype(np.uint8)
+
+        self.nr_rows, self.nr_cols = 0, 0
+        self.age = np.zeros(0, dtype=np.uint8)
+        self.activity = np.zeros(0, dtype=np.uint8)
+        # Whether every cell changed during the current window
+        self.changed = np.zeros(0, dtype=np.uint8)
+
+        # A scratch array, and an array of ones, as NumPy is much slower on an array and a scalar than on two arrays
+        self.ones = np.zeros(0, dtype=np.uint8)
+        self.scratch = np.zeros(0, dtype=np.uint8)
+        self.max_sparse_cells = self.SPARSE_MIN_CELLS
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def on_reset(self, level) -> None:
+        """
+        Starts the age of every cell from 0, with no activity.
+        :param level: Level, the observed level.
+        :return: None
+        """
+
+        if (level.nr_rows, level.nr_cols) != (self.nr_rows, self.nr_cols):
+            self.nr_rows, self.nr_cols = level.nr_rows, level.nr_cols
+            nr_cells = self.nr_rows * self.nr_cols
+            self.age, self.activity, self.changed = (np.zeros(nr_cells, dtype=np.uint8) for _ in range(3))
+            self.ones = np.ones(nr_cells, dtype=np.uint8)
+            self.scratch = np.empty(nr_cells, dtype=np.uint8)
+            self.max_sparse_cells = self.SPARSE_MIN_CELLS + nr_cells // self.SPARSE_RATIO
+
+        self.age.fill(0)
+        self.activity.fill(0)
+        self.changed.fill(0)
+
+    def on_toggle(self, level, cell_indices: list[int]) -> None:
+        """
+        Restarts the age of the toggled cells. Edits are not activity.
+        :param level: Level, the observed level.
+        :param cell_indices: list[int], the indices of the toggled cells.
+        :return: None
+        """
+
+        self.age[cell_indices] = 0
+
+    def on_tick(self, level, changed: list[int]) -> None:
+        """
+        Marks the cells that changed, and updates the counters at the end of a window.
+        Few changed cells are marked from their indices. Many are found by comparing the level's state with
+        the previous one, which is faster than writing them one by one.
+        :param level: Level, the observed level.
+        :param changed: list[int], the indices of the cells that changed.
+        :return: None
+        """
+
+        if len(changed) <= self.max_sparse_cells:
+            self.changed[changed] = 1
+        else:
+            difference = np.bitwise_xor(np.frombuffer(level.current_state, dtype=np.uint8),
+                                        np.frombuffer(level.next_state, dtype=np.uint8), out=self.scratch)
+            np.bitwise_or(self.changed, difference, out=self.changed)
+
+        if level.generation % self.window_size == 0:
+            self.end_window()
+
+    def end_window(self) -> None:
+        """
+        Updates the counters at the end of a window and starts the next one.
+        :return: None
+        """
+
+        # The age goes up, staying at 255 once there, and goes back to 0 where the cell changed
+        incremented = np.add(self.age, self.ones, out=self.scratch)
+        np.maximum(self.age, incremented, out=self.age)
+        np.bitwise_and(self.age, np.subtract(self.changed, self.ones, out=self.scratch), out=self.age)
+
+        np.right_shift(self.activity, 1, out=self.activity)
+        np.bitwise_or(self.activity, np.left_shift(self.changed, 7, out=self.scratch), out=self.activity)
+        self.changed.fill(0)
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def get_values(self, state, first_row: int, first_col: int, end_row: int, end_col: int) -> 'np.ndarray':
+        """
+        Returns the values of the shown mode for a part of the board, from 0 to 255: the activity of every cell,
+        or the age of the alive cells from 1 to 255, dead cells and those that changed in the current window being 0.
+        :param state: CellBuffer, the current state of the level.
+        :param first_row: int, the first row of the part.
+        :param first_col: int, the first column of the part.
+        :param end_row: int, the row after the last one of the part.
+        :param end_col: int, the column after the last one of the part.
+        :return: np.ndarray, the values of the part, one per cell, as an array of rows.
+        """
+
+        rows, cols = slice(first_row, end_row), slice(first_col, end_col)
+        if self.mode == 'activity':
+            return self.activity.reshape(self.nr_rows, self.nr_cols)[rows, cols]
+
+        alive = np.frombuffer(state, dtype=np.uint8).reshape(self.nr_rows, self.nr_cols)[rows, cols]
+        changed = self.changed.reshape(self.nr_rows, self.nr_cols)[rows, cols]
+        age = np.minimum(self.age.reshape(self.nr_rows, self.nr_cols)[rows, cols], self.max_age).astype(np.int32)
+        return np.where((alive != 0) & (changed == 0), 1 + age * 254 // self.max_age, 0).astype(np.uint8)
@@ -0,0 +1,216 @@
+from typing import Iterator, Optional
+
+from src.level.level_observer import LevelObserver
+
+
+class GenerationStats:
+    """
+    Class for the population statistics of a generation.
+    """
+
+    COLUMNS = ['generation', 'population', 'births', 'deaths', 'min_row', 'min_col', 'max_row', 'max_col']
+
+    def __init__(self, generation: int, population: int, births: int, deaths: int,
+                 bounding_box: Optional[tuple[int, int, int, int]]) -> None:
+        """
+        :param generation: int, the generation.
+        :param population: int, the number of alive cells.
+        :param births: int, the number of cells born since the previous generation.
+        :param deaths: int, the number of cells that died since the previous generation.
+        :param bounding_box: tuple[int, int, int, int], the first row, first column, last row and last column
+                             with alive cells, or None if there are none.
+        """
+
+        self.generation = generation
+        self.population = population
+        self.births, self.deaths = births, deaths
+        self.bounding_box = bounding_box
+
+    def as_row(self) -> list[int]:
+        """
+        Returns the statistics in the order of COLUMNS. An empty bounding box is written as -1s.
+        :return: list[int], the statistics.
+        """
+
+        return [self.generation, self.population, self.births, self.deaths, *(self.bounding_box or (-1,) * 4)]
+
+
+class PopulationTracker(LevelObserver):
+    """
+    Class for a population tracker.
+    Keeps the population, births, deaths and bounding box of a level up to date as it ticks.
+
+    The engines already return the cells that changed in a tick, so the statistics are folded in from those
+    cells only, without another pass over the board. The bounding box comes from the number of alive cells
+    of every row and column: a birth can only grow it, and a death can only shrink it from an edge whose
+    count dropped to 0.
+    """
+
+    def __init__(self) -> None:
+        self.nr_rows, self.nr_cols = 0, 0
+        self.row_counts: list[int] = []
+        self.col_counts: list[int] = []
+
+        self.population = 0
+        self.births, self.deaths = 0, 0
+        self.min_row, self.min_col, self.max_row, self.max_col = 0, 0, -1, -1
+
+        # Called with the statistics of every generation
+        self.listeners: list[callable] = []
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def on_reset(self, level) -> None:
+        """
+        Counts the alive cells of the level's state by row and column.
+        :param level: Level, the observed level.
+        :return: None
+        """
+
+        self.nr_rows, self.nr_cols = level.nr_rows, level.nr_cols
+        self.row_counts = [0] * self.nr_rows
+        self.col_counts = [0] * self.nr_cols
+        self.population = 0
+        self.min_row, self.min_col, self.max_row, self.max_col = self.nr_rows, self.nr_cols, -1, -1
+
+        for cell_index in level.get_alive_cells():
+            self.add(cell_index)
+
+        self.births, self.deaths = 0, 0
+        self.notify(level.generation)
+
+    def on_toggle(self, level, cell_indices: list[int]) -> None:
+        """
+        Updates the counts with the toggled cells. Edits are not births or deaths.
+        :param level: Level, the observed level.
+        :param cell_indices: list[int], the indices of the toggled cells.
+        :return: None
+        """
+
+        current_state = level.current_state
+        for cell_index in cell_indices:
+            if current_state[cell_index] == 1:
+                self.add(cell_index)
+            else:
+                self.remove(cell_index)
+        self.shrink()
+
+    def on_tick(self, level, changed: list[int]) -> None:
+        """
+        Updates the counts with the changed cells and notifies the listeners.
+        :param level: Level, the observed level.
+        :param changed: list[int], the indices of the cells that changed.
+        :return: None
+        """
+
+        current_state = level.current_state
+        births = 0
+        for cell_index in changed:
+            if current_state[cell_index] == 1:
+                self.add(cell_index)
+                births += 1
+            else:
+                self.remove(cell_index)
+        self.shrink()
+
+        self.births, self.deaths = births, len(changed) - births
+        self.notify(level.generation)
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def add(self, cell_index: int) -> None:
+        """
+        Counts a cell that became alive, growing the bounding box if needed.
+        :param cell_index: int, the index of the cell.
+        :return: None
+        """
+
+        row, col = divmod(cell_index, self.nr_cols)
+        self.row_counts[row] += 1
+        self.col_counts[col] += 1
+        self.population += 1
+
+        if row < self.min_row:
+            self.min_row = row
+        if row > self.max_row:
+            self.max_row = row
+        if col < self.min_col:
+            self.min_col = col
+        if col > self.max_col:
+            self.max_col = col
+
+    def remove(self, cell_index: int) -> None:
+        """
+        Uncounts a cell that died. The bounding box is shrunk afterwards, by shrink.
+        :param cell_index: int, the index of the cell.
+        :return: None
+        """
+
+        row, col = divmod(cell_index, self.nr_cols)
+        self.row_counts[row] -= 1
+        self.col_counts[col] -= 1
+        self.population -= 1
+
+    def shrink(self) -> None:
+        """
+        Moves the edges of the bounding box inwards past the rows and columns without alive cells.
+        :return: None
+        """
+
+        if self.population == 0:
+            self.min_row, self.min_col, self.max_row, self.max_col = self.nr_rows, self.nr_cols, -1, -1
+            return
+
+        row_counts, col_counts = self.row_counts, self.col_counts
+        while row_counts[self.min_row] == 0:
+            self.min_row += 1
+        while row_counts[self.max_row] == 0:
+            self.max_row -= 1
+        while col_counts[self.min_col] == 0:
+            self.min_col += 1
+        while col_counts[self.max_col] == 0:
+            self.max_col -= 1
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def get_stats(self, generation: int) -> GenerationStats:
+        """
+        Returns the current statistics.
+        :param generation: int, the generation of the level.
+        :return: GenerationStats, the statistics.
+        """
+
+        bounding_box = None
+        if self.population > 0:
+            bounding_box = (self.min_row, self.min_col, self.max_row, self.max_col)
+        return GenerationStats(generation, self.population, self.births, self.deaths, bounding_box)
+
+    def notify(self, generation: int) -> None:
+        """
+        Sends the current statistics to the listeners.
+        :param generation: int, the generation of the level.
+        :return: None
+        """
+
+        if self.listeners:
+            stats = self.get_stats(generation)
+            for listener in self.listeners:
+                listener(stats)
+
+    def follow(self, level, generations: int) -> Iterator[GenerationStats]:
+        """
+        Ticks a level and yields its statistics, starting with the current generation.
+        The tracker is added to the level's observers while the generator runs.
+        :param level: Level, the level to tick.
+        :param generations: int, the number of generations to tick.
+        :return: Iterator[GenerationStats], the statistics of every generation.
+        """
+
+        level.add_observer(self)
+        try:
+            yield self.get_stats(level.generation)
+            for _ in range(generations):
+                level.tick()
+                yield self.get_stats(level.generation)
+        finally:
+            level.remove_observer(self)
@@ -0,0 +1,113 @@
+import csv
+import os
+
+from src.analysis.population_tracker import GenerationStats
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class StatsLog:
+    """
+    Class for an append-only log of population statistics.
+    Buffers the statistics by column and writes them out every buffer_size generations, either as rows of a
+    CSV file or as numbered NumPy .npy chunks, one structured array per chunk, in a directory.
+    """
+
+    FORMATS = ['csv', 'npy']
+
+    def __init__(self, path: str, log_format: str, buffer_size: int) -> None:
+        """
+        :param path: str, the path of the CSV file or of the directory of the .npy chunks.
+        :param log_format: str, 'csv' or 'npy'.
+        :param buffer_size: int, the number of generations buffered before they are written, or 0 to only write them
+                            when the log is flushed.
+        :raises: ValueError if the format is unknown, or is 'npy' and NumPy is not installed.
+        """
+
+        if log_format not in self.FORMATS:
+            raise ValueError(f'Unknown log format {log_format!r}, expected one of {", ".join(self.FORMATS)}.')
+        if log_format == 'npy' and np is None:
+            raise ValueError('The npy log format requires NumPy.')
+
+        self.path = path
+        self.log_format = log_format
+        self.buffer_size = buffer_size
+
+        self.columns: dict[str, list[int]] = {column: [] for column in GenerationStats.COLUMNS}
+        self.nr_buffered = 0
+        self.nr_rows = 0
+        self.nr_chunks = 0
+
+        if log_format == 'csv':
+            with open(path, 'w', newline='') as file:
+                csv.writer(file).writerow(GenerationStats.COLUMNS)
+        else:
+            os.makedirs(path, exist_ok=True)
+
+    def append(self, stats: GenerationStats) -> None:
+        """
+        Adds the statistics of a generation, writing the buffer out when it is full.
+        :param stats: GenerationStats, the statistics.
+        :return: None
+        """
+
+        for values, value in zip(self.columns.values(), stats.as_row()):
+            values.append(value)
+        self.nr_buffered += 1
+
+        if 0 < self.buffer_size <= self.nr_buffered:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes the buffered statistics out and empties the buffer.
+        :return: None
+        """
+
+        self.write(self.take_buffer())
+
+    def take_buffer(self) -> dict[str, list[int]]:
+        """
+        Empties the buffer, handing its statistics over to the caller.
+        :return: dict[str, list[int]], the buffered statistics by column.
+        """
+
+        columns = self.columns
+        self.columns = {column: [] for column in GenerationStats.COLUMNS}
+        self.nr_buffered = 0
+        return columns
+
+    def write(self, columns: dict[str, list[int]]) -> None:
+        """
+        Writes statistics taken from the buffer out. Can run in another thread than the one appending,
+        as long as the writes of a log do not run at the same time.
+        :param columns: dict[str, list[int]], the statistics by column, as returned by take_buffer().
+        :return: None
+        """
+
+        nr_rows = len(columns[GenerationStats.COLUMNS[0]])
+        if nr_rows == 0:
+            return
+
+        if self.log_format == 'csv':
+            with open(self.path, 'a', newline='') as file:
+                csv.writer(file).writerows(zip(*columns.values()))
+        else:
+            chunk = np.empty(nr_rows, dtype=[(column, np.int64) for column in columns])
+            for column, values in columns.items():
+                chunk[column] = values
+            np.save(os.path.join(self.path, f'chunk_{self.nr_chunks:06d}.npy'), chunk)
+            self.nr_chunks += 1
+
+        self.nr_rows += nr_rows
+
+    def close(self) -> None:
+        """
+        Writes the remaining statistics out.
+        :return: None
+        """
+
+        self.flush()
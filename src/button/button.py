@@ -20,10 +20,12 @@ class Button(ABC):
 
         self.x, self.y = x, y
         self.width, self.height = width, height
+        self.rect = pygame.Rect(x, y, width, height)
         self.func = func
         self.window = window
 
         self.image = None
+        self.hovered = False
 
         self.load_assets()
 
@@ -36,6 +38,22 @@ class Button(ABC):
 
         pass
 
+    def on_enter(self) -> None:
+        """
+        Called when the mouse enters the button.
+        :return: None
+        """
+
+        self.hovered = True
+
+    def on_leave(self) -> None:
+        """
+        Called when the mouse leaves the button.
+        :return: None
+        """
+
+        self.hovered = False
+
     def click(self) -> None:
         """
         Calls the button's function and plays the click animation.
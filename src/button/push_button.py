@@ -20,7 +20,6 @@ class PushButton(Button):
         :param window: pygame.Surface, the surface to draw the button on.
         """
 
-        self.hovered = False
         self.image_hover = None
         self.image_click = None
 
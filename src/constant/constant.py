@@ -2,16 +2,142 @@
 A module containing the constants used in the game.
 """
 
+import src.constant.color as color
+
 WIDTH, HEIGHT = 1200, 788
 FPS = 60
+
+# In event-driven mode, the idle game blocks on events for at most IDLE_WAIT_TIMEOUT milliseconds at a time
+EVENT_DRIVEN = True
+IDLE_WAIT_TIMEOUT = 250
+
+# Periodic jobs, such as autosaving, run between frames and delay a frame by at most FRAME_JOB_BUDGET milliseconds;
+# the jobs that take longer, or have not run yet, wait until the game is idle. Their slow parts run on JOB_WORKERS
+# threads, and while one runs, the idle game wakes up every JOB_REPORT_INTERVAL milliseconds to report it
+FRAME_JOB_BUDGET = 4
+JOB_WORKERS = 2
+JOB_REPORT_INTERVAL = 50
+
 TITLE = 'Game of Life'
 
 BUTTON_FONT = 'comicsansms'
 BUTTON_FONT_SIZE = 30
 INFO_PANEL_FONT = 'comicsansms'
 INFO_PANEL_FONT_SIZE = 30
+OVERLAY_FONT = 'consolas'
+OVERLAY_FONT_SIZE = 18
+
+HIT_TEST_BUCKET_SIZE = 64
 
 LEVEL_TO_WINDOW_WIDTH_RATIO = 0.8
 LEVEL_TO_WINDOW_HEIGHT_RATIO = 0.94
 
 LEVELS = ['sandbox_learning_the_game.txt', 'pricey_level_1.txt']
+
+
+# 'auto' steps every board with the engine that was fastest for its shape and density on this machine
+ENGINE = 'auto'
+
+# The auto engine measures the available engines on a board for AUTO_ENGINE_BUDGET seconds and at least
+# AUTO_ENGINE_MIN_STEPS steps each, on a sample of at most AUTO_ENGINE_SAMPLE_CELLS cells, and stores the fastest
+# one for the board's shape and density bucket. The density is checked every AUTO_ENGINE_CHECK_INTERVAL steps.
+# Boards are calibrated in a background thread, and stepped with AUTO_ENGINE_DEFAULT until then.
+AUTO_ENGINE_CALIBRATION_FILE = 'calibration.json'
+AUTO_ENGINE_DEFAULT = 'numpy'
+AUTO_ENGINE_DENSITY_BUCKETS = [0.01, 0.05, 0.15, 0.35]
+AUTO_ENGINE_CHECK_INTERVAL = 64
+AUTO_ENGINE_SAMPLE_CELLS = 65536
+AUTO_ENGINE_BUDGET = 0.02
+AUTO_ENGINE_MIN_STEPS = 3
+
+PROFILER_CAPACITY = 600
+PROFILER_PHASES = ['events', 'advance', 'panel', 'level', 'buttons', 'overlay', 'display']
+OVERLAY_REFRESH_FRAMES = 15
+PROFILE_DUMP_FILE = 'profile_{timestamp}.csv'
+
+# The memory check of the headless runner repeats MEMORY_CHECK_CYCLES rounds of switching through every level and
+# advancing for MEMORY_CHECK_TICKS ticks, and flags growth of more than MEMORY_GROWTH_TOLERANCE bytes after the first
+# round, along with the MEMORY_TOP_SITES lines of code whose allocations grew the most
+MEMORY_TRACE_FRAMES = 5
+MEMORY_CHECK_CYCLES = 10
+MEMORY_CHECK_TICKS = 20
+MEMORY_GROWTH_TOLERANCE = 256 * 1024
+MEMORY_TOP_SITES = 5
+
+# What the game does when Advance reaches a still life or an oscillator: 'pause', 'report' or 'skip'
+CYCLE_MAX_PERIOD = 15
+CYCLE_ACTION = 'pause'
+
+# Objects of the census are simulated for up to CENSUS_MAX_PERIOD generations to classify them,
+# unless they have more than CENSUS_MAX_CELLS cells
+CENSUS_MAX_PERIOD = 15
+CENSUS_MAX_CELLS = 200
+CENSUS_SHOWN_OBJECTS = 4
+
+# The heatmap shows the activity of the cells, which halves every HEATMAP_WINDOW generations and goes up if a cell
+# changed during them, or the age of the alive cells, up to HEATMAP_MAX_AGE generations
+HEATMAP_WINDOW = 8
+HEATMAP_MAX_AGE = 100
+HEATMAP_PALETTE = [color.black, color.indigo, color.blue, color.lime, color.yellow, color.red]
+
+# Population statistics are logged as 'csv' rows or 'npy' chunks. Headless runs write them every STATS_BUFFER_SIZE
+# generations, and the game every STATS_FLUSH_INTERVAL seconds
+STATS_FORMAT = 'csv'
+STATS_FILE = 'stats_{timestamp}'
+STATS_BUFFER_SIZE = 256
+STATS_FLUSH_INTERVAL = 1
+
+# The session is saved every AUTOSAVE_INTERVAL seconds (0 to turn it off) and when the game quits,
+# and restored when the game starts if RESTORE_SESSION is set
+SESSION_FILE = 'session.gol'
+AUTOSAVE_INTERVAL = 60
+SESSION_COMPRESSION_LEVEL = 6
+RESTORE_SESSION = True
+
+# Tiled levels are split into tiles of TILE_SIZE rows and columns, up to TILE_CACHE_SIZE of which are kept in memory.
+# The tile file is created in TILE_DIR, or in the system's temporary directory if it is None.
+TILE_SIZE = 64
+TILE_CACHE_SIZE = 1024
+TILE_DIR = None
+
+# While the game waits for input, up to SPECULATION_DEPTH generations (0 to turn it off) are computed ahead
+# in the background, taking at most SPECULATION_MAX_BYTES of memory
+SPECULATION_DEPTH = 16
+SPECULATION_MAX_BYTES = 64 * 1024 * 1024
+
+SOLVER_MAX_GENERATIONS = 30
+SOLVER_WORKERS = None
+
+# The soup search runs squares of SOUP_SIZE cells, alive with probability SOUP_DENSITY, in the middle of a dead board
+# with SOUP_MARGIN cells around them, until their state repeats with a period up to SOUP_MAX_PERIOD or for at most
+# SOUP_MAX_GENERATIONS generations. Worker processes run SOUP_BATCH_SIZE soups per task.
+SOUP_SIZE = 16
+SOUP_DENSITY = 0.5
+SOUP_MARGIN = 24
+SOUP_MAX_PERIOD = 60
+SOUP_MAX_GENERATIONS = 5000
+SOUP_BATCH_SIZE = 16
+SOUP_RESULTS_FILE = 'soups.jsonl'
+SOUP_REPORT_INTERVAL = 5
+
+# The camera zooms by CAMERA_ZOOM_STEP per mouse wheel step, up to cells of CAMERA_MAX_CELL_SIZE pixels.
+# Cells smaller than LOD_CELL_SIZE pixels are drawn as one pixel per block of cells.
+CAMERA_ZOOM_STEP = 1.25
+CAMERA_MAX_CELL_SIZE = 128
+LOD_CELL_SIZE = 2
+
+# The number of edits, clicks or brush strokes, that can be undone with Ctrl+Z.
+HISTORY_MAX_ENTRIES = 100
+
+# Recording of runs: 'gif' for an animated GIF, 'ppm' for a directory of numbered frames.
+# A frame is recorded every EXPORT_STRIDE generations, with cells of EXPORT_CELL_SIZE pixels.
+EXPORT_FORMAT = 'gif'
+EXPORT_FILE = 'run_{timestamp}'
+EXPORT_STRIDE = 1
+EXPORT_CELL_SIZE = 8
+EXPORT_FRAME_DELAY = 20
+EXPORT_QUEUE_SIZE = 64
+# A recorder waiting on its encoder checks every EXPORT_POLL_INTERVAL seconds that it is still running, and
+# terminates it if it has not finished writing EXPORT_CLOSE_TIMEOUT seconds after the recording stopped
+EXPORT_POLL_INTERVAL = 0.5
+EXPORT_CLOSE_TIMEOUT = 30
@@ -0,0 +1,343 @@
+import bisect
+import concurrent.futures
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+from src.engine.boundary import DEAD
+from src.engine.cell_buffer import CellBuffer
+from src.engine.engine import Engine
+from src.engine.jit_engine import JitEngine
+from src.engine.numpy_engine import NumpyEngine
+from src.engine.python_engine import PythonEngine
+import src.constant.constant as const
+
+
+# The engines the auto engine chooses from, and the rule they all implement
+CANDIDATES: list[type[Engine]] = [PythonEngine, NumpyEngine, JitEngine]
+RULE = 'B3/S23'
+
+
+class Calibration:
+    """
+    Class for the calibration file of the auto engine: the fastest engine for every calibrated board,
+    keyed by the board's shape, density bucket and rule.
+
+    There is one calibration per file in a process, shared by all its auto engines through get_calibration(),
+    and guarded by a lock. Other processes may write the same file, so saving merges the file's winners
+    with this process' ones before replacing it.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: str, the path of the calibration file.
+        """
+
+        self.path = path
+        self.winners: dict[str, str] = {}
+        self.lock = threading.Lock()
+        self.winners.update(self.load())
+
+        # The calibrations running or waiting in the calibration thread, by key
+        self.pending: dict[str, concurrent.futures.Future] = {}
+
+    def load(self) -> dict[str, str]:
+        """
+        Reads the calibration file. A missing or broken file is an empty calibration.
+        :return: dict[str, str], the winners of the file.
+        """
+
+        try:
+            with open(self.path, 'r') as file:
+                winners = json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(winners, dict):
+            return {}
+        return {key: name for key, name in winners.items() if isinstance(name, str)}
+
+    def save(self) -> None:
+        """
+        Merges the winners of this process into the calibration file and writes it atomically, through a temporary
+        file of this process and thread that then replaces it. Must be called with the lock held.
+        :return: None
+        """
+
+        self.winners = {**self.load(), **self.winners}
+
+        temp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(temp_path, 'w') as file:
+                json.dump(self.winners, file, indent=4, sort_keys=True)
+            os.replace(temp_path, self.path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def get(self, key: str) -> str:
+        """
+        Returns the fastest engine calibrated for a board.
+        :param key: str, the key of the board.
+        :return: str, the name of the engine, or None if the board was not calibrated.
+        """
+
+        with self.lock:
+            return self.winners.get(key)
+
+    def set(self, key: str, name: str) -> None:
+        """
+        Stores the fastest engine for a board and saves the calibration.
+        :param key: str, the key of the board.
+        :param name: str, the name of the engine.
+        :return: None
+        """
+
+        with self.lock:
+            self.winners[key] = name
+            try:
+                self.save()
+            except OSError:
+                # The directory cannot be written to: the calibration still holds for this run, and is only
+                # measured again on the next one
+                pass
+
+    def request(self, key: str, sample: CellBuffer, nr_rows: int, nr_cols: int,
+                boundary: str) -> concurrent.futures.Future:
+        """
+        Calibrates a board in the calibration thread, unless it is already being calibrated. The calibrations
+        run one at a time, so they do not time their engines against each other.
+        :param key: str, the key of the board.
+        :param sample: CellBuffer, the sample of the board, as returned by get_sample().
+        :param nr_rows: int, the number of rows of the sample.
+        :param nr_cols: int, the number of columns of the sample.
+        :param boundary: str, the boundary mode of the board.
+        :return: concurrent.futures.Future, the future of the calibration, done once the board is calibrated.
+        """
+
+        with self.lock:
+            future = self.pending.get(key)
+            if future is None:
+                future = self.pending[key] = get_calibrator().submit(self.run, key, sample, nr_rows, nr_cols,
+                                                                     boundary)
+            return future
+
+    def run(self, key: str, sample: CellBuffer, nr_rows: int, nr_cols: int, boundary: str) -> None:
+        """
+        Calibrates a board and stores its fastest engine. Runs in the calibration thread.
+        :param key: str, the key of the board.
+        :param sample: CellBuffer, the sample of the board.
+        :param nr_rows: int, the number of rows of the sample.
+        :param nr_cols: int, the number of columns of the sample.
+        :param boundary: str, the boundary mode of the board.
+        :return: None
+        """
+
+        self.set(key, calibrate(sample, nr_rows, nr_cols, boundary))
+        with self.lock:
+            del self.pending[key]
+
+
+# The calibration of every calibration file, shared by the auto engines of the process, and the thread
+# the calibrations run in
+calibrations: dict[str, Calibration] = {}
+calibrations_lock = threading.Lock()
+calibrator: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+
+def get_calibration(path: str) -> Calibration:
+    """
+    Returns the calibration of a file, read the first time it is asked for.
+    :param path: str, the path of the calibration file.
+    :return: Calibration, the calibration shared by the auto engines of the process.
+    """
+
+    with calibrations_lock:
+        calibration = calibrations.get(os.path.abspath(path))
+        if calibration is None:
+            calibration = calibrations[os.path.abspath(path)] = Calibration(path)
+        return calibration
+
+
+def get_calibrator() -> concurrent.futures.ThreadPoolExecutor:
+    """
+    Returns the thread the calibrations run in, started the first time it is asked for.
+    :return: concurrent.futures.ThreadPoolExecutor, the calibration thread.
+    """
+
+    global calibrator
+    with calibrations_lock:
+        if calibrator is None:
+            calibrator = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix='calibration')
+        return calibrator
+
+
+def reset_after_fork() -> None:
+    """
+    Forgets the calibrations and the calibration thread in a forked process, such as a worker of a process pool,
+    where the thread does not exist and the locks may have been held by another thread of the parent.
+    :return: None
+    """
+
+    global calibrations, calibrations_lock, calibrator
+    calibrations, calibrations_lock, calibrator = {}, threading.Lock(), None
+
+
+os.register_at_fork(after_in_child=reset_after_fork)
+
+
+class AutoEngine(Engine):
+    """
+    Stepping engine that delegates to the fastest available engine for the board.
+
+    The first time a board of some shape, density bucket and rule is stepped, a sample of it is handed to the
+    calibration thread, which steps it with every available engine for a short time and stores the fastest one
+    in the calibration file. Until then, the board is stepped with the AUTO_ENGINE_DEFAULT engine, so the caller,
+    usually the frame, never waits for a calibration. Every AUTO_ENGINE_CHECK_INTERVAL steps the density of the
+    board is measured again, and a board that drifted to another bucket switches to the engine of that bucket,
+    or keeps its engine while that bucket is calibrated.
+    """
+
+    name = 'auto'
+
+    def __init__(self, path: str = const.AUTO_ENGINE_CALIBRATION_FILE) -> None:
+        """
+        :param path: str, the path of the calibration file.
+        """
+
+        self.calibration = get_calibration(path)
+        self.engines: dict[str, Engine] = {engine_class.name: engine_class()
+                                           for engine_class in CANDIDATES if engine_class.is_available()}
+        self.default = self.engines.get(const.AUTO_ENGINE_DEFAULT, self.engines[PythonEngine.name])
+
+        self.key = None
+        self.selected: Engine = None
+        self.nr_steps = 0
+
+        # The calibration of the current key, while it runs
+        self.pending: Optional[concurrent.futures.Future] = None
+
+    @property
+    def releases_gil(self) -> bool:
+        return (self.selected or self.default).releases_gil
+
+    def step_into(self, state: CellBuffer, next_state: CellBuffer, nr_rows: int, nr_cols: int,
+                  boundary: str = DEAD) -> list[int]:
+        """
+        Computes the next generation of the given state into another buffer with the selected engine,
+        selecting it again first if the board changed shape or drifted to another density bucket,
+        or if the calibration of its bucket finished.
+        :param state: CellBuffer, the current state of the board.
+        :param next_state: CellBuffer, the buffer to write the next state of the board to.
+        :param nr_rows: int, the number of rows of the board.
+        :param nr_cols: int, the number of columns of the board.
+        :param boundary: str, the boundary mode of the board.
+        :return: list[int], the indices of the cells that changed.
+        """
+
+        if self.pending is not None and self.pending.done():
+            # A failed calibration leaves the board on its engine
+            self.pending = None
+            name = self.calibration.get(self.key)
+            if name in self.engines:
+                self.selected = self.engines[name]
+
+        if self.selected is None or self.nr_steps % const.AUTO_ENGINE_CHECK_INTERVAL == 0:
+            key = get_key(state, nr_rows, nr_cols)
+            if key != self.key:
+                self.select(key, state, nr_rows, nr_cols, boundary)
+        self.nr_steps += 1
+
+        return self.selected.step_into(state, next_state, nr_rows, nr_cols, boundary)
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def select(self, key: str, state: CellBuffer, nr_rows: int, nr_cols: int, boundary: str) -> None:
+        """
+        Selects the engine calibrated for a board. If it was not calibrated, or the calibrated engine is not
+        available anymore, a sample of the board is calibrated in the background, and the board keeps its engine,
+        or takes the default one, in the meantime.
+        :param key: str, the key of the board.
+        :param state: CellBuffer, the current state of the board.
+        :param nr_rows: int, the number of rows of the board.
+        :param nr_cols: int, the number of columns of the board.
+        :param boundary: str, the boundary mode of the board.
+        :return: None
+        """
+
+        self.key = key
+        self.pending = None
+
+        name = self.calibration.get(key)
+        if name in self.engines:
+            self.selected = self.engines[name]
+            return
+
+        if self.selected is None:
+            self.selected = self.default
+        sample, nr_sample_rows = get_sample(state, nr_rows, nr_cols)
+        self.pending = self.calibration.request(key, sample, nr_sample_rows, nr_cols, boundary)
+
+
+def get_sample(state: CellBuffer, nr_rows: int, nr_cols: int) -> tuple[CellBuffer, int]:
+    """
+    Copies the sample of a board that is calibrated: a band of whole rows from the middle of the board, of at most
+    AUTO_ENGINE_SAMPLE_CELLS cells, so that calibrating a huge board does not take a slow engine minutes.
+    :param state: CellBuffer, the current state of the board.
+    :param nr_rows: int, the number of rows of the board.
+    :param nr_cols: int, the number of columns of the board.
+    :return: tuple[CellBuffer, int], the sample and its number of rows.
+    """
+
+    nr_sample_rows = min(nr_rows, max(3, const.AUTO_ENGINE_SAMPLE_CELLS // nr_cols))
+    first_row = (nr_rows - nr_sample_rows) // 2
+    return CellBuffer(state[first_row * nr_cols:(first_row + nr_sample_rows) * nr_cols]), nr_sample_rows
+
+
+def calibrate(sample: CellBuffer, nr_rows: int, nr_cols: int, boundary: str) -> str:
+    """
+    Finds the fastest engine for a board by stepping a sample of it with every available engine for a short time.
+    The engines are created for the calibration, as those of the auto engines may be stepping at the same time.
+    :param sample: CellBuffer, the sample of the board.
+    :param nr_rows: int, the number of rows of the sample.
+    :param nr_cols: int, the number of columns of the sample.
+    :param boundary: str, the boundary mode of the board.
+    :return: str, the name of the fastest engine.
+    """
+
+    step_times = {}
+    for engine_class in CANDIDATES:
+        if not engine_class.is_available():
+            continue
+        engine = engine_class()
+        current, scratch = CellBuffer(sample), CellBuffer(len(sample))
+
+        # The first step loads the compiled kernels and allocates the buffers of the engines, so it is not timed
+        engine.step_into(current, scratch, nr_rows, nr_cols, boundary)
+
+        nr_steps, elapsed = 0, 0.0
+        start = time.perf_counter()
+        while nr_steps < const.AUTO_ENGINE_MIN_STEPS or elapsed < const.AUTO_ENGINE_BUDGET:
+            engine.step_into(current, scratch, nr_rows, nr_cols, boundary)
+            current, scratch = scratch, current
+            nr_steps += 1
+            elapsed = time.perf_counter() - start
+        step_times[engine_class.name] = elapsed / nr_steps
+
+    return min(step_times, key=step_times.get)
+
+
+def get_key(state: CellBuffer, nr_rows: int, nr_cols: int) -> str:
+    """
+    Returns the calibration key of a board: its shape, the bucket of its density and the rule.
+    :param state: CellBuffer, the state of the board.
+    :param nr_rows: int, the number of rows of the board.
+    :param nr_cols: int, the number of columns of the board.
+    :return: str, the key.
+    """
+
+    density = state.count(1) / max(len(state), 1)
+    bucket = bisect.bisect_left(const.AUTO_ENGINE_DENSITY_BUCKETS, density)
+    return f'{nr_rows}x{nr_cols}/d{bucket}/{RULE}'
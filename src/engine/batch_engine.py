@@ -0,0 +1,125 @@
+from src.engine.boundary import DEAD
+from src.engine.cell_buffer import CellBuffer
+from src.engine.numpy_engine import NumpyEngine
+from src.error import EngineError
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class BatchEngine:
+    """
+    Class for the batch engine.
+    Holds many boards of the same shape as one 3-D array and advances all of them with a single vectorized step.
+
+    A board stops once it dies out or, if a target is given, once it matches its target. The caller can also stop
+    boards itself, such as the ones a cycle detector saw repeat. Stopped boards keep their last state and are
+    left out of the following steps.
+    """
+
+    RUNNING, DIED, MATCHED, REPEATED = 0, 1, 2, 3
+
+    def __init__(self, states: list[CellBuffer], nr_rows: int, nr_cols: int,
+                 target: list = None, stop_on_death: bool = True, boundary: str = DEAD) -> None:
+        """
+        :param states: list[CellBuffer], the flat states of the boards, like Level.current_state.
+        :param nr_rows: int, the number of rows of every board.
+        :param nr_cols: int, the number of columns of every board.
+        :param target: list[int] or list[list[int]], the desired state shared by every board, or one desired
+                       state per board, like Level.desired_state. Cells of -1 can have any state.
+        :param stop_on_death: bool, whether a board stops once it has no alive cells.
+        :param boundary: str, the boundary mode of every board.
+        :raises: EngineError if NumPy is not installed.
+        """
+
+        if np is None:
+            raise EngineError('The batch engine requires NumPy!')
+
+        self.nr_rows, self.nr_cols = nr_rows, nr_cols
+        self.boards = np.array(states, dtype=np.uint8).reshape(-1, nr_rows, nr_cols)
+        self.nr_boards = len(self.boards)
+
+        self.target = None
+        if target is not None:
+            self.target = np.broadcast_to(np.array(target, dtype=np.int8).reshape(-1, nr_rows, nr_cols),
+                                          self.boards.shape)
+        self.stop_on_death = stop_on_death
+        self.boundary = boundary
+
+        self.generation = 0
+        self.active = np.ones(self.nr_boards, dtype=bool)
+        self.exit_generations = np.full(self.nr_boards, -1, dtype=np.int64)
+        self.exit_reasons = np.full(self.nr_boards, self.RUNNING, dtype=np.uint8)
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def step(self) -> None:
+        """
+        Advances every running board by one generation and stops the boards that died out or matched their target.
+        :return: None
+        """
+
+        self.generation += 1
+        if self.active.all():
+            indices = slice(None)
+            self.boards = NumpyEngine.step_array(self.boards, self.boundary)
+            boards = self.boards
+        else:
+            indices = np.flatnonzero(self.active)
+            boards = NumpyEngine.step_array(self.boards[indices], self.boundary)
+            self.boards[indices] = boards
+
+        running = np.arange(self.nr_boards)[indices]
+        if self.stop_on_death:
+            died = ~boards.any(axis=(1, 2))
+            self.stop(running[died], self.DIED)
+        if self.target is not None:
+            target = self.target[indices]
+            matched = ((boards == target) | (target == -1)).all(axis=(1, 2))
+            self.stop(running[matched], self.MATCHED)
+
+    def run(self, max_generations: int) -> None:
+        """
+        Advances the boards until every board stopped or the given number of generations was reached.
+        :param max_generations: int, the maximum number of generations to advance.
+        :return: None
+        """
+
+        for _ in range(max_generations):
+            if not self.active.any():
+                return
+            self.step()
+
+    def stop(self, board_indices: 'np.ndarray', reason: int) -> None:
+        """
+        Stops the given boards at the current generation.
+        :param board_indices: np.ndarray, the indices of the boards to stop.
+        :param reason: int, why the boards stopped, DIED, MATCHED or REPEATED.
+        :return: None
+        """
+
+        board_indices = board_indices[self.active[board_indices]]
+        self.active[board_indices] = False
+        self.exit_generations[board_indices] = self.generation
+        self.exit_reasons[board_indices] = reason
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def get_state(self, board_index: int) -> CellBuffer:
+        """
+        Returns the state of a board.
+        :param board_index: int, the index of the board.
+        :return: CellBuffer, the flat state of the board, like Level.current_state.
+        """
+
+        return CellBuffer(self.boards[board_index].tobytes())
+
+    def get_states(self) -> list[CellBuffer]:
+        """
+        Returns the states of every board.
+        :return: list[CellBuffer], the flat states of the boards, like Level.current_state.
+        """
+
+        return [CellBuffer(board.tobytes()) for board in self.boards]
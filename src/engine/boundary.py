@@ -0,0 +1,110 @@
+"""
+A module with the boundary modes of the board, set in the level file header.
+    - dead: the cells outside the board are always dead,
+    - torus: the left and right edges are glued together, and so are the top and bottom edges,
+    - klein: the left and right edges are glued together, and the top and bottom edges are glued with a flip,
+      making a Klein bottle.
+
+The engines pad the board with the cells across each edge, so their inner loops never check for edges.
+"""
+
+from typing import Optional
+
+from src.engine.cell_buffer import CellBuffer
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+DEAD = 'dead'
+TORUS = 'torus'
+KLEIN = 'klein'
+BOUNDARIES = [DEAD, TORUS, KLEIN]
+
+NEIGHBOR_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+
+def pad_rows(state: CellBuffer, nr_rows: int, nr_cols: int, boundary: str) -> list[list[int]]:
+    """
+    Splits a state into rows and surrounds them with the cells across each edge.
+    :param state: CellBuffer, the state of the board.
+    :param nr_rows: int, the number of rows of the board.
+    :param nr_cols: int, the number of columns of the board.
+    :param boundary: str, the boundary mode.
+    :return: list[list[int]], nr_rows + 2 rows of nr_cols + 2 cells.
+    """
+
+    if boundary == DEAD:
+        rows = [[0, *state[row * nr_cols:(row + 1) * nr_cols], 0] for row in range(nr_rows)]
+        return [[0] * (nr_cols + 2), *rows, [0] * (nr_cols + 2)]
+
+    rows = []
+    for row in range(nr_rows):
+        cells = state[row * nr_cols:(row + 1) * nr_cols]
+        rows.append([cells[-1], *cells, cells[0]])
+    if boundary == TORUS:
+        return [rows[-1], *rows, rows[0]]
+    return [rows[-1][::-1], *rows, rows[0][::-1]]
+
+
+def pad_array(board: 'np.ndarray', boundary: str) -> 'np.ndarray':
+    """
+    Surrounds a board, or a stack of boards, with the cells across each edge.
+    :param board: np.ndarray, the board, of shape (..., nr_rows, nr_cols).
+    :param boundary: str, the boundary mode.
+    :return: np.ndarray, the padded board, of shape (..., nr_rows + 2, nr_cols + 2).
+    """
+
+    pad_width = [(0, 0)] * (board.ndim - 2) + [(1, 1), (1, 1)]
+    if boundary == DEAD:
+        return np.pad(board, pad_width)
+    if boundary == TORUS:
+        return np.pad(board, pad_width, mode='wrap')
+
+    padded = np.pad(board, pad_width[:-2] + [(0, 0), (1, 1)], mode='wrap')
+    return np.concatenate([padded[..., -1:, ::-1], padded, padded[..., :1, ::-1]], axis=-2)
+
+
+def get_neighbors(cell_index: int, nr_rows: int, nr_cols: int, boundary: str) -> list[int]:
+    """
+    Returns the indices of the neighbors of a cell, remapped across the edges.
+    :param cell_index: int, the index of the cell.
+    :param nr_rows: int, the number of rows of the board.
+    :param nr_cols: int, the number of columns of the board.
+    :param boundary: str, the boundary mode.
+    :return: list[int], the indices of the neighbors of the cell.
+    """
+
+    row, col = divmod(cell_index, nr_cols)
+    neighbors = []
+    for d_row, d_col in NEIGHBOR_OFFSETS:
+        neighbor = remap(row + d_row, col + d_col, nr_rows, nr_cols, boundary)
+        if neighbor is not None:
+            neighbors.append(neighbor[0] * nr_cols + neighbor[1])
+    return neighbors
+
+
+def remap(row: int, col: int, nr_rows: int, nr_cols: int, boundary: str) -> Optional[tuple[int, int]]:
+    """
+    Returns the cell of the board that a position at most one cell past an edge stands for.
+    :param row: int, the row of the position.
+    :param col: int, the column of the position.
+    :param nr_rows: int, the number of rows of the board.
+    :param nr_cols: int, the number of columns of the board.
+    :param boundary: str, the boundary mode.
+    :return: tuple[int, int], the row and column of the cell, or None if the position is outside a dead boundary.
+    """
+
+    if 0 <= row < nr_rows and 0 <= col < nr_cols:
+        return row, col
+    if boundary == DEAD:
+        return None
+
+    col %= nr_cols
+    if not 0 <= row < nr_rows:
+        row %= nr_rows
+        if boundary == KLEIN:
+            col = nr_cols - 1 - col
+    return row, col
@@ -0,0 +1,16 @@
+class CellBuffer(bytearray):
+    """
+    Class for the cells of a board: one byte per cell, 0 or 1, in row-major order.
+
+    A bytearray, so it exposes the buffer protocol: the engines, the renderer and the savers read it through
+    memoryviews and NumPy arrays that share its memory instead of copying it. A buffer never changes size,
+    so those views stay valid for as long as the buffer lives.
+    """
+
+    def copy(self) -> 'CellBuffer':
+        """
+        Returns a copy of the buffer.
+        :return: CellBuffer, the copy.
+        """
+
+        return CellBuffer(self)
@@ -0,0 +1,78 @@
+from abc import ABC, abstractmethod
+
+from src.engine.boundary import DEAD
+from src.engine.cell_buffer import CellBuffer
+
+
+class Engine(ABC):
+    """
+    Abstract class for a stepping engine.
+    Advances a flat Game of Life state (a row-major CellBuffer of 0s and 1s) by one or more generations.
+    """
+
+    name = None
+
+    # The name of the engine used instead when this one is not available, if any
+    fallback = None
+
+    # Whether the engine releases the GIL for most of a step, so that stepping in a worker thread
+    # does not hold up the main thread
+    releases_gil = False
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """
+        Checks if the engine can be used in the current environment.
+        :return: bool, True if the engine's dependencies are installed.
+        """
+
+        return True
+
+    @abstractmethod
+    def step_into(self, state: CellBuffer, next_state: CellBuffer, nr_rows: int, nr_cols: int,
+                  boundary: str = DEAD) -> list[int]:
+        """
+        Computes the next generation of the given state into another buffer, which is overwritten.
+        :param state: CellBuffer, the current state of the board.
+        :param next_state: CellBuffer, the buffer to write the next state of the board to.
+        :param nr_rows: int, the number of rows of the board.
+        :param nr_cols: int, the number of columns of the board.
+        :param boundary: str, the boundary mode of the board.
+        :return: list[int], the indices of the cells that changed.
+        """
+
+        pass
+
+    def step(self, state: CellBuffer, nr_rows: int, nr_cols: int,
+             boundary: str = DEAD) -> tuple[CellBuffer, list[int]]:
+        """
+        Computes the next generation of the given state into a new buffer.
+        :param state: CellBuffer, the current state of the board.
+        :param nr_rows: int, the number of rows of the board.
+        :param nr_cols: int, the number of columns of the board.
+        :param boundary: str, the boundary mode of the board.
+        :return: tuple[CellBuffer, list[int]], the next state of the board and the indices of the cells that changed.
+        """
+
+        next_state = CellBuffer(len(state))
+        changed = self.step_into(state, next_state, nr_rows, nr_cols, boundary)
+        return next_state, changed
+
+    def run(self, state: CellBuffer, nr_rows: int, nr_cols: int, generations: int,
+            boundary: str = DEAD) -> CellBuffer:
+        """
+        Computes the state of the board after the given number of generations.
+        Swaps two buffers between generations instead of allocating a new one every time.
+        :param state: CellBuffer, the current state of the board.
+        :param nr_rows: int, the number of rows of the board.
+        :param nr_cols: int, the number of columns of the board.
+        :param generations: int, the number of generations to advance.
+        :param boundary: str, the boundary mode of the board.
+        :return: CellBuffer, the state of the board after the given number of generations.
+        """
+
+        state, next_state = CellBuffer(state), CellBuffer(len(state))
+        for _ in range(generations):
+            self.step_into(state, next_state, nr_rows, nr_cols, boundary)
+            state, next_state = next_state, state
+        return state
@@ -0,0 +1,155 @@
+from src.engine.boundary import BOUNDARIES, DEAD, KLEIN
+from src.engine.cell_buffer import CellBuffer
+from src.engine.engine import Engine
+from src.engine.python_engine import PythonEngine
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+# The boundary modes as the integers the kernel takes
+DEAD_CODE = BOUNDARIES.index(DEAD)
+KLEIN_CODE = BOUNDARIES.index(KLEIN)
+
+
+def count_edge_neighbors(state, row: int, col: int, nr_rows: int, nr_cols: int, boundary: int) -> int:
+    """
+    Counts the alive neighbors of a cell on the edge of the board, remapping the neighbors across the edges.
+    :param state: np.ndarray, the state of the board, flat and of dtype int8.
+    :param row: int, the row of the cell.
+    :param col: int, the column of the cell.
+    :param nr_rows: int, the number of rows of the board.
+    :param nr_cols: int, the number of columns of the board.
+    :param boundary: int, the index of the boundary mode in BOUNDARIES.
+    :return: int, the number of alive neighbors.
+    """
+
+    alive_neighbors = 0
+    for d_row in range(-1, 2):
+        for d_col in range(-1, 2):
+            if d_row == 0 and d_col == 0:
+                continue
+
+            neighbor_row, neighbor_col = row + d_row, col + d_col
+            if neighbor_row < 0 or neighbor_row >= nr_rows or neighbor_col < 0 or neighbor_col >= nr_cols:
+                if boundary == DEAD_CODE:
+                    continue
+                neighbor_col %= nr_cols
+                if neighbor_row < 0 or neighbor_row >= nr_rows:
+                    neighbor_row %= nr_rows
+                    if boundary == KLEIN_CODE:
+                        neighbor_col = nr_cols - 1 - neighbor_col
+            alive_neighbors += state[neighbor_row * nr_cols + neighbor_col]
+    return alive_neighbors
+
+
+def step_kernel(state, next_state, nr_rows: int, nr_cols: int, boundary: int, rule, changed) -> int:
+    """
+    Computes the next generation of a flat state into another one.
+    The inner cells of a row sum their neighbors in slices of the rows above and below, with no edge checks,
+    and only the cells on the edges remap their neighbors. The cells are int8, so that the sums stay signed
+    integers in the compiled code.
+    :param state: np.ndarray, the current state of the board, flat and of dtype int8.
+    :param next_state: np.ndarray, the array to write the next state of the board to.
+    :param nr_rows: int, the number of rows of the board.
+    :param nr_cols: int, the number of columns of the board.
+    :param boundary: int, the index of the boundary mode in BOUNDARIES.
+    :param rule: np.ndarray, the rule table: the next state of a cell at index 9 * its state + its number of
+                 alive neighbors.
+    :param changed: np.ndarray, the array to write the indices of the changed cells to, as long as the state.
+    :return: int, the number of changed cells.
+    """
+
+    nr_changed = 0
+    for row in range(nr_rows):
+        row_start = row * nr_cols
+        middle = state[row_start:row_start + nr_cols]
+        next_row = next_state[row_start:row_start + nr_cols]
+
+        if 0 < row < nr_rows - 1:
+            above = state[row_start - nr_cols:row_start]
+            below = state[row_start + nr_cols:row_start + 2 * nr_cols]
+            for col in range(1, nr_cols - 1):
+                alive_neighbors = (above[col - 1] + above[col] + above[col + 1] + middle[col - 1] + middle[col + 1] +
+                                   below[col - 1] + below[col] + below[col + 1])
+                next_row[col] = rule[9 * middle[col] + alive_neighbors]
+            for col in (0, nr_cols - 1):
+                alive_neighbors = count_edge_neighbors(state, row, col, nr_rows, nr_cols, boundary)
+                next_row[col] = rule[9 * middle[col] + alive_neighbors]
+        else:
+            for col in range(nr_cols):
+                alive_neighbors = count_edge_neighbors(state, row, col, nr_rows, nr_cols, boundary)
+                next_row[col] = rule[9 * middle[col] + alive_neighbors]
+
+        for col in range(nr_cols):
+            if next_row[col] != middle[col]:
+                changed[nr_changed] = row_start + col
+                nr_changed += 1
+    return nr_changed
+
+
+# Compiled kernels are cached next to this module, so only the first run after a change pays for the compilation
+if numba is not None:
+    count_edge_neighbors = numba.njit(cache=True, nogil=True)(count_edge_neighbors)
+    step_kernel = numba.njit(cache=True, nogil=True)(step_kernel)
+
+
+class JitEngine(Engine):
+    """
+    Compiled stepping engine.
+    Runs a tight loop over the flat state, compiled to machine code by Numba. Requires NumPy and Numba,
+    and falls back to the Python engine without them.
+    """
+
+    name = 'jit'
+    fallback = PythonEngine.name
+    releases_gil = True
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """
+        Checks if NumPy and Numba are installed.
+        :return: bool, True if NumPy and Numba are installed.
+        """
+
+        return np is not None and numba is not None
+
+    def __init__(self, birth: tuple[int, ...] = (3,), survival: tuple[int, ...] = (2, 3)) -> None:
+        """
+        :param birth: tuple[int, ...], the numbers of alive neighbors for which a dead cell becomes alive.
+        :param survival: tuple[int, ...], the numbers of alive neighbors for which an alive cell stays alive.
+        """
+
+        self.rule = np.zeros(18, dtype=np.int8)
+        self.rule[list(birth)] = 1
+        self.rule[[9 + alive_neighbors for alive_neighbors in survival]] = 1
+
+        # Reused between steps of boards of the same size
+        self.changed = np.empty(0, dtype=np.int64)
+
+    def step_into(self, state: CellBuffer, next_state: CellBuffer, nr_rows: int, nr_cols: int,
+                  boundary: str = DEAD) -> list[int]:
+        """
+        Computes the next generation of the given state into another buffer, which is overwritten.
+        The kernel reads and writes the buffers through arrays that share their memory.
+        :param state: CellBuffer, the current state of the board.
+        :param next_state: CellBuffer, the buffer to write the next state of the board to.
+        :param nr_rows: int, the number of rows of the board.
+        :param nr_cols: int, the number of columns of the board.
+        :param boundary: str, the boundary mode of the board.
+        :return: list[int], the indices of the cells that changed.
+        """
+
+        if len(self.changed) != len(state):
+            self.changed = np.empty(len(state), dtype=np.int64)
+
+        nr_changed = step_kernel(np.frombuffer(state, dtype=np.int8), np.frombuffer(next_state, dtype=np.int8),
+                                 nr_rows, nr_cols, BOUNDARIES.index(boundary), self.rule, self.changed)
+        return self.changed[:nr_changed].tolist()
@@ -0,0 +1,78 @@
+from src.engine.boundary import DEAD, pad_array
+from src.engine.cell_buffer import CellBuffer
+from src.engine.engine import Engine
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class NumpyEngine(Engine):
+    """
+    Vectorized stepping engine.
+    Counts the neighbors of the whole board at once with shifted slices. Requires NumPy.
+    """
+
+    name = 'numpy'
+    releases_gil = True
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """
+        Checks if NumPy is installed.
+        :return: bool, True if NumPy is installed.
+        """
+
+        return np is not None
+
+    def step_into(self, state: CellBuffer, next_state: CellBuffer, nr_rows: int, nr_cols: int,
+                  boundary: str = DEAD) -> list[int]:
+        """
+        Computes the next generation of the given state into another buffer, which is overwritten.
+        Both buffers are read and written through arrays that share their memory.
+        :param state: CellBuffer, the current state of the board.
+        :param next_state: CellBuffer, the buffer to write the next state of the board to.
+        :param nr_rows: int, the number of rows of the board.
+        :param nr_cols: int, the number of columns of the board.
+        :param boundary: str, the boundary mode of the board.
+        :return: list[int], the indices of the cells that changed.
+        """
+
+        board = np.asarray(state, dtype=np.uint8).reshape(nr_rows, nr_cols)
+        next_board = self.step_array(board, boundary)
+        np.asarray(next_state, dtype=np.uint8).reshape(nr_rows, nr_cols)[...] = next_board
+        return np.flatnonzero(next_board != board).tolist()
+
+    def run(self, state: CellBuffer, nr_rows: int, nr_cols: int, generations: int,
+            boundary: str = DEAD) -> CellBuffer:
+        """
+        Computes the state of the board after the given number of generations.
+        The board stays an array between generations and is copied back to a buffer only once.
+        :param state: CellBuffer, the current state of the board.
+        :param nr_rows: int, the number of rows of the board.
+        :param nr_cols: int, the number of columns of the board.
+        :param generations: int, the number of generations to advance.
+        :param boundary: str, the boundary mode of the board.
+        :return: CellBuffer, the state of the board after the given number of generations.
+        """
+
+        board = np.asarray(state, dtype=np.uint8).reshape(nr_rows, nr_cols)
+        for _ in range(generations):
+            board = self.step_array(board, boundary)
+        return CellBuffer(board.tobytes())
+
+    @staticmethod
+    def step_array(board: 'np.ndarray', boundary: str = DEAD) -> 'np.ndarray':
+        """
+        Computes the next generation of a board, or of a stack of boards of the same shape.
+        :param board: np.ndarray, the current board, of shape (..., nr_rows, nr_cols) and dtype uint8.
+        :param boundary: str, the boundary mode of the board.
+        :return: np.ndarray, the next board.
+        """
+
+        padded = pad_array(board, boundary)
+        neighbors = (padded[..., :-2, :-2] + padded[..., :-2, 1:-1] + padded[..., :-2, 2:] +
+                     padded[..., 1:-1, :-2] + padded[..., 1:-1, 2:] +
+                     padded[..., 2:, :-2] + padded[..., 2:, 1:-1] + padded[..., 2:, 2:])
+        return ((neighbors == 3) | ((board == 1) & (neighbors == 2))).astype(np.uint8)
@@ -0,0 +1,58 @@
+from src.engine.boundary import DEAD, get_neighbors, pad_rows
+from src.engine.cell_buffer import CellBuffer
+from src.engine.engine import Engine
+
+
+class PythonEngine(Engine):
+    """
+    Pure Python stepping engine.
+    Visits every cell and counts its alive neighbors in the padded rows around it. Has no dependencies.
+    """
+
+    name = 'python'
+
+    def step_into(self, state: CellBuffer, next_state: CellBuffer, nr_rows: int, nr_cols: int,
+                  boundary: str = DEAD) -> list[int]:
+        """
+        Computes the next generation of the given state into another buffer, which is overwritten.
+        The board is padded with the cells across its edges first, so every cell has eight neighbors to count.
+        :param state: CellBuffer, the current state of the board.
+        :param next_state: CellBuffer, the buffer to write the next state of the board to.
+        :param nr_rows: int, the number of rows of the board.
+        :param nr_cols: int, the number of columns of the board.
+        :param boundary: str, the boundary mode of the board.
+        :return: list[int], the indices of the cells that changed.
+        """
+
+        padded = pad_rows(state, nr_rows, nr_cols, boundary)
+        next_state[:] = state
+        changed = []
+        for row in range(nr_rows):
+            above, middle, below = padded[row], padded[row + 1], padded[row + 2]
+            cell_index = row * nr_cols
+            for col in range(nr_cols):
+                alive_neighbors = (above[col] + above[col + 1] + above[col + 2] + middle[col] + middle[col + 2] +
+                                   below[col] + below[col + 1] + below[col + 2])
+
+                if middle[col + 1] == 0:
+                    if alive_neighbors == 3:
+                        next_state[cell_index] = 1
+                        changed.append(cell_index)
+                elif alive_neighbors < 2 or alive_neighbors > 3:
+                    next_state[cell_index] = 0
+                    changed.append(cell_index)
+                cell_index += 1
+        return changed
+
+    @staticmethod
+    def get_neighbors(cell_index: int, nr_rows: int, nr_cols: int, boundary: str = DEAD) -> list[int]:
+        """
+        Returns the indices of the neighbors of the cell at the given index.
+        :param cell_index: int, the index of the cell.
+        :param nr_rows: int, the number of rows of the board.
+        :param nr_cols: int, the number of columns of the board.
+        :param boundary: str, the boundary mode of the board.
+        :return: list[int], the indices of the neighbors of the cell.
+        """
+
+        return get_neighbors(cell_index, nr_rows, nr_cols, boundary)
@@ -0,0 +1,46 @@
+"""
+A module keeping track of the available stepping engines.
+"""
+
+from src.engine.auto_engine import AutoEngine
+from src.engine.engine import Engine
+from src.engine.jit_engine import JitEngine
+from src.engine.numpy_engine import NumpyEngine
+from src.engine.python_engine import PythonEngine
+from src.error import EngineError
+
+
+ENGINES: dict[str, type[Engine]] = {
+    PythonEngine.name: PythonEngine,
+    NumpyEngine.name: NumpyEngine,
+    JitEngine.name: JitEngine,
+    AutoEngine.name: AutoEngine,
+}
+
+
+def available_engines() -> list[str]:
+    """
+    Returns the names of the engines that can be used in the current environment.
+    :return: list[str], the names of the available engines.
+    """
+
+    return [name for name, engine_class in ENGINES.items() if engine_class.is_available()]
+
+
+def get_engine(name: str) -> Engine:
+    """
+    Creates the engine with the given name, or its fallback if it is not available.
+    :param name: str, the name of the engine.
+    :return: Engine, the engine.
+    :raises: EngineError if the engine does not exist, or if neither it nor its fallbacks are available.
+    """
+
+    if name not in ENGINES:
+        raise EngineError(f'Unknown engine: {name}!')
+
+    engine_class = ENGINES[name]
+    while not engine_class.is_available():
+        if engine_class.fallback is None:
+            raise EngineError(f'Engine {name} is not available!')
+        engine_class = ENGINES[engine_class.fallback]
+    return engine_class()
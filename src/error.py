@@ -4,3 +4,11 @@ class GameError(Exception):
 
 class AssetError(Exception):
     pass
+
+
+class EngineError(Exception):
+    pass
+
+
+class SessionError(Exception):
+    pass
@@ -0,0 +1,62 @@
+"""
+Headless recorder of level runs.
+
+Ticks a level for a number of generations and records it as an animated GIF or as numbered PPM frames.
+
+Usage (from the repository root):
+    python -m src.export.export_run data/sandbox_learning_the_game.txt --generations 200 --output run.gif
+    python -m src.export.export_run data/pricey_level_1.txt --format ppm --stride 10 --output frames
+"""
+
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import argparse
+import time
+
+import pygame
+
+from src.engine.registry import get_engine
+from src.export.recorder import Recorder
+from src.headless import load_level
+import src.constant.constant as const
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Records a run of a level as an animated GIF or as PPM frames.')
+    parser.add_argument('level', help='the level file to run')
+    parser.add_argument('--generations', type=int, default=100, help='the number of generations to run')
+    parser.add_argument('--output', required=True, help='the GIF file or the directory of the PPM frames')
+    parser.add_argument('--format', choices=Recorder.FORMATS, default=const.EXPORT_FORMAT,
+                        help='the output format')
+    parser.add_argument('--stride', type=int, default=const.EXPORT_STRIDE,
+                        help='the number of generations between two frames')
+    parser.add_argument('--cell-size', type=int, default=const.EXPORT_CELL_SIZE,
+                        help='the size of a cell in pixels')
+    parser.add_argument('--frame-delay', type=int, default=const.EXPORT_FRAME_DELAY,
+                        help='the time a GIF frame is shown, in hundredths of a second')
+    parser.add_argument('--engine', default=const.ENGINE, help='the engine used to tick the level')
+    args = parser.parse_args()
+
+    pygame.init()
+    level = load_level(args.level, pygame.Surface((0, 0)))
+    level.engine = get_engine(args.engine)
+
+    # Nothing waits on the run, so the recorder blocks instead of dropping frames
+    recorder = Recorder(args.output, args.format, level.nr_rows, level.nr_cols, args.cell_size, args.stride,
+                        [level.dead_cell_color, level.alive_cell_color], args.frame_delay,
+                        const.EXPORT_QUEUE_SIZE, block=True)
+
+    start = time.perf_counter()
+    level.add_observer(recorder)
+    for _ in range(args.generations):
+        level.tick()
+    recorder.close()
+    elapsed = time.perf_counter() - start
+
+    pygame.quit()
+    print(f'Recorded {recorder.describe()} in {elapsed:.2f} s.')
+
+
+if __name__ == '__main__':
+    main()
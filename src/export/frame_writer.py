@@ -0,0 +1,40 @@
+from abc import ABC, abstractmethod
+
+
+class FrameWriter(ABC):
+    """
+    Abstract class for a frame writer.
+    Writes a stream of frames, given as the palette indices of their pixels, one frame at a time.
+    """
+
+    def __init__(self, path: str, width: int, height: int, palette: list[tuple[int, int, int]]) -> None:
+        """
+        :param path: str, the path of the output.
+        :param width: int, the width of the frames in pixels.
+        :param height: int, the height of the frames in pixels.
+        :param palette: list[tuple[int, int, int]], the colors of the palette indices.
+        """
+
+        self.path = path
+        self.width, self.height = width, height
+        self.palette = palette
+        self.nr_frames = 0
+
+    @abstractmethod
+    def write_frame(self, pixels: bytes) -> None:
+        """
+        Writes the next frame.
+        :param pixels: bytes, the palette index of every pixel of the frame, row by row.
+        :return: None
+        """
+
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Finishes the output.
+        :return: None
+        """
+
+        pass
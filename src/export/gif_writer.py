@@ -0,0 +1,132 @@
+import struct
+
+from src.export.frame_writer import FrameWriter
+
+
+class GifWriter(FrameWriter):
+    """
+    Class for an animated GIF writer.
+    Streams the frames to the file as they come, so only the frame being encoded is kept in memory.
+    The frames are LZW-compressed with the palette as the global color table, and the animation loops forever.
+    """
+
+    # The smallest LZW code size allowed by the GIF format, enough for a palette of up to 4 colors
+    MIN_CODE_SIZE = 2
+    MAX_CODE = 4096
+
+    def __init__(self, path: str, width: int, height: int, palette: list[tuple[int, int, int]],
+                 frame_delay: int) -> None:
+        """
+        :param path: str, the path of the GIF file.
+        :param width: int, the width of the frames in pixels.
+        :param height: int, the height of the frames in pixels.
+        :param palette: list[tuple[int, int, int]], the colors of the palette indices, up to 256.
+        :param frame_delay: int, the time a frame is shown, in hundredths of a second.
+        """
+
+        super().__init__(path, width, height, palette)
+        self.frame_delay = frame_delay
+
+        # The color table holds a power of 2 colors, at least 4
+        self.table_bits = max(self.MIN_CODE_SIZE, (len(palette) - 1).bit_length())
+        color_table = b''.join(bytes(rgb) for rgb in palette)
+        color_table += bytes(3 * (2 ** self.table_bits) - len(color_table))
+
+        self.file = open(path, 'wb')
+        self.file.write(b'GIF89a')
+        self.file.write(struct.pack('<HHBBB', width, height, 0xF0 | (self.table_bits - 1), 0, 0))
+        self.file.write(color_table)
+        # Loop forever
+        self.file.write(b'\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00')
+
+    def write_frame(self, pixels: bytes) -> None:
+        """
+        Writes the next frame.
+        :param pixels: bytes, the palette index of every pixel of the frame, row by row.
+        :return: None
+        """
+
+        self.file.write(b'\x21\xf9\x04\x00' + struct.pack('<H', self.frame_delay) + b'\x00\x00')
+        self.file.write(b'\x2c' + struct.pack('<HHHHB', 0, 0, self.width, self.height, 0))
+
+        data = self.compress(pixels)
+        self.file.write(bytes([self.table_bits]))
+        for start in range(0, len(data), 255):
+            block = data[start:start + 255]
+            self.file.write(bytes([len(block)]) + block)
+        self.file.write(b'\x00')
+        self.nr_frames += 1
+
+    def compress(self, pixels: bytes) -> bytes:
+        """
+        LZW-compresses the pixels of a frame, with variable-length codes packed from the least significant bit.
+        :param pixels: bytes, the palette index of every pixel of the frame.
+        :return: bytes, the compressed pixels.
+        """
+
+        clear_code = 1 << self.table_bits
+        end_code = clear_code + 1
+
+        output = bytearray()
+        bits, nr_bits = 0, 0
+
+        code_size = self.table_bits + 1
+        next_code = end_code + 1
+        table: dict[tuple[int, int], int] = {}
+
+        # The clear code starts the stream
+        bits |= clear_code << nr_bits
+        nr_bits += code_size
+
+        prefix = None
+        for pixel in pixels:
+            if prefix is None:
+                prefix = pixel
+                continue
+
+            code = table.get((prefix, pixel))
+            if code is not None:
+                prefix = code
+                continue
+
+            bits |= prefix << nr_bits
+            nr_bits += code_size
+            while nr_bits >= 8:
+                output.append(bits & 0xFF)
+                bits >>= 8
+                nr_bits -= 8
+
+            if next_code < self.MAX_CODE:
+                table[prefix, pixel] = next_code
+                next_code += 1
+                if next_code > 1 << code_size:
+                    code_size += 1
+            else:
+                # The table is full, start over
+                bits |= clear_code << nr_bits
+                nr_bits += code_size
+                table = {}
+                code_size = self.table_bits + 1
+                next_code = end_code + 1
+            prefix = pixel
+
+        if prefix is not None:
+            bits |= prefix << nr_bits
+            nr_bits += code_size
+        bits |= end_code << nr_bits
+        nr_bits += code_size
+
+        while nr_bits > 0:
+            output.append(bits & 0xFF)
+            bits >>= 8
+            nr_bits -= 8
+        return bytes(output)
+
+    def close(self) -> None:
+        """
+        Writes the GIF trailer and closes the file.
+        :return: None
+        """
+
+        self.file.write(b'\x3b')
+        self.file.close()
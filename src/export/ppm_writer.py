@@ -0,0 +1,45 @@
+import os
+
+from src.export.frame_writer import FrameWriter
+
+
+class PpmWriter(FrameWriter):
+    """
+    Class for a raw frame writer.
+    Writes every frame to its own binary PPM file, named by its frame number, in the output directory.
+    """
+
+    def __init__(self, path: str, width: int, height: int, palette: list[tuple[int, int, int]]) -> None:
+        """
+        :param path: str, the path of the output directory. It is created if it does not exist.
+        :param width: int, the width of the frames in pixels.
+        :param height: int, the height of the frames in pixels.
+        :param palette: list[tuple[int, int, int]], the colors of the palette indices.
+        """
+
+        super().__init__(path, width, height, palette)
+        os.makedirs(path, exist_ok=True)
+
+        self.header = f'P6\n{width} {height}\n255\n'.encode('ascii')
+        self.colors = [bytes(rgb) for rgb in palette]
+
+    def write_frame(self, pixels: bytes) -> None:
+        """
+        Writes the next frame to a new file.
+        :param pixels: bytes, the palette index of every pixel of the frame, row by row.
+        :return: None
+        """
+
+        colors = self.colors
+        with open(os.path.join(self.path, f'frame_{self.nr_frames:06d}.ppm'), 'wb') as file:
+            file.write(self.header)
+            file.write(b''.join([colors[pixel] for pixel in pixels]))
+        self.nr_frames += 1
+
+    def close(self) -> None:
+        """
+        Nothing to finish, every frame is in its own file.
+        :return: None
+        """
+
+        pass
@@ -0,0 +1,233 @@
+import multiprocessing
+import queue
+import time
+from typing import Optional
+
+from src.engine.cell_buffer import CellBuffer
+from src.export.gif_writer import GifWriter
+from src.export.ppm_writer import PpmWriter
+from src.level.level_observer import LevelObserver
+import src.constant.constant as const
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class Recorder(LevelObserver):
+    """
+    Class for a recorder of level runs.
+    Sends the state of every stride-th generation of the observed level to an encoder process, which renders
+    the frames from the states and streams them to a GIF file or to numbered PPM files.
+
+    The states travel through a bounded queue, one byte per cell, so the memory use does not grow with the
+    length of the run. When the encoder falls behind, a non-blocking recorder drops frames instead of
+    stalling the caller, and a blocking one waits. Waits check regularly that the encoder is still running:
+    if it died, for instance on a full disk, the recording fails and the following frames are dropped.
+    """
+
+    FORMATS = ['gif', 'ppm']
+
+    def __init__(self, path: str, export_format: str, nr_rows: int, nr_cols: int, cell_size: int, stride: int,
+                 palette: list[tuple[int, int, int]], frame_delay: int, queue_size: int, block: bool) -> None:
+        """
+        :param path: str, the path of the GIF file or of the directory of the PPM files.
+        :param export_format: str, 'gif' or 'ppm'.
+        :param nr_rows: int, the number of rows of the level.
+        :param nr_cols: int, the number of columns of the level.
+        :param cell_size: int, the size of a cell in pixels.
+        :param stride: int, the number of generations between two frames.
+        :param palette: list[tuple[int, int, int]], the colors of the dead and alive cells.
+        :param frame_delay: int, the time a GIF frame is shown, in hundredths of a second.
+        :param queue_size: int, the number of states that can wait for the encoder.
+        :param block: bool, whether to wait for the encoder when the queue is full instead of dropping the frame.
+        :raises: ValueError if the format is unknown.
+        """
+
+        if export_format not in self.FORMATS:
+            raise ValueError(f'Unknown export format {export_format!r}, expected one of {", ".join(self.FORMATS)}.')
+
+        self.path = path
+        self.stride = stride
+        self.block = block
+
+        self.nr_frames = 0
+        self.nr_dropped = 0
+        # Why the recording failed, if it did
+        self.error: Optional[str] = None
+
+        self.queue = multiprocessing.Queue(queue_size)
+        self.process = multiprocessing.Process(target=encode, daemon=True,
+                                               args=(self.queue, path, export_format, nr_rows, nr_cols, cell_size,
+                                                     palette, frame_delay))
+        self.process.start()
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def on_reset(self, level) -> None:
+        """
+        Records the state the level starts from.
+        :param level: Level, the observed level.
+        :return: None
+        """
+
+        self.record(level.current_state)
+
+    def on_toggle(self, level, cell_indices: list[int]) -> None:
+        """
+        Edits are recorded with the next generation.
+        :param level: Level, the observed level.
+        :param cell_indices: list[int], the indices of the toggled cells.
+        :return: None
+        """
+
+        pass
+
+    def on_tick(self, level, changed: list[int]) -> None:
+        """
+        Records the state of every stride-th generation.
+        :param level: Level, the observed level.
+        :param changed: list[int], the indices of the cells that changed.
+        :return: None
+        """
+
+        if level.generation % self.stride == 0:
+            self.record(level.current_state)
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def record(self, state: CellBuffer) -> None:
+        """
+        Sends a state to the encoder process.
+        :param state: CellBuffer, the state to record.
+        :return: None
+        """
+
+        # The queue pickles the state in a background thread, while the level keeps writing to its buffers
+        if self.error is None and self.put(bytes(state), self.block):
+            self.nr_frames += 1
+        else:
+            self.nr_dropped += 1
+
+    def put(self, item: Optional[bytes], block: bool) -> bool:
+        """
+        Puts an item in the queue of the encoder process, waiting for room only as long as the encoder is running.
+        :param item: bytes, the state to encode, or None to finish the output.
+        :param block: bool, whether to wait for room in the queue.
+        :return: bool, True if the item was put, False if the queue is full and either block is False or the
+                 encoder died, in which case the recording failed.
+        """
+
+        while True:
+            try:
+                self.queue.put(item, block, const.EXPORT_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                if not self.process.is_alive():
+                    self.fail()
+                    return False
+                if not block:
+                    return False
+
+    def fail(self) -> None:
+        """
+        Records that the encoder process stopped before finishing the output.
+        :return: None
+        """
+
+        if self.error is None:
+            self.error = f'the encoder stopped with exit code {self.process.exitcode}'
+        # The states left in the queue will never be read, they must not hold up the exit of the game
+        self.queue.cancel_join_thread()
+
+    def close(self) -> None:
+        """
+        Waits for the encoder process to write the recorded frames and finish the output. An encoder that died
+        fails the recording, and one that is still writing after EXPORT_CLOSE_TIMEOUT seconds is terminated.
+        :return: None
+        """
+
+        deadline = time.perf_counter() + const.EXPORT_CLOSE_TIMEOUT
+        while self.error is None and self.process.is_alive() and time.perf_counter() < deadline:
+            try:
+                self.queue.put(None, True, const.EXPORT_POLL_INTERVAL)
+                break
+            except queue.Full:
+                pass
+        while self.process.is_alive() and time.perf_counter() < deadline:
+            self.process.join(const.EXPORT_POLL_INTERVAL)
+
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(const.EXPORT_POLL_INTERVAL)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+            self.error = f'the encoder did not finish within {const.EXPORT_CLOSE_TIMEOUT} s'
+            self.queue.cancel_join_thread()
+        elif self.process.exitcode != 0:
+            self.fail()
+
+    def describe(self) -> str:
+        """
+        Returns a short description of the recording.
+        :return: str, the description.
+        """
+
+        description = f'{self.nr_frames} frames to {self.path}'
+        if self.nr_dropped:
+            description += f', {self.nr_dropped} dropped'
+        if self.error is not None:
+            description += f', but the recording failed: {self.error}'
+        return description
+
+
+def render(cells: bytes, nr_rows: int, nr_cols: int, cell_size: int) -> bytes:
+    """
+    Renders a state into the palette indices of its pixels, every cell as a square of cell_size pixels.
+    :param cells: bytes, the state, one byte per cell.
+    :param nr_rows: int, the number of rows of the state.
+    :param nr_cols: int, the number of columns of the state.
+    :param cell_size: int, the size of a cell in pixels.
+    :return: bytes, the palette index of every pixel, row by row.
+    """
+
+    if cell_size == 1:
+        return cells
+
+    if np is not None:
+        board = np.frombuffer(cells, dtype=np.uint8).reshape(nr_rows, nr_cols)
+        return board.repeat(cell_size, axis=0).repeat(cell_size, axis=1).tobytes()
+
+    rows = []
+    for row in range(nr_rows):
+        pixel_row = bytes(cell for cell in cells[row * nr_cols:(row + 1) * nr_cols] for _ in range(cell_size))
+        rows.append(pixel_row * cell_size)
+    return b''.join(rows)
+
+
+def encode(states: multiprocessing.Queue, path: str, export_format: str, nr_rows: int, nr_cols: int,
+           cell_size: int, palette: list[tuple[int, int, int]], frame_delay: int) -> None:
+    """
+    Encodes the states from the queue until it gets None. Runs in the encoder process.
+    :param states: multiprocessing.Queue, the recorded states.
+    :param path: str, the path of the GIF file or of the directory of the PPM files.
+    :param export_format: str, 'gif' or 'ppm'.
+    :param nr_rows: int, the number of rows of the level.
+    :param nr_cols: int, the number of columns of the level.
+    :param cell_size: int, the size of a cell in pixels.
+    :param palette: list[tuple[int, int, int]], the colors of the dead and alive cells.
+    :param frame_delay: int, the time a GIF frame is shown, in hundredths of a second.
+    :return: None
+    """
+
+    width, height = nr_cols * cell_size, nr_rows * cell_size
+    if export_format == 'gif':
+        writer = GifWriter(path, width, height, palette, frame_delay)
+    else:
+        writer = PpmWriter(path, width, height, palette)
+
+    while (cells := states.get()) is not None:
+        writer.write_frame(render(cells, nr_rows, nr_cols, cell_size))
+    writer.close()
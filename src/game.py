@@ -1,16 +1,46 @@
+import asyncio
+import concurrent.futures
+import functools
 import os.path
+import threading
+import time
+from typing import Callable, Optional
+
 import pygame
 
-from src.button.button import Button
+from src.analysis.census import Census
+from src.analysis.cycle_detector import CycleDetector
+from src.analysis.goal_tracker import GoalTracker
+from src.analysis.heatmap import Heatmap
+from src.analysis.population_tracker import PopulationTracker
+from src.analysis.stats_log import StatsLog
 from src.button.solid_color_push_button import SolidColorPushButton
 from src.button.solid_color_toggle_button import SolidColorToggleButton
 from src.button.toggle_button import ToggleButton
-from src.error import GameError
+from src.error import GameError, SessionError
+from src.export.recorder import Recorder
+from src.level.brush import Brush
+from src.level.speculator import Speculator
+from src.level.tiled_level import TiledLevel
+from src.profiling.frame_profiler import FrameProfiler
+from src.profiling.memory_profiler import MemoryProfiler
+from src.profiling.performance_overlay import PerformanceOverlay
+from src.scheduling.scheduler import Scheduler
+from src.session.autosaver import Autosaver
+from src.session.input_log import InputFrame, InputLog, InputReplay
+from src.session.session import Keyframe, Session
+from src.solver.pricey_solver import PriceySolver
+from src.ui.container import Container
+from src.ui.event_router import EventRouter
 import src.constant.constant as const
 import src.constant.color as color
 from src.level.sandbox_level import SandboxLevel
 
 
+LEVEL_SOLVED = pygame.event.custom_type()
+HINT_FOUND = pygame.event.custom_type()
+
+
 class Game:
     """
     Class for the game.
@@ -43,22 +73,68 @@ class Game:
         self.level = None
 
         self.is_ticking = False
+        self.is_paused = False
+        self.is_dragging = False
+        self.brush = Brush()
+
+        self.running = False
+        self.needs_redraw = True
+        self.dirty_rect = None
         self.level_copy = None
         self.time_since_last_tick = 0
-
-        self.buttons: dict[tuple[tuple[int, int], tuple[int, int]], Button] = {}
+        self.frame_time = 0
+
+        self.cycle_detector = CycleDetector(const.CYCLE_MAX_PERIOD)
+        self.cycle_reported = False
+        self.goal_tracker = GoalTracker()
+        self.speculator = Speculator(const.SPECULATION_DEPTH, const.SPECULATION_MAX_BYTES)
+        self.goal_tracker.listeners.append(self.handle_level_solved)
+        self.hint_solutions = None
+        self.hint_search: Optional[concurrent.futures.Future] = None
+        self.recorder = None
+        self.population_tracker = None
+        self.stats_log = None
+        self.census = None
+        self.show_census = False
+        self.heatmap = None
+
+        self.ui = None
+        self.button_panel = None
+        self.advance_button = None
+        self.router = None
 
         self.window = None
         self.clock = None
 
         self.info_panel_height = self.height - int(self.height * const.LEVEL_TO_WINDOW_HEIGHT_RATIO)
         self.info_panel_text = None
+        self.status_texts: dict[str, str] = {}
 
         self.level_x, self.level_y = 0, self.info_panel_height
         self.level_width, self.level_height = None, None
 
+        self.profiler = FrameProfiler(const.PROFILER_PHASES, const.PROFILER_CAPACITY)
+        self.overlay = None
+        self.show_overlay = False
+        self.memory_profiler = MemoryProfiler()
+
+        self.input_log = None
+        self.input_replay = None
+        self.replay_realtime = False
+
+        self.autosaver = Autosaver(const.SESSION_FILE, const.AUTOSAVE_INTERVAL, const.SESSION_COMPRESSION_LEVEL)
+
+        self.frame_start = 0.0
+        self.scheduler = Scheduler(const.FRAME_JOB_BUDGET / 1000, const.JOB_WORKERS)
+        if const.AUTOSAVE_INTERVAL > 0:
+            self.scheduler.add_job('autosave', const.AUTOSAVE_INTERVAL, self.autosave)
+        self.scheduler.add_job('stats', const.STATS_FLUSH_INTERVAL, self.flush_stats_log, self.handle_stats_error)
+
         self.ready_window()
 
+        if const.RESTORE_SESSION and os.path.exists(const.SESSION_FILE):
+            self.load_session()
+
     # ------------------------------------------------------------------------------------------------- #
 
     def ready_window(self) -> None:
@@ -75,6 +151,8 @@ class Game:
         self.ready_level()
         self.ready_buttons()
 
+        self.overlay = PerformanceOverlay(self.level_x, self.level_y, self.profiler, self.window)
+
     def ready_level(self) -> None:
         """
         Creates a new level object.
@@ -93,7 +171,12 @@ class Game:
         level_type = file_name_tokens[0].lower()
         level_name = ' '.join(file_name_tokens[1:]).title()
 
-        if level_type == 'sandbox':
+        if level_type == 'sandbox' and TiledLevel.is_tiled(level_file_path):
+            self.level = TiledLevel(self.level_x, self.level_y, self.level_width, self.level_height,
+                                    level_file_path, level_assets_dir_path, self.window)
+            self.info_panel_text = f'{level_name} - Sandbox: No special rules. No goal.'
+
+        elif level_type == 'sandbox':
             from src.level.sandbox_level import SandboxLevel
             self.level = SandboxLevel(self.level_x, self.level_y, self.level_width, self.level_height,
                                       level_file_path, level_assets_dir_path, self.window)
@@ -108,6 +191,35 @@ class Game:
         else:
             raise GameError('Invalid level type!')
 
+        self.hint_solutions = None
+        self.hint_search = None
+        self.stop_recording()
+        self.stop_stats_log()
+        self.attach_level_observers()
+
+    def attach_level_observers(self) -> None:
+        """
+        Adds the game's observers to the current level and clears the status texts.
+        :return: None
+        """
+
+        self.level.add_observer(self.cycle_detector)
+        self.level.add_observer(self.goal_tracker)
+        self.level.add_observer(self.speculator)
+        if self.recorder is not None:
+            self.level.add_observer(self.recorder)
+        if self.population_tracker is not None:
+            self.level.add_observer(self.population_tracker)
+        if self.heatmap is not None and self.level.in_memory:
+            self.level.add_observer(self.heatmap)
+            self.level.heatmap = self.heatmap
+        else:
+            self.heatmap = None
+        self.cycle_reported = False
+        self.status_texts = {}
+        if self.memory_profiler.is_tracing():
+            self.update_memory_report()
+
     def next_level(self) -> None:
         """
         Loads the next level.
@@ -133,6 +245,9 @@ class Game:
         self.untoggle_buttons()
 
         self.level.reset()
+        self.is_paused = False
+        self.status_texts.pop('goal', None)
+        self.check_cycle()
 
     def ready_buttons(self) -> None:
         """
@@ -143,45 +258,53 @@ class Game:
         button_width = self.width - self.level_width
         button_height = self.level_height // 8
 
+        self.ui = Container(0, 0, self.width, self.height)
+        self.button_panel = self.ui.add(Container(self.level_width, self.info_panel_height, button_width, self.level_height))
+
         # Tick button
         tick_button_x = self.level_width
         tick_button_y = self.info_panel_height
         tick_button = SolidColorPushButton(tick_button_x, tick_button_y, button_width, button_height, self.tick_level,
                                            self.window, color.blue, color.dark_blue, color.dark_blue, 'Tick')
-        tick_button_coords = ((tick_button_x, tick_button_y), (tick_button_x + button_width, tick_button_y + button_height))
-        self.buttons[tick_button_coords] = tick_button
+        self.button_panel.add(tick_button)
 
         # Goal button
         goal_button_x = self.level_width
         goal_button_y = self.info_panel_height + button_height
         goal_button = SolidColorToggleButton(goal_button_x, goal_button_y, button_width, button_height, self.toggle_show_desired,
                                              self.window, color.plum, color.purple, 'Show Goal')
-        goal_button_coords = ((goal_button_x, goal_button_y), (goal_button_x + button_width, goal_button_y + button_height))
-        self.buttons[goal_button_coords] = goal_button
+        self.button_panel.add(goal_button)
 
         # Advance button
         advance_button_x = self.level_width
         advance_button_y = self.info_panel_height + button_height * 2
         advance_button = SolidColorToggleButton(advance_button_x, advance_button_y, button_width, button_height, self.toggle_advancing,
                                                 self.window, color.red, color.dark_red, 'Advance')
-        advance_button_coords = ((advance_button_x, advance_button_y), (advance_button_x + button_width, advance_button_y + button_height))
-        self.buttons[advance_button_coords] = advance_button
+        self.button_panel.add(advance_button)
+        self.advance_button = advance_button
 
         # Reset button
         reset_button_x = self.level_width
         reset_button_y = self.info_panel_height + button_height * 3
         reset_button = SolidColorPushButton(reset_button_x, reset_button_y, button_width, button_height, self.reset_level,
                                             self.window, color.yellow, color.orange, color.orange, 'Reset')
-        reset_button_coords = ((reset_button_x, reset_button_y), (reset_button_x + button_width, reset_button_y + button_height))
-        self.buttons[reset_button_coords] = reset_button
+        self.button_panel.add(reset_button)
 
         # Next level button
         next_level_button_x = self.level_width
         next_level_button_y = self.info_panel_height + button_height * 4
         next_level_button = SolidColorPushButton(next_level_button_x, next_level_button_y, button_width, button_height, self.next_level,
                                                  self.window, color.green, color.dark_green, color.dark_green, 'Next Level')
-        next_level_button_coords = ((next_level_button_x, next_level_button_y), (next_level_button_x + button_width, next_level_button_y + button_height))
-        self.buttons[next_level_button_coords] = next_level_button
+        self.button_panel.add(next_level_button)
+
+        # Hint button
+        hint_button_x = self.level_width
+        hint_button_y = self.info_panel_height + button_height * 5
+        hint_button = SolidColorPushButton(hint_button_x, hint_button_y, button_width, button_height, self.show_hint,
+                                           self.window, color.cyan, color.dark_cyan, color.dark_cyan, 'Hint')
+        self.button_panel.add(hint_button)
+
+        self.router = EventRouter(self.ui, const.HIT_TEST_BUCKET_SIZE)
 
     def untoggle_buttons(self) -> None:
         """
@@ -189,7 +312,7 @@ class Game:
         :return: None
         """
 
-        for button in self.buttons.values():
+        for button in self.button_panel.get_widgets():
             if isinstance(button, ToggleButton):
                 button.toggled = False
 
@@ -198,32 +321,183 @@ class Game:
     def run(self) -> None:
         """
         Main loop of the game.
+        Runs the frames on an asyncio event loop, and the periodic jobs of the scheduler between them.
         :return: None
         """
 
-        running = True
-        while running:
-            # Limit the frame rate
-            self.clock.tick(self.fps)
+        asyncio.run(self.run_frames())
 
-            # Get mouse position for events
-            x_pos, y_pos = pygame.mouse.get_pos()
-            self.handle_mouse_hover(x_pos, y_pos)
+        self.stop_recording()
+        self.stop_stats_log()
+        self.stop_input_log()
+        if self.input_replay is not None:
+            # A replay leaves the saved session alone, and its caller reports on the replayed frames
+            return
 
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
+        self.save_session(wait=True)
+        pygame.quit()
+        quit()
+
+    async def run_frames(self) -> None:
+        """
+        Runs the frames of the game until it quits.
+        In event-driven mode, the loop blocks until the next event while nothing is animating,
+        and the window is redrawn only when something visible changed.
+        :return: None
+        """
 
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    self.handle_mouse_click(x_pos, y_pos)
+        self.running = True
+        try:
+            while self.running:
+                frame = await self.get_frame_input()
+                if frame is None:
+                    break
+                self.run_frame(*frame)
+        finally:
+            await self.scheduler.stop()
+
+    def run_frame(self, frame_time: int, x_pos: int, y_pos: int, idle: bool, events: list[pygame.event.Event]) -> None:
+        """
+        Runs a frame: handles its events, advances the level and draws the window.
+        :param frame_time: int, the time since the previous frame in milliseconds.
+        :param x_pos: int, the x position of the mouse.
+        :param y_pos: int, the y position of the mouse.
+        :param idle: bool, whether the game was idle before the frame.
+        :param events: list[pygame.event.Event], the events to handle.
+        :return: None
+        """
 
+        self.frame_time = frame_time
+        self.profiler.begin_frame()
+
+        if not const.EVENT_DRIVEN or any(event.type == pygame.MOUSEMOTION for event in events):
+            self.handle_mouse_hover(x_pos, y_pos)
+
+        for event in events:
+            self.handle_event(event, x_pos, y_pos)
+        self.apply_brush()
+        self.profiler.mark('events')
+
+        # The time spent waiting does not count towards the next tick
+        if not idle:
             self.advance()
+        # The next generations are computed ahead while the game waits for input, not while it advances
+        if not self.is_ticking or self.is_paused:
+            self.speculator.refill(self.level)
+        self.profiler.mark('advance')
 
+        if self.needs_redraw or not const.EVENT_DRIVEN:
             self.draw()
             pygame.display.update()
+            self.needs_redraw = False
+        elif self.dirty_rect is not None:
+            self.draw_dirty_rect()
+            pygame.display.update(self.dirty_rect)
+        self.dirty_rect = None
+        self.profiler.mark('display')
+        self.profiler.end_frame()
+
+    async def get_frame_input(self) -> Optional[InputFrame]:
+        """
+        Waits for the next frame and returns its input, logging it if the input is logged.
+        The due jobs of the scheduler run while waiting.
+        While replaying an input log, the input comes from the log instead, and the events of the window
+        are dropped. The frames are replayed as fast as possible, or as fast as they were logged if the replay
+        runs in real time.
+        :return: InputFrame, the time of the frame in milliseconds, the mouse position, whether the game is idle
+                 and the events to handle, or None if the replay is over or its window was closed.
+        """
 
-        pygame.quit()
-        quit()
+        if self.input_replay is not None:
+            if any(event.type == pygame.QUIT for event in pygame.event.get()):
+                return None
+            frame = self.input_replay.next_frame()
+            if frame is not None:
+                frame_time = frame[0]
+                delay = frame_time / 1000 if self.replay_realtime else 0.0
+                await self.scheduler.wait_frame(self.frame_start + delay)
+                self.frame_start = time.perf_counter()
+            return frame
+
+        idle = const.EVENT_DRIVEN and not self.is_animating()
+        if idle:
+            # Sleep until an event arrives or a job is due, waking up regularly anyway
+            await self.scheduler.run_idle()
+            timeout = min(const.IDLE_WAIT_TIMEOUT, self.scheduler.get_time_until_due() * 1000)
+            if self.scheduler.has_pending_reports():
+                # The event loop is blocked while waiting, so the finished worker thread parts are reported on waking
+                timeout = min(timeout, const.JOB_REPORT_INTERVAL)
+            events = [pygame.event.wait(max(int(timeout), 1)), *pygame.event.get()]
+        else:
+            # Limit the frame rate
+            await self.scheduler.wait_frame(self.frame_start + 1 / self.fps)
+            events = pygame.event.get()
+        self.frame_start = time.perf_counter()
+        self.clock.tick()
+
+        # Get mouse position for events
+        x_pos, y_pos = pygame.mouse.get_pos()
+        if self.input_log is not None:
+            self.input_log.append(self.clock.get_time(), x_pos, y_pos, idle, events)
+        return self.clock.get_time(), x_pos, y_pos, idle, events
+
+    def is_animating(self) -> bool:
+        """
+        Checks if the window changes on its own, without any input.
+        :return: bool, True if the level is advancing or the performance overlay is shown.
+        """
+
+        return (self.is_ticking and not self.is_paused) or self.show_overlay
+
+    def handle_event(self, event: pygame.event.Event, x_pos: int, y_pos: int) -> None:
+        """
+        Handles a single event.
+        :param event: pygame.event.Event, the event.
+        :param x_pos: int, the x position of the mouse.
+        :param y_pos: int, the y position of the mouse.
+        :return: None
+        """
+
+        if event.type == pygame.QUIT:
+            self.running = False
+
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == pygame.BUTTON_LEFT:
+                self.handle_mouse_click(x_pos, y_pos)
+            elif event.button == pygame.BUTTON_RIGHT:
+                self.is_dragging = x_pos < self.level_width and y_pos >= self.level_y
+
+        elif event.type == pygame.MOUSEBUTTONUP:
+            if event.button == pygame.BUTTON_LEFT:
+                self.brush.end()
+            elif event.button == pygame.BUTTON_RIGHT:
+                self.is_dragging = False
+
+        elif event.type == pygame.MOUSEMOTION:
+            if self.is_dragging:
+                self.level.camera.pan(*event.rel)
+                self.needs_redraw = True
+            elif self.brush.is_painting:
+                self.brush.move(self.level, *event.pos)
+
+        elif event.type == pygame.MOUSEWHEEL:
+            self.handle_mouse_wheel(x_pos, y_pos, event.y)
+
+        elif event.type == pygame.KEYDOWN:
+            self.handle_key_press(event.key, event.mod)
+
+        elif event.type == pygame.WINDOWLEAVE:
+            self.handle_mouse_hover(-1, -1)
+
+        elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWSHOWN, pygame.WINDOWRESTORED):
+            self.needs_redraw = True
+
+        elif event.type == LEVEL_SOLVED:
+            self.status_texts['goal'] = f'Solved at generation {event.generation}!'
+            self.needs_redraw = True
+
+        elif event.type == HINT_FOUND:
+            self.handle_hint_found()
 
     # ------------------------------------------------------------------------------------------------- #
 
@@ -234,7 +508,10 @@ class Game:
         """
 
         if not self.is_ticking:
-            self.level.tick()
+            if not self.speculator.advance(self.level):
+                self.level.tick()
+            self.profiler.count_tick()
+            self.check_cycle()
 
     def toggle_show_desired(self) -> None:
         """
@@ -243,7 +520,7 @@ class Game:
         """
 
         # Check if the level is a sandbox level
-        if not type(self.level) == SandboxLevel:
+        if type(self.level) not in (SandboxLevel, TiledLevel):
             self.level.show_desired = not self.level.show_desired
 
     def toggle_advancing(self) -> None:
@@ -255,28 +532,144 @@ class Game:
         if not self.is_ticking:
             self.level_copy = self.level.__deepcopy__()
             self.is_ticking = True
+            if self.memory_profiler.is_tracing():
+                self.update_memory_report()
         else:
-            self.level = self.level_copy
+            # The snapshot is not held on to, so that the level is freed with the next one
+            self.level, self.level_copy = self.level_copy, None
             self.is_ticking = False
+            self.is_paused = False
+            self.attach_level_observers()
 
     def advance(self) -> None:
         """
         Advances the game to the next state if the corresponding button was toggled.
         Limits the advance to twice per second.
+        Once the level settles into a cycle, the next states are replayed from the cycle detector.
         :return: None
         """
 
-        if self.is_ticking:
-            self.time_since_last_tick += self.clock.get_time()
+        if self.is_ticking and not self.is_paused:
+            self.time_since_last_tick += self.frame_time
             if self.time_since_last_tick >= 500:
-                self.level.tick()
+                if const.CYCLE_ACTION == 'skip' and self.cycle_detector.can_replay():
+                    self.cycle_detector.replay(self.level)
+                elif not self.speculator.advance(self.level):
+                    self.level.tick()
+                self.profiler.count_tick()
                 self.time_since_last_tick = 0
+                self.needs_redraw = True
+
+                self.check_cycle()
+
+    def check_cycle(self) -> None:
+        """
+        Reports a cycle the first time it is detected and pauses the advance if configured to.
+        :return: None
+        """
+
+        if self.cycle_detector.period is None:
+            self.cycle_reported = False
+            self.status_texts.pop('cycle', None)
+            return
+        if self.cycle_reported:
+            return
+
+        self.cycle_reported = True
+        self.status_texts['cycle'] = self.cycle_detector.describe()
+        if const.CYCLE_ACTION == 'pause' and self.is_ticking:
+            self.is_paused = True
+
+    def handle_level_solved(self, generation: int) -> None:
+        """
+        Called by the goal tracker during the tick that reaches the level's desired state.
+        Pauses the advance right away and posts a LEVEL_SOLVED event.
+        :param generation: int, the generation at which the desired state was reached.
+        :return: None
+        """
+
+        if self.is_ticking:
+            self.is_paused = True
+        pygame.event.post(pygame.event.Event(LEVEL_SOLVED, generation=generation))
+
+    def show_hint(self) -> None:
+        """
+        Shows which cell to toggle next in the info panel.
+        Starts solving the level in the background on the first hint, and once it is solved, picks the solution
+        closest to the current toggles.
+        :return: None
+        """
+
+        if not self.goal_tracker.has_goal:
+            self.status_texts['hint'] = 'No goal to hint at.'
+            return
+
+        if self.hint_solutions is None:
+            if self.hint_search is None:
+                self.hint_search = concurrent.futures.Future()
+                threading.Thread(target=self.search_hints, args=(self.level, self.hint_search), daemon=True).start()
+            self.status_texts['hint'] = 'Hint: searching...'
+            return
+        if not self.hint_solutions:
+            self.status_texts['hint'] = f'Hint: no solution within {const.SOLVER_MAX_GENERATIONS} ticks.'
+            return
+
+        current_toggles = self.level.current_toggles
+        toggles, generation = max(self.hint_solutions, key=lambda solution: len(current_toggles & set(solution[0])) -
+                                                                            len(current_toggles ^ set(solution[0])))
+        to_toggle = sorted(set(toggles) - current_toggles)
+        to_untoggle = sorted(current_toggles - set(toggles))
+        if to_untoggle:
+            row, col = divmod(to_untoggle[0], self.level.nr_cols)
+            self.status_texts['hint'] = f'Hint: untoggle row {row + 1}, column {col + 1}.'
+        elif to_toggle:
+            row, col = divmod(to_toggle[0], self.level.nr_cols)
+            self.status_texts['hint'] = f'Hint: toggle row {row + 1}, column {col + 1}.'
+        else:
+            self.status_texts['hint'] = f'Hint: advance to generation {generation}.'
+
+    @staticmethod
+    def search_hints(level, future: concurrent.futures.Future) -> None:
+        """
+        Solves a pricey level and posts a HINT_FOUND event once done. Runs in a worker thread, which mostly waits
+        for the process pool of the solver; the level's initial and desired states it reads do not change.
+        :param level: PriceyLevel, the level to solve.
+        :param future: concurrent.futures.Future, the future the solutions, or the error of the search, are set on.
+        :return: None
+        """
+
+        try:
+            solver = PriceySolver.from_level(level, const.SOLVER_MAX_GENERATIONS)
+            future.set_result(solver.solve(const.SOLVER_WORKERS).solutions)
+        except Exception as error:
+            future.set_exception(error)
+        pygame.event.post(pygame.event.Event(HINT_FOUND))
+
+    def handle_hint_found(self) -> None:
+        """
+        Takes the solutions of the finished hint search and shows the hint. The event of a search of a level
+        that was left since is ignored. A replay waits for its own search, so it shows the hint on the same frame.
+        :return: None
+        """
+
+        if self.hint_search is None or (self.input_replay is None and not self.hint_search.done()):
+            return
+
+        search, self.hint_search = self.hint_search, None
+        self.needs_redraw = True
+        try:
+            self.hint_solutions = search.result()
+        except Exception as error:
+            self.status_texts['hint'] = f'Hint: the search failed: {error}'
+            return
+        self.show_hint()
 
     # ------------------------------------------------------------------------------------------------- #
 
     def handle_mouse_click(self, x_pos: int, y_pos: int) -> None:
         """
         Handles a mouse click event.
+        A click on the level starts a brush stroke, which is applied to the level once per frame.
         :param x_pos: int, the x position of the mouse click.
         :param y_pos: int, the y position of the mouse click.
         :return: None
@@ -285,25 +678,458 @@ class Game:
         # Check if the level was clicked
         if x_pos < self.level_width:
             if not self.is_ticking and not self.level.show_desired:
-                self.level.handle_mouse_click(x_pos, y_pos)
+                self.brush.begin(self.level, x_pos, y_pos)
             return
 
         # Check if a button was clicked
-        for button_coords, button in self.buttons.items():
-            if x_pos in range(button_coords[0][0], button_coords[1][0]) and y_pos in range(button_coords[0][1], button_coords[1][1]):
-                button.click()
-                return
+        self.needs_redraw = True
+        self.router.click(x_pos, y_pos)
+
+    def apply_brush(self) -> None:
+        """
+        Applies the cells painted since the last frame to the level as a single edit,
+        and marks the part of the window they cover as dirty.
+        :return: None
+        """
+
+        cell_indices = self.brush.flush(self.level)
+        if self.is_ticking or self.level.show_desired:
+            return
+        cell_indices = self.level.apply_edits(cell_indices, self.brush.stroke)
+        if not cell_indices:
+            return
+
+        status_texts = self.status_texts.copy()
+        self.check_cycle()
+        if self.status_texts != status_texts or self.show_census:
+            # The info panel changed too
+            self.needs_redraw = True
+            return
+
+        camera = self.level.camera
+        rows, cols = zip(*(divmod(cell_index, self.level.nr_cols) for cell_index in cell_indices))
+        left, top = camera.cell_to_screen(min(rows), min(cols))
+        right, bottom = camera.cell_to_screen(max(rows) + 1, max(cols) + 1)
+        # Inflated by a pixel for the cell borders
+        rect = pygame.Rect(left - 1, top - 1, right - left + 2, bottom - top + 2)
+        self.dirty_rect = rect if self.dirty_rect is None else self.dirty_rect.union(rect)
 
     def handle_mouse_hover(self, x_pos: int, y_pos: int) -> None:
-        # Check if a button was hovered
-        for button_coords, button in self.buttons.items():
-            if x_pos in range(button_coords[0][0], button_coords[1][0]) and y_pos in range(button_coords[0][1], button_coords[1][1]):
-                button.hovered = True
+        """
+        Handles the mouse hovering over the window.
+        :param x_pos: int, the x position of the mouse.
+        :param y_pos: int, the y position of the mouse.
+        :return: None
+        """
+
+        # Check if the hovered button changed
+        if self.router.hover(x_pos, y_pos):
+            self.needs_redraw = True
+
+    def handle_mouse_wheel(self, x_pos: int, y_pos: int, steps: int) -> None:
+        """
+        Handles a mouse wheel event. Zooms the level in or out around the mouse.
+        :param x_pos: int, the x position of the mouse.
+        :param y_pos: int, the y position of the mouse.
+        :param steps: int, the number of wheel steps, positive when scrolling up.
+        :return: None
+        """
+
+        if x_pos < self.level_width and y_pos >= self.level_y:
+            self.level.camera.zoom_at(x_pos, y_pos, const.CAMERA_ZOOM_STEP ** steps)
+            self.needs_redraw = True
+
+    def handle_key_press(self, key: int, mod: int = 0) -> None:
+        """
+        Handles a key press event.
+        F3 toggles the performance overlay, F4 dumps the recorded frames to a CSV file,
+        F5 starts or stops recording the level, F6 shows or hides the object census,
+        F7 starts or stops logging the population statistics, F8 starts or stops the memory accounting,
+        Ctrl+Z undoes the last edit of the level,
+        Ctrl+S saves the session and Ctrl+L loads the saved session.
+        :param key: int, the pressed key.
+        :param mod: int, the pressed modifier keys.
+        :return: None
+        """
+
+        self.needs_redraw = True
+
+        if key == pygame.K_z and mod & pygame.KMOD_CTRL:
+            if not self.is_ticking and not self.level.show_desired:
+                self.level.undo()
+                self.check_cycle()
+
+        elif key == pygame.K_s and mod & pygame.KMOD_CTRL:
+            self.save_session()
+
+        elif key == pygame.K_l and mod & pygame.KMOD_CTRL:
+            if os.path.exists(const.SESSION_FILE):
+                self.load_session()
+
+        elif key == pygame.K_F3:
+            self.show_overlay = not self.show_overlay
+            # A replay profiles every frame for its report, whether the overlay is shown or not
+            if self.input_replay is None:
+                self.profiler.toggle()
+
+        elif key == pygame.K_F4:
+            self.dump_profile()
+
+        elif key == pygame.K_F5:
+            if self.recorder is None:
+                self.start_recording()
             else:
-                button.hovered = False
+                self.stop_recording()
+
+        elif key == pygame.K_F6:
+            # The census classifies the known objects when it is created
+            if self.census is None:
+                self.census = Census(const.CENSUS_MAX_PERIOD, const.CENSUS_MAX_CELLS)
+            self.show_census = not self.show_census
+            self.status_texts.pop('census', None)
+
+        elif key == pygame.K_F7:
+            if self.stats_log is None:
+                self.start_stats_log()
+            else:
+                self.stop_stats_log()
+
+        elif key == pygame.K_F8:
+            if self.memory_profiler.is_tracing():
+                self.memory_profiler.stop()
+                self.status_texts.pop('memory', None)
+            else:
+                self.memory_profiler.start()
+                self.update_memory_report()
+
+        elif key == pygame.K_F9:
+            self.cycle_heatmap()
+
+    def cycle_heatmap(self) -> None:
+        """
+        Switches the level's drawing to the next heatmap mode: from the cell images to the activity, to the age,
+        and back to the cell images.
+        :return: None
+        """
+
+        self.needs_redraw = True
+
+        if self.heatmap is None:
+            if not self.level.in_memory:
+                self.status_texts['heatmap'] = 'Tiled levels have no heatmap.'
+                return
+            try:
+                self.heatmap = Heatmap(Heatmap.MODES[0], const.HEATMAP_WINDOW, const.HEATMAP_MAX_AGE,
+                                       const.HEATMAP_PALETTE)
+            except ValueError as error:
+                self.status_texts['heatmap'] = str(error)
+                return
+            self.level.add_observer(self.heatmap)
+            self.level.heatmap = self.heatmap
+
+        elif self.heatmap.mode != Heatmap.MODES[-1]:
+            self.heatmap.mode = Heatmap.MODES[Heatmap.MODES.index(self.heatmap.mode) + 1]
+
+        else:
+            self.level.remove_observer(self.heatmap)
+            self.level.heatmap = None
+            self.heatmap = None
+            self.status_texts.pop('heatmap', None)
+            return
+
+        self.status_texts['heatmap'] = f'Heatmap: {self.heatmap.mode}.'
+
+    def dump_profile(self) -> None:
+        """
+        Writes the frames recorded by the profiler to a CSV file in the working directory.
+        :return: None
+        """
+
+        self.profiler.dump_csv(const.PROFILE_DUMP_FILE.format(timestamp=time.strftime('%Y%m%d_%H%M%S')))
+
+    def start_recording(self) -> None:
+        """
+        Starts recording the level to a file in the working directory.
+        The recorder drops frames instead of stalling the game when its encoder process falls behind.
+        :return: None
+        """
+
+        if not self.level.in_memory:
+            self.status_texts['record'] = 'Tiled levels cannot be recorded.'
+            return
+
+        path = const.EXPORT_FILE.format(timestamp=time.strftime('%Y%m%d_%H%M%S'))
+        if const.EXPORT_FORMAT == 'gif':
+            path += '.gif'
+        self.recorder = Recorder(path, const.EXPORT_FORMAT, self.level.nr_rows, self.level.nr_cols,
+                                 const.EXPORT_CELL_SIZE, const.EXPORT_STRIDE,
+                                 [self.level.dead_cell_color, self.level.alive_cell_color],
+                                 const.EXPORT_FRAME_DELAY, const.EXPORT_QUEUE_SIZE, block=False)
+        self.level.add_observer(self.recorder)
+        self.status_texts['record'] = 'Recording...'
+
+    def stop_recording(self) -> None:
+        """
+        Stops recording the level and waits for the recorded frames to be written.
+        :return: None
+        """
+
+        if self.recorder is None:
+            return
+
+        if self.recorder in self.level.observers:
+            self.level.remove_observer(self.recorder)
+        self.recorder.close()
+        self.status_texts['record'] = f'Recorded {self.recorder.describe()}.'
+        self.recorder = None
+
+    def take_session(self) -> Session:
+        """
+        Takes a snapshot of the session, which stays valid while the game goes on.
+        :return: Session, the snapshot.
+        """
+
+        def take_keyframe(level) -> Keyframe:
+            return Keyframe(bytes(level.current_state), level.generation, sorted(getattr(level, 'current_toggles', [])))
+
+        return Session(self.level_index, self.levels[self.level_index], self.level.nr_rows, self.level.nr_cols,
+                       take_keyframe(self.level), [entry.copy() for entry in self.level.history.entries],
+                       take_keyframe(self.level_copy) if self.is_ticking else None)
+
+    def save_session(self, wait: bool = False) -> None:
+        """
+        Saves the session to the session file in the background.
+        :param wait: bool, whether to wait for the save to finish.
+        :return: None
+        """
+
+        if not self.level.in_memory:
+            self.status_texts['session'] = 'Tiled levels are not saved.'
+            return
+
+        # A save in progress has an older snapshot, let it finish first
+        self.autosaver.wait()
+        self.autosaver.save(self.take_session())
+        if wait:
+            self.autosaver.wait()
+        if self.autosaver.error is not None:
+            self.status_texts['session'] = f'Could not save the session: {self.autosaver.error}'
+
+    def autosave(self) -> None:
+        """
+        Job of the scheduler saving the session in the background, unless a save is already in progress.
+        :return: None
+        """
+
+        if self.level.in_memory and self.autosaver.interval > 0:
+            self.autosaver.save(self.take_session())
+
+    def load_session(self) -> None:
+        """
+        Restores the session saved in the session file, advancing again if it was advancing.
+        :return: None
+        """
+
+        try:
+            session = Session.load(const.SESSION_FILE)
+            if (session.level_index >= len(self.levels) or self.levels[session.level_index] != session.level_file):
+                raise SessionError(f'The level {session.level_file} is not played anymore!')
+        except (OSError, SessionError) as error:
+            self.status_texts['session'] = f'Could not load the session: {error}'
+            return
+
+        self.restore_session(session)
+
+    def restore_session(self, session: Session) -> None:
+        """
+        Restores a session of the game's levels, advancing again if it was advancing.
+        :param session: Session, the session.
+        :return: None
+        """
+
+        self.untoggle_buttons()
+        self.is_ticking = False
+        self.is_paused = False
+        self.level_index = session.level_index
+        self.ready_level()
+        if (self.level.nr_rows, self.level.nr_cols) != (session.nr_rows, session.nr_cols):
+            self.status_texts['session'] = 'Could not load the session: the level changed size!'
+            return
+
+        self.restore_keyframe(self.level, session.current)
+        self.level.history.entries = session.history
+        if session.advanced_from is not None:
+            self.level_copy = self.level.__deepcopy__()
+            self.restore_keyframe(self.level_copy, session.advanced_from)
+            self.is_ticking = True
+            self.advance_button.toggled = True
+
+        self.check_cycle()
+        self.needs_redraw = True
+
+    @staticmethod
+    def restore_keyframe(level, keyframe: Keyframe) -> None:
+        """
+        Restores the state and toggles of a level.
+        :param level: Level, the level.
+        :param keyframe: Keyframe, the saved state.
+        :return: None
+        """
+
+        if hasattr(level, 'current_toggles'):
+            level.current_toggles = set(keyframe.toggles)
+            level.nr_toggles = len(level.current_toggles)
+        level.restore(keyframe.state, keyframe.generation)
+
+    def start_stats_log(self) -> None:
+        """
+        Starts logging the population statistics of every generation to a file in the working directory.
+        :return: None
+        """
+
+        path = const.STATS_FILE.format(timestamp=time.strftime('%Y%m%d_%H%M%S'))
+        if const.STATS_FORMAT == 'csv':
+            path += '.csv'
+        # The statistics are written by the scheduler, off the frames
+        self.stats_log = StatsLog(path, const.STATS_FORMAT, 0)
+        self.population_tracker = PopulationTracker()
+        self.population_tracker.listeners.append(self.stats_log.append)
+        self.level.add_observer(self.population_tracker)
+        self.status_texts['stats'] = 'Logging statistics...'
+
+    def stop_stats_log(self) -> None:
+        """
+        Stops logging the population statistics and writes the buffered ones out.
+        :return: None
+        """
+
+        if self.stats_log is None:
+            return
+
+        if self.population_tracker in self.level.observers:
+            self.level.remove_observer(self.population_tracker)
+        self.scheduler.wait('stats')
+        self.stats_log.close()
+        self.status_texts['stats'] = f'Logged {self.stats_log.nr_rows} generations to {self.stats_log.path}.'
+        self.population_tracker = None
+        self.stats_log = None
+
+    def flush_stats_log(self) -> Optional[Callable[[], None]]:
+        """
+        Job of the scheduler taking the buffered population statistics, to be written in a worker thread.
+        :return: Callable[[], None], the write of the statistics, or None if there are none.
+        """
+
+        if self.stats_log is None or self.stats_log.nr_buffered == 0:
+            return None
+        return functools.partial(self.stats_log.write, self.stats_log.take_buffer())
+
+    def handle_stats_error(self, error: Exception) -> None:
+        """
+        Shows the error of a write of the population statistics.
+        :param error: Exception, the error.
+        :return: None
+        """
+
+        self.status_texts['stats'] = f'Could not write the statistics: {error}'
+        self.needs_redraw = True
+
+    def start_input_log(self, path: str) -> None:
+        """
+        Starts logging the input of every frame, along with the session it starts from, so the run can be replayed.
+        :param path: str, the path of the input log.
+        :return: None
+        """
+
+        session = self.take_session().to_bytes(const.SESSION_COMPRESSION_LEVEL) if self.level.in_memory else None
+        self.input_log = InputLog(path, self.levels, self.level_index, session)
+
+    def stop_input_log(self) -> None:
+        """
+        Stops logging the input, ending the log with a digest of the level.
+        :return: None
+        """
+
+        if self.input_log is None:
+            return
+
+        self.input_log.close(self.level)
+        self.input_log = None
+
+    def start_replay(self, path: str, realtime: bool = False) -> None:
+        """
+        Goes back to the session an input log starts from, and replays its frames in the next run of the game.
+        Every frame of the replay is profiled. Autosaving is turned off, so the replay leaves the saved session alone.
+        :param path: str, the path of the input log.
+        :param realtime: bool, whether to replay the frames as fast as they were logged, or as fast as possible.
+        :return: None
+        :raises: SessionError if the file is not an input log, or was logged with other levels.
+        """
+
+        replay = InputReplay(path)
+        if replay.levels != self.levels:
+            raise SessionError('The input log was recorded with other levels!')
+
+        if replay.session is not None:
+            self.restore_session(Session.from_bytes(replay.session))
+        else:
+            self.untoggle_buttons()
+            self.is_ticking = False
+            self.is_paused = False
+            self.level_index = replay.level_index
+            self.ready_level()
+
+        self.input_replay = replay
+        self.replay_realtime = realtime
+        self.autosaver.interval = 0
+
+        self.profiler = FrameProfiler(const.PROFILER_PHASES, max(len(replay.frames), 1))
+        self.profiler.toggle()
+        self.overlay = PerformanceOverlay(self.level_x, self.level_y, self.profiler, self.window)
+
+    def update_memory_report(self) -> None:
+        """
+        Samples the memory of the game into the info panel, flagging what grew since the first level switch or Advance.
+        :return: None
+        """
+
+        sample = self.memory_profiler.sample(self)
+        growths = self.memory_profiler.check_growth(const.MEMORY_GROWTH_TOLERANCE)
+        self.status_texts['memory'] = f'Memory: {sample.describe()}.' + (f' Grew: {"; ".join(growths)}.' if growths else '')
+
+    def update_census(self) -> None:
+        """
+        Counts the objects of the shown state into the info panel, the most common first.
+        :return: None
+        """
+
+        if not self.level.in_memory:
+            self.status_texts['census'] = 'Objects: not counted on tiled levels.'
+            return
+
+        state = self.level.desired_state if self.level.show_desired else self.level.current_state
+        counts = self.census.count(state, self.level.nr_rows, self.level.nr_cols)
+        objects = ', '.join(f'{number} {name}' for name, number in list(counts.items())[:const.CENSUS_SHOWN_OBJECTS])
+        if len(counts) > const.CENSUS_SHOWN_OBJECTS:
+            objects += ', ...'
+        self.status_texts['census'] = f'Objects: {objects or "none"}.'
 
     # ------------------------------------------------------------------------------------------------- #
 
+    def draw_dirty_rect(self) -> None:
+        """
+        Redraws only the part of the level inside the dirty rectangle.
+        :return: None
+        """
+
+        self.dirty_rect = self.dirty_rect.clip(pygame.Rect(self.level_x, self.level_y,
+                                                           self.level_width, self.level_height))
+        self.window.set_clip(self.dirty_rect)
+        self.window.fill(color.white)
+        self.level.draw()
+        self.window.set_clip(None)
+        self.profiler.mark('level')
+
     def draw(self) -> None:
         """
         Draws the window.
@@ -312,18 +1138,29 @@ class Game:
 
         self.window.fill(color.white)
 
+        if self.show_census:
+            self.update_census()
+
         # Draw the info panel
         info_panel_rect = pygame.Rect(0, 0, self.width, self.info_panel_height)
         pygame.draw.rect(self.window, color.peru, info_panel_rect)
 
-        text = pygame.font.SysFont(const.INFO_PANEL_FONT, const.INFO_PANEL_FONT_SIZE).render(self.info_panel_text, True, color.white)
+        info_panel_text = ' '.join([self.info_panel_text, *self.status_texts.values()])
+        text = pygame.font.SysFont(const.INFO_PANEL_FONT, const.INFO_PANEL_FONT_SIZE).render(info_panel_text, True, color.white)
         text_rect = text.get_rect()
         text_rect.x = 5
         text_rect.y = info_panel_rect.height // 2 - text_rect.height // 2
 
         self.window.blit(text, text_rect)
+        self.profiler.mark('panel')
 
         # Draw the objects
         self.level.draw()
-        for button in self.buttons.values():
-            button.draw()
+        self.profiler.mark('level')
+        self.ui.draw()
+        self.profiler.mark('buttons')
+
+        # Draw the performance overlay
+        if self.show_overlay:
+            self.overlay.draw()
+            self.profiler.mark('overlay')
@@ -0,0 +1,197 @@
+"""
+Headless runner of levels.
+
+Ticks a level without a window as fast as the engine allows, and optionally logs its population statistics.
+With --memory-check, runs the game's levels through repeated rounds of level switches and Advance instead,
+and flags memory that keeps growing. With --soups, runs a random soup search over all cores instead, appending the
+outcome of every soup to a results file.
+
+Usage (from the repository root):
+    python -m src.headless data/sandbox_learning_the_game.txt --generations 1000
+    python -m src.headless data/pricey_level_1.txt --engine numpy --stats stats.csv
+    python -m src.headless data/pricey_level_1.txt --stats stats --stats-format npy
+    python -m src.headless --memory-check --cycles 20
+    python -m src.headless --soups 10000 --seed 42 --workers 8 --results soups.jsonl
+"""
+
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import argparse
+import random
+import sys
+import time
+
+import pygame
+
+from src.analysis.population_tracker import PopulationTracker
+from src.analysis.stats_log import StatsLog
+from src.engine.registry import get_engine
+from src.level.level import Level
+from src.level.pricey_level import PriceyLevel
+from src.level.sandbox_level import SandboxLevel
+from src.level.tiled_level import TiledLevel
+from src.profiling.memory_profiler import MemoryProfiler
+from src.solver.soup_search import SoupSearch
+import src.constant.constant as const
+
+
+ROOT_DIR_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LEVEL_ASSETS_DIR_PATH = os.path.join(ROOT_DIR_PATH, 'assets', 'level')
+
+
+def load_level(level_file_path: str, window: pygame.Surface) -> Level:
+    """
+    Loads a level without a window, picking its type from the prefix of the file name like the game does.
+    :param level_file_path: str, the path of the level file.
+    :param window: pygame.Surface, the surface the level would draw on.
+    :return: Level, the loaded level.
+    """
+
+    if os.path.basename(level_file_path).startswith('pricey'):
+        return PriceyLevel(0, 0, 0, 0, level_file_path, LEVEL_ASSETS_DIR_PATH, window)
+    if TiledLevel.is_tiled(level_file_path):
+        return TiledLevel(0, 0, 0, 0, level_file_path, LEVEL_ASSETS_DIR_PATH, window)
+    return SandboxLevel(0, 0, 0, 0, level_file_path, LEVEL_ASSETS_DIR_PATH, window)
+
+
+def check_memory(nr_cycles: int, nr_ticks: int) -> bool:
+    """
+    Runs the game through rounds of switching through all its levels and advancing the level it ends on,
+    sampling the memory after every round, and reports the memory that kept growing after the first round.
+    :param nr_cycles: int, the number of rounds.
+    :param nr_ticks: int, the number of ticks of every Advance.
+    :return: bool, True if nothing grew.
+    """
+
+    # The game is imported here, as it needs a display
+    from src.game import Game
+
+    game = Game(const.WIDTH, const.HEIGHT, const.TITLE, const.FPS, os.path.join(ROOT_DIR_PATH, 'data'),
+                os.path.join(ROOT_DIR_PATH, 'assets'), const.LEVELS)
+    profiler = MemoryProfiler()
+    profiler.start()
+
+    for cycle in range(nr_cycles):
+        for _ in game.levels:
+            game.next_level()
+
+        game.toggle_advancing()
+        for _ in range(nr_ticks):
+            game.level.tick()
+        advancing = profiler.sample(game, 'advancing')
+        game.toggle_advancing()
+
+        sample = profiler.sample(game, 'after advance')
+        print(f'cycle {cycle + 1}: {sample.describe()}')
+        print(f'    while advancing: {advancing.describe()}')
+
+    # Only the samples taken after every round are compared, the ones taken while advancing hold a snapshot
+    profiler.samples = [sample for sample in profiler.samples if sample.label == 'after advance']
+    growths = profiler.check_growth(const.MEMORY_GROWTH_TOLERANCE)
+    for growth in growths:
+        print(f'GREW: {growth}')
+    if growths:
+        for site in profiler.get_top_growth(const.MEMORY_TOP_SITES):
+            print(f'    {site}')
+    else:
+        print(f'No growth after the first of {nr_cycles} cycles.')
+
+    profiler.stop()
+    return not growths
+
+
+def search_soups(args: argparse.Namespace) -> None:
+    """
+    Runs a random soup search and reports its throughput and the longest-lived soup.
+    :param args: argparse.Namespace, the arguments of the runner.
+    :return: None
+    """
+
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    max_generations = args.generations if args.generations is not None else const.SOUP_MAX_GENERATIONS
+    search = SoupSearch(seed, args.soup_size, args.density, const.SOUP_MARGIN, max_generations,
+                        const.SOUP_MAX_PERIOD, args.engine, const.SOUP_BATCH_SIZE)
+    print(f'Searching {args.soups} soups of {args.soup_size}x{args.soup_size} cells with seed {seed}.')
+
+    for result in search.run(args.soups, args.results, args.workers, const.SOUP_REPORT_INTERVAL):
+        if result.nr_left:
+            print(f'{result.nr_soups}/{result.nr_soups + result.nr_left} soups, {result.soups_per_second:.1f} '
+                  f'soups/s, {result.soups_per_second_per_core:.1f} soups/s per core')
+    if result.nr_skipped:
+        print(f'Skipped {result.nr_skipped} soups already in {args.results}.')
+    print(f'Ran {result.nr_soups} soups, {result.nr_generations} generations, in {result.elapsed:.2f} s: '
+          f'{result.soups_per_second:.1f} soups/s, {result.soups_per_second_per_core:.1f} soups/s per core '
+          f'over {result.nr_workers} workers.')
+    if result.nr_unstable:
+        print(f'{result.nr_unstable} soups did not stabilize within {max_generations} generations.')
+    if result.longest is not None:
+        print(f'Longest lifespan: soup {result.longest.index}, stable from generation {result.longest.lifespan} '
+              f'with {result.longest.population} cells.')
+    for name, count in list(result.census.items())[:const.CENSUS_SHOWN_OBJECTS]:
+        print(f'    {count} {name}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Ticks a level without a window.')
+    parser.add_argument('level', nargs='?', help='the level file to run')
+    parser.add_argument('--generations', type=int, default=None,
+                        help='the number of generations to run (default: 1000), or that a soup runs for at most')
+    parser.add_argument('--engine', default=const.ENGINE, help='the engine used to tick the level')
+    parser.add_argument('--stats', help='the CSV file or the directory of .npy chunks to log the statistics to')
+    parser.add_argument('--stats-format', choices=StatsLog.FORMATS, default=const.STATS_FORMAT,
+                        help='the format of the statistics log')
+    parser.add_argument('--memory-check', action='store_true',
+                        help="check the game's memory over repeated level switches and Advance instead")
+    parser.add_argument('--cycles', type=int, default=const.MEMORY_CHECK_CYCLES,
+                        help='the number of rounds of the memory check')
+    parser.add_argument('--soups', type=int, help='run a random soup search of this many soups instead')
+    parser.add_argument('--seed', type=int, help='the seed of the soup search (default: a random one)')
+    parser.add_argument('--soup-size', type=int, default=const.SOUP_SIZE,
+                        help='the number of rows and columns of a soup')
+    parser.add_argument('--density', type=float, default=const.SOUP_DENSITY,
+                        help='the probability of a cell of a soup to be alive')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='the number of worker processes of the soup search (default: one per core)')
+    parser.add_argument('--results', default=const.SOUP_RESULTS_FILE,
+                        help='the JSON lines file the outcomes of the soups are appended to')
+    args = parser.parse_args()
+
+    if args.soups is not None:
+        search_soups(args)
+        return
+
+    pygame.init()
+    if args.memory_check:
+        passed = check_memory(args.cycles, const.MEMORY_CHECK_TICKS)
+        pygame.quit()
+        sys.exit(0 if passed else 1)
+    if args.level is None:
+        parser.error('a level file is needed unless --memory-check or --soups is given')
+    generations = args.generations if args.generations is not None else 1000
+
+    level = load_level(args.level, pygame.Surface((0, 0)))
+    level.engine = get_engine(args.engine)
+
+    tracker = PopulationTracker()
+    stats_log = None
+    if args.stats:
+        stats_log = StatsLog(args.stats, args.stats_format, const.STATS_BUFFER_SIZE)
+
+    start = time.perf_counter()
+    stats = None
+    for stats in tracker.follow(level, generations):
+        if stats_log is not None:
+            stats_log.append(stats)
+    if stats_log is not None:
+        stats_log.close()
+    elapsed = time.perf_counter() - start
+
+    pygame.quit()
+    print(f'Ran {generations} generations in {elapsed:.2f} s '
+          f'({generations / max(elapsed, 1e-9):.0f} generations/s).')
+    print(f'Final population {stats.population}, bounding box {stats.bounding_box}.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+class Brush:
+    """
+    Class for the drag-to-paint brush.
+    Collects the cells under the mouse while it is dragged over a level. The cells are painted with the
+    opposite of the state of the first cell of the stroke, so a stroke either draws or erases.
+    The collected cells are applied to the level in batches, once per frame, as a single edit of the stroke.
+    """
+
+    def __init__(self) -> None:
+        self.is_painting = False
+        self.paint_value = None
+        self.stroke = 0
+
+        self.last_cell = None
+        self.painted: set[int] = set()
+        self.pending: list[int] = []
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def begin(self, level, x_pos: int, y_pos: int) -> bool:
+        """
+        Starts a stroke at the given position.
+        :param level: Level, the painted level.
+        :param x_pos: int, the x position of the mouse.
+        :param y_pos: int, the y position of the mouse.
+        :return: bool, True if the stroke started, False if the position is outside the level.
+        """
+
+        cell = level.camera.screen_to_cell(x_pos, y_pos)
+        if cell is None:
+            return False
+
+        self.is_painting = True
+        self.paint_value = 1 - level.current_state[cell[0] * level.nr_cols + cell[1]]
+        self.stroke += 1
+
+        self.last_cell = None
+        self.painted = set()
+        self.pending = []
+        self.paint_line(level, cell)
+        return True
+
+    def move(self, level, x_pos: int, y_pos: int) -> None:
+        """
+        Extends the stroke to the given position, painting every cell on the way from the last position.
+        :param level: Level, the painted level.
+        :param x_pos: int, the x position of the mouse.
+        :param y_pos: int, the y position of the mouse.
+        :return: None
+        """
+
+        if not self.is_painting:
+            return
+
+        self.paint_line(level, level.camera.screen_to_grid(x_pos, y_pos))
+
+    def end(self) -> None:
+        """
+        Ends the stroke. The cells that were not flushed yet are kept until the next flush.
+        :return: None
+        """
+
+        self.is_painting = False
+        self.last_cell = None
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def paint_line(self, level, cell: tuple[int, int]) -> None:
+        """
+        Collects the cells on the line from the last cell of the stroke to the given one.
+        Cells outside the level are skipped, so the stroke can leave the level and come back.
+        :param level: Level, the painted level.
+        :param cell: tuple[int, int], the row and column of the last cell of the line.
+        :return: None
+        """
+
+        row, col = cell
+        if self.last_cell is None:
+            self.last_cell = cell
+            self.paint_cell(level, row, col)
+            return
+        if self.last_cell == cell:
+            return
+
+        # Bresenham's line, so a fast drag does not leave gaps
+        row_0, col_0 = self.last_cell
+        d_row, d_col = abs(row - row_0), -abs(col - col_0)
+        step_row = 1 if row_0 < row else -1
+        step_col = 1 if col_0 < col else -1
+        error = d_row + d_col
+
+        while (row_0, col_0) != cell:
+            double_error = 2 * error
+            if double_error >= d_col:
+                error += d_col
+                row_0 += step_row
+            if double_error <= d_row:
+                error += d_row
+                col_0 += step_col
+            self.paint_cell(level, row_0, col_0)
+
+        self.last_cell = cell
+
+    def paint_cell(self, level, row: int, col: int) -> None:
+        """
+        Collects a cell of the stroke, once.
+        :param level: Level, the painted level.
+        :param row: int, the row of the cell.
+        :param col: int, the column of the cell.
+        :return: None
+        """
+
+        if not (0 <= row < level.nr_rows and 0 <= col < level.nr_cols):
+            return
+
+        cell_index = row * level.nr_cols + col
+        if cell_index not in self.painted:
+            self.painted.add(cell_index)
+            self.pending.append(cell_index)
+
+    def flush(self, level) -> list[int]:
+        """
+        Returns the collected cells that have to be toggled to get the paint value, and forgets them.
+        :param level: Level, the painted level.
+        :return: list[int], the indices of the cells to toggle.
+        """
+
+        if not self.pending:
+            return []
+
+        current_state = level.current_state
+        cell_indices = [cell_index for cell_index in self.pending if current_state[cell_index] != self.paint_value]
+        self.pending = []
+        return cell_indices
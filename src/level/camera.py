@@ -0,0 +1,146 @@
+import math
+from typing import Optional
+
+import src.constant.constant as const
+
+
+class Camera:
+    """
+    Class for a level's camera.
+    Maps between the cells of a level and the pixels of its rectangle, with zoom and pan.
+    The offsets are the row and column, in cells, shown at the top-left corner of the rectangle.
+    """
+
+    def __init__(self, x: int, y: int, width: int, height: int, nr_rows: int, nr_cols: int,
+                 cell_width: float, cell_height: float) -> None:
+        """
+        :param x: int, the x position of the level.
+        :param y: int, the y position of the level.
+        :param width: int, the width of the level.
+        :param height: int, the height of the level.
+        :param nr_rows: int, the number of rows of the level.
+        :param nr_cols: int, the number of columns of the level.
+        :param cell_width: float, the width of a cell when the camera is not zoomed.
+        :param cell_height: float, the height of a cell when the camera is not zoomed.
+        """
+
+        self.x, self.y = x, y
+        self.width, self.height = width, height
+        self.nr_rows, self.nr_cols = nr_rows, nr_cols
+        self.base_cell_width, self.base_cell_height = cell_width, cell_height
+
+        self.zoom = 1.0
+        self.row_offset, self.col_offset = 0.0, 0.0
+
+        # The zoom at which a cell reaches the maximum size
+        self.max_zoom = max(1.0, const.CAMERA_MAX_CELL_SIZE / max(min(cell_width, cell_height), 1e-9))
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    @property
+    def cell_width(self) -> float:
+        return self.base_cell_width * self.zoom
+
+    @property
+    def cell_height(self) -> float:
+        return self.base_cell_height * self.zoom
+
+    def is_detailed(self) -> bool:
+        """
+        Checks if the cells are big enough to be drawn one by one.
+        :return: bool, True if every cell is at least LOD_CELL_SIZE pixels wide and high.
+        """
+
+        return min(self.cell_width, self.cell_height) >= const.LOD_CELL_SIZE
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def zoom_at(self, x_pos: int, y_pos: int, factor: float) -> None:
+        """
+        Zooms in or out, keeping the point under the given position in place.
+        :param x_pos: int, the x position to zoom at.
+        :param y_pos: int, the y position to zoom at.
+        :param factor: float, the zoom factor. Bigger than 1 zooms in.
+        :return: None
+        """
+
+        col = self.col_offset + (x_pos - self.x) / self.cell_width
+        row = self.row_offset + (y_pos - self.y) / self.cell_height
+
+        self.zoom = min(max(self.zoom * factor, 1.0), self.max_zoom)
+
+        self.col_offset = col - (x_pos - self.x) / self.cell_width
+        self.row_offset = row - (y_pos - self.y) / self.cell_height
+        self.clamp()
+
+    def pan(self, dx: int, dy: int) -> None:
+        """
+        Moves the view by the given number of pixels, like dragging the level.
+        :param dx: int, the horizontal movement in pixels.
+        :param dy: int, the vertical movement in pixels.
+        :return: None
+        """
+
+        self.col_offset -= dx / self.cell_width
+        self.row_offset -= dy / self.cell_height
+        self.clamp()
+
+    def clamp(self) -> None:
+        """
+        Keeps the view inside the level.
+        :return: None
+        """
+
+        self.col_offset = min(max(self.col_offset, 0.0), max(0.0, self.nr_cols - self.width / self.cell_width))
+        self.row_offset = min(max(self.row_offset, 0.0), max(0.0, self.nr_rows - self.height / self.cell_height))
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def get_visible_cells(self) -> tuple[int, int, int, int]:
+        """
+        Returns the cells that are at least partially inside the level's rectangle.
+        :return: tuple[int, int, int, int], the first row, the first column, and the rows and columns after the last.
+        """
+
+        first_row, first_col = int(self.row_offset), int(self.col_offset)
+        end_row = min(self.nr_rows, math.ceil(self.row_offset + self.height / self.cell_height))
+        end_col = min(self.nr_cols, math.ceil(self.col_offset + self.width / self.cell_width))
+        return first_row, first_col, end_row, end_col
+
+    def cell_to_screen(self, row: float, col: float) -> tuple[int, int]:
+        """
+        Returns the position of the top-left corner of a cell on the screen.
+        :param row: float, the row of the cell.
+        :param col: float, the column of the cell.
+        :return: tuple[int, int], the x and y position of the cell.
+        """
+
+        return (self.x + round((col - self.col_offset) * self.cell_width),
+                self.y + round((row - self.row_offset) * self.cell_height))
+
+    def screen_to_grid(self, x_pos: int, y_pos: int) -> tuple[int, int]:
+        """
+        Returns the row and column under the given position, even if they are outside the level.
+        :param x_pos: int, the x position.
+        :param y_pos: int, the y position.
+        :return: tuple[int, int], the row and column under the position.
+        """
+
+        return (math.floor(self.row_offset + (y_pos - self.y) / self.cell_height),
+                math.floor(self.col_offset + (x_pos - self.x) / self.cell_width))
+
+    def screen_to_cell(self, x_pos: int, y_pos: int) -> Optional[tuple[int, int]]:
+        """
+        Returns the cell under the given position.
+        :param x_pos: int, the x position.
+        :param y_pos: int, the y position.
+        :return: tuple[int, int], the row and column of the cell, or None if the position is outside the level.
+        """
+
+        if not (self.x <= x_pos < self.x + self.width and self.y <= y_pos < self.y + self.height):
+            return None
+
+        row, col = self.screen_to_grid(x_pos, y_pos)
+        if row < 0 or row >= self.nr_rows or col < 0 or col >= self.nr_cols:
+            return None
+        return row, col
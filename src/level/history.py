@@ -0,0 +1,51 @@
+class EditHistory:
+    """
+    Class for the edit history of a level.
+    Every entry holds the cells toggled by one edit. Toggling them again reverts the edit.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        """
+        :param max_entries: int, the number of entries kept. The oldest entries are dropped first.
+        """
+
+        self.max_entries = max_entries
+        self.entries: list[list[int]] = []
+        self.last_stroke = None
+
+    def record(self, cell_indices: list[int], stroke: int = None) -> None:
+        """
+        Adds an edit to the history. An edit of the same brush stroke as the last one extends its entry.
+        :param cell_indices: list[int], the indices of the toggled cells.
+        :param stroke: int, the brush stroke of the edit, or None if the edit is not part of a stroke.
+        :return: None
+        """
+
+        if stroke is not None and stroke == self.last_stroke and self.entries:
+            self.entries[-1].extend(cell_indices)
+            return
+
+        self.entries.append(list(cell_indices))
+        self.last_stroke = stroke
+        if len(self.entries) > self.max_entries:
+            del self.entries[0]
+
+    def pop(self) -> list[int]:
+        """
+        Removes the last entry of the history.
+        :return: list[int], the indices of the cells toggled by the last edit, or None if the history is empty.
+        """
+
+        self.last_stroke = None
+        if not self.entries:
+            return None
+        return self.entries.pop()
+
+    def clear(self) -> None:
+        """
+        Removes every entry of the history.
+        :return: None
+        """
+
+        self.entries = []
+        self.last_stroke = None
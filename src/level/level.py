@@ -1,6 +1,27 @@
-import os
 import pygame
 from abc import ABC, abstractmethod
+from typing import Iterator, Optional
+
+from src.engine.boundary import BOUNDARIES, DEAD
+from src.engine.cell_buffer import CellBuffer
+from src.engine.python_engine import PythonEngine
+from src.engine.registry import get_engine
+from src.error import GameError
+from src.level.camera import Camera
+from src.level.history import EditHistory
+from src.level.level_observer import LevelObserver
+import src.constant.constant as const
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# The storages of a level's state, set in the level file header: a CellBuffer in memory, or tiles in a tile file
+MEMORY = 'memory'
+TILED = 'tiled'
+STORAGES = [MEMORY, TILED]
 
 
 class Level(ABC):
@@ -9,6 +30,9 @@ class Level(ABC):
     Represents the playing field for Conway's Game of Life.
     """
 
+    # Whether the whole state is kept in a CellBuffer. Features that copy or serialize the whole board need it.
+    in_memory = True
+
     def __init__(self, x: int, y: int, width: int, height: int,
                  data_file: str, assets_dir_path: str, window: pygame.Surface) -> None:
         """
@@ -26,18 +50,33 @@ class Level(ABC):
         self.assets_dir_path = assets_dir_path
         self.window = window
 
-        self.initial_state = []
-        self.current_state = []
+        self.initial_state = CellBuffer()
+        self.current_state = CellBuffer()
         self.desired_state = []
         self.nr_rows, self.nr_cols = None, None
+        self.boundary = DEAD
+        self.storage = MEMORY
         self.load_data()
 
+        # The buffer the next generation is computed into, swapped with the current state on every tick
+        self.next_state = CellBuffer(len(self.current_state)) if self.in_memory else None
+
+        self.engine = get_engine(const.ENGINE)
+        self.generation = 0
+        self.observers: list[LevelObserver] = []
+        self.history = EditHistory(const.HISTORY_MAX_ENTRIES)
+
         self.show_desired = False
+        # The heatmap the current state is colored by instead of drawn with the cell images, if any
+        self.heatmap = None
         self.cell_width, self.cell_height = None, None
         self.alive_cell_image, self.dead_cell_image = None, None
 
         self.load_assets()
 
+        self.camera = Camera(self.x, self.y, self.width, self.height, self.nr_rows, self.nr_cols,
+                             self.cell_width, self.cell_height)
+
     # ------------------------------------------------------------------------------------------------- #
 
     @abstractmethod
@@ -49,13 +88,52 @@ class Level(ABC):
 
         pass
 
+    def read_header(self, line: str) -> None:
+        """
+        Reads the size line of the level file header: the number of rows and columns,
+        optionally followed by the boundary mode and the storage.
+        :param line: str, the line.
+        :return: None
+        :raises: GameError if the boundary mode or the storage is invalid.
+        """
+
+        tokens = line.split()
+        self.nr_rows, self.nr_cols = int(tokens[0]), int(tokens[1])
+        for token in tokens[2:]:
+            if token in BOUNDARIES:
+                self.boundary = token
+            elif token in STORAGES:
+                self.storage = token
+            else:
+                raise GameError(f'Invalid boundary mode or storage {token!r}!')
+
     def reset(self) -> None:
         """
         Resets the level to its initial state.
         :return: None
         """
 
-        self.current_state = self.initial_state.copy()
+        self.current_state[:] = self.initial_state
+        self.generation = 0
+        self.history.clear()
+
+        for observer in self.observers:
+            observer.on_reset(self)
+
+    def restore(self, state: bytes, generation: int) -> None:
+        """
+        Replaces the current state with a saved one.
+        :param state: bytes, the saved state of the level, one byte per cell.
+        :param generation: int, the generation of the saved state.
+        :return: None
+        """
+
+        self.current_state[:] = state
+        self.generation = generation
+        self.history.clear()
+
+        for observer in self.observers:
+            observer.on_reset(self)
 
     @abstractmethod
     def load_assets(self) -> None:
@@ -80,6 +158,49 @@ class Level(ABC):
         elif self.current_state[cell_index] == 1:
             self.current_state[cell_index] = 0
 
+        for observer in self.observers:
+            observer.on_toggle(self, [cell_index])
+
+    def apply_edits(self, cell_indices: list[int], stroke: int = None, record: bool = True) -> list[int]:
+        """
+        Toggles a batch of distinct cells at once: one write of the state, one notification of the observers
+        and one entry in the edit history.
+        :param cell_indices: list[int], the indices of the cells to toggle.
+        :param stroke: int, the brush stroke of the edit. Edits of the same stroke share a history entry.
+        :param record: bool, whether to add the edit to the history.
+        :return: list[int], the indices of the toggled cells.
+        """
+
+        if not cell_indices:
+            return []
+
+        if np is not None and self.in_memory:
+            # One XOR over all the cells, written through a view of the state's buffer
+            np.frombuffer(self.current_state, dtype=np.uint8)[np.asarray(cell_indices, dtype=np.intp)] ^= 1
+        else:
+            current_state = self.current_state
+            for cell_index in cell_indices:
+                current_state[cell_index] = 1 - current_state[cell_index]
+
+        for observer in self.observers:
+            observer.on_toggle(self, cell_indices)
+
+        if record:
+            self.history.record(cell_indices, stroke)
+        return cell_indices
+
+    def undo(self) -> list[int]:
+        """
+        Reverts the last entry of the edit history.
+        :return: list[int], the indices of the toggled cells.
+        """
+
+        cell_indices = self.history.pop()
+        if cell_indices is None:
+            return []
+
+        return self.apply_edits(cell_indices, record=False)
+
     @abstractmethod
     def tick(self) -> None:
         """
@@ -89,8 +210,63 @@ class Level(ABC):
 
         pass
 
+    def advance_to(self, next_state: CellBuffer, changed: list[int]) -> None:
+        """
+        Replaces the current state with the next generation and notifies the observers.
+        The replaced state becomes the buffer the generation after is computed into. A state stepped in place
+        is passed as the next state.
+        :param next_state: CellBuffer, the next state of the level.
+        :param changed: list[int], the indices of the cells that differ between the current and the next state.
+        :return: None
+        """
+
+        if next_state is not self.current_state:
+            self.current_state, self.next_state = next_state, self.current_state
+        self.generation += 1
+        self.history.clear()
+
+        for observer in self.observers:
+            observer.on_tick(self, changed)
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def add_observer(self, observer: LevelObserver) -> None:
+        """
+        Adds an observer to the level and lets it read the current state.
+        :param observer: LevelObserver, the observer to add.
+        :return: None
+        """
+
+        self.observers.append(observer)
+        observer.on_reset(self)
+
+    def remove_observer(self, observer: LevelObserver) -> None:
+        """
+        Removes an observer from the level.
+        :param observer: LevelObserver, the observer to remove.
+        :return: None
+        """
+
+        self.observers.remove(observer)
+
     # ------------------------------------------------------------------------------------------------- #
 
+    def get_alive_cells(self) -> Iterator[int]:
+        """
+        Yields the indices of the alive cells of the current state.
+        :return: Iterator[int], the indices of the alive cells.
+        """
+
+        if not self.in_memory:
+            yield from self.current_state.get_alive_cells()
+            return
+
+        current_state = self.current_state
+        cell_index = current_state.find(1)
+        while cell_index != -1:
+            yield cell_index
+            cell_index = current_state.find(1, cell_index + 1)
+
     def get_neighbors(self, cell_index: int) -> list[int]:
         """
         Returns the indices of the neighbors of the cell at the given row and column.
@@ -98,24 +274,7 @@ class Level(ABC):
         :return: list[int], the indices of the neighbors of the cell at the given row and column.
         """
 
-        neighbors = []
-        if cell_index % self.nr_cols != 0:
-            neighbors.append(cell_index - 1)
-        if cell_index % self.nr_cols != self.nr_cols - 1:
-            neighbors.append(cell_index + 1)
-        if cell_index >= self.nr_cols:
-            neighbors.append(cell_index - self.nr_cols)
-        if cell_index < self.nr_cols * (self.nr_rows - 1):
-            neighbors.append(cell_index + self.nr_cols)
-        if cell_index % self.nr_cols != 0 and cell_index >= self.nr_cols:
-            neighbors.append(cell_index - self.nr_cols - 1)
-        if cell_index % self.nr_cols != self.nr_cols - 1 and cell_index >= self.nr_cols:
-            neighbors.append(cell_index - self.nr_cols + 1)
-        if cell_index % self.nr_cols != 0 and cell_index < self.nr_cols * (self.nr_rows - 1):
-            neighbors.append(cell_index + self.nr_cols - 1)
-        if cell_index % self.nr_cols != self.nr_cols - 1 and cell_index < self.nr_cols * (self.nr_rows - 1):
-            neighbors.append(cell_index + self.nr_cols + 1)
-        return neighbors
+        return PythonEngine.get_neighbors(cell_index, self.nr_rows, self.nr_cols, self.boundary)
 
     def get_number_of_alive_neighbors(self, cell_index: int) -> int:
         """
@@ -132,6 +291,19 @@ class Level(ABC):
 
     # ------------------------------------------------------------------------------------------------- #
 
+    def get_cell_index(self, x_pos: int, y_pos: int) -> Optional[int]:
+        """
+        Returns the index of the cell under the given position, through the camera.
+        :param x_pos: int, the x position.
+        :param y_pos: int, the y position.
+        :return: int, the index of the cell, or None if the position is outside the level.
+        """
+
+        cell = self.camera.screen_to_cell(x_pos, y_pos)
+        if cell is None:
+            return None
+        return cell[0] * self.nr_cols + cell[1]
+
     @abstractmethod
     def handle_mouse_click(self, x_pos: int, y_pos: int) -> None:
         """
@@ -0,0 +1,41 @@
+from abc import ABC, abstractmethod
+
+
+class LevelObserver(ABC):
+    """
+    Abstract class for a level observer.
+    Gets notified of every change of a level's current state, so it can keep derived data up to date
+    by looking only at the cells that changed.
+    """
+
+    @abstractmethod
+    def on_reset(self, level) -> None:
+        """
+        Called when the observer is added to a level and when the level's state is replaced as a whole.
+        :param level: Level, the observed level.
+        :return: None
+        """
+
+        pass
+
+    @abstractmethod
+    def on_toggle(self, level, cell_indices: list[int]) -> None:
+        """
+        Called after cells of the level were toggled, by a click or a brush stroke.
+        :param level: Level, the observed level.
+        :param cell_indices: list[int], the indices of the toggled cells.
+        :return: None
+        """
+
+        pass
+
+    @abstractmethod
+    def on_tick(self, level, changed: list[int]) -> None:
+        """
+        Called after the level advanced to its next generation.
+        :param level: Level, the observed level.
+        :param changed: list[int], the indices of the cells that changed.
+        :return: None
+        """
+
+        pass
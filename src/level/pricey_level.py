@@ -42,8 +42,8 @@ class PriceyLevel(SandboxLevel):
             # Get the number of maximum toggles
             self.max_toggles = int(lines[0].split()[0])
 
-            # Get the number of rows and columns
-            self.nr_rows, self.nr_cols = map(int, lines[1].split())
+            # Get the number of rows and columns, and the boundary mode
+            self.read_header(lines[1])
 
             # Get the initial state
             for line in lines[2:]:
@@ -71,36 +71,28 @@ class PriceyLevel(SandboxLevel):
 
     # ------------------------------------------------------------------------------------------------- #
 
-    def handle_mouse_click(self, x_pos: int, y_pos: int) -> None:
+    def apply_edits(self, cell_indices: list[int], stroke: int = None, record: bool = True) -> list[int]:
         """
-        Handles a mouse click event.
-        Checks if the click was inside the level and if it was, toggles the cell if there are still available toggles.
-        :param x_pos: int, the x position of the mouse click.
-        :param y_pos: int, the y position of the mouse click.
-        :return: None
+        Toggles a batch of distinct cells at once, within the available toggles.
+        Untoggling a toggled cell gives its toggle back, so those edits are always applied. The other edits
+        are applied in order while there are still available toggles, and the rest are dropped.
+        The toggles are counted for the whole batch before the state is written.
+        :param cell_indices: list[int], the indices of the cells to toggle.
+        :param stroke: int, the brush stroke of the edit. Edits of the same stroke share a history entry.
+        :param record: bool, whether to add the edit to the history.
+        :return: list[int], the indices of the toggled cells.
         """
 
-        # Get the cell coordinates
-        cell_x = int((x_pos - self.x) // self.cell_width)
-        cell_y = int((y_pos - self.y) // self.cell_height)
-
-        # Check if the cell is in the level
-        if cell_x < 0 or cell_x >= self.nr_cols or cell_y < 0 or cell_y >= self.nr_rows:
-            return
-
-        # Toggle the cell if there are still available toggles
-        cell_index = cell_y * self.nr_cols + cell_x
-        if cell_index in self.current_toggles:
-            self.toggle_cell(cell_index)
-
-            self.current_toggles.remove(cell_index)
-            self.nr_toggles -= 1
+        untoggled = [cell_index for cell_index in cell_indices if cell_index in self.current_toggles]
+        available_toggles = self.max_toggles - self.nr_toggles + len(untoggled)
+        toggled = [cell_index for cell_index in cell_indices
+                   if cell_index not in self.current_toggles][:max(available_toggles, 0)]
 
-        elif self.nr_toggles < self.max_toggles:
-            self.toggle_cell(cell_index)
+        self.current_toggles.difference_update(untoggled)
+        self.current_toggles.update(toggled)
+        self.nr_toggles = len(self.current_toggles)
 
-            self.current_toggles.add(cell_index)
-            self.nr_toggles += 1
+        return super().apply_edits(untoggled + toggled, stroke, record)
 
     # ------------------------------------------------------------------------------------------------- #
 
@@ -116,6 +108,10 @@ class PriceyLevel(SandboxLevel):
         copy.nr_toggles = self.nr_toggles
         copy.current_toggles = self.current_toggles
 
+        copy.engine = self.engine
+        copy.camera = self.camera
+        copy.generation = self.generation
+
         copy.initial_state = self.initial_state
         copy.current_state = self.current_state
         copy.desired_state = self.desired_state
@@ -135,8 +131,13 @@ class PriceyLevel(SandboxLevel):
         copy.nr_toggles = self.nr_toggles
         copy.current_toggles = self.current_toggles.copy()
 
-        copy.initial_state = self.initial_state.copy()
+        copy.engine = self.engine
+        copy.camera = self.camera
+        copy.generation = self.generation
+
+        # The initial and desired states are never written to, so they can be shared
+        copy.initial_state = self.initial_state
         copy.current_state = self.current_state.copy()
-        copy.desired_state = self.desired_state.copy()
+        copy.desired_state = self.desired_state
 
         return copy
@@ -1,8 +1,17 @@
+import math
+import os
 import pygame
 
+from src.analysis.heatmap import Heatmap
+from src.engine.cell_buffer import CellBuffer
 from src.level.level import Level
 import src.constant.color as color
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 class SandboxLevel(Level):
     """
@@ -32,11 +41,11 @@ class SandboxLevel(Level):
         """
 
         with open(self.data_file, 'r') as file:
-            # Get the number of rows and columns
-            self.nr_rows, self.nr_cols = map(int, file.readline().split())
+            # Get the number of rows and columns, and the boundary mode
+            self.read_header(file.readline())
 
-            self.initial_state = [0 for _ in range(self.nr_rows * self.nr_cols)]
-            self.current_state = [0 for _ in range(self.nr_rows * self.nr_cols)]
+            self.initial_state = CellBuffer(self.nr_rows * self.nr_cols)
+            self.current_state = CellBuffer(self.nr_rows * self.nr_cols)
             self.desired_state = [-1 for _ in range(self.nr_rows * self.nr_cols)]
 
     def load_assets(self) -> None:
@@ -46,17 +55,32 @@ class SandboxLevel(Level):
         :return: None
         """
 
-        # Compute the cell's width and height
-        self.cell_width = int(self.width // self.nr_cols)
-        self.cell_height = int(self.height // self.nr_rows)
+        # Compute the cell's width and height, which can be less than a pixel on big levels
+        self.cell_width = self.width // self.nr_cols or self.width / self.nr_cols
+        self.cell_height = self.height // self.nr_rows or self.height / self.nr_rows
 
         # Load the level's assets
-        self.alive_cell_image = pygame.image.load(self.assets_dir_path + '\\alive_cell.png')
-        self.dead_cell_image = pygame.image.load(self.assets_dir_path + '\\dead_cell.png')
+        self.alive_cell_asset = pygame.image.load(os.path.join(self.assets_dir_path, 'alive_cell.png'))
+        self.dead_cell_asset = pygame.image.load(os.path.join(self.assets_dir_path, 'dead_cell.png'))
+
+        # The colors used when the cells are too small to be drawn one by one
+        self.alive_cell_color = pygame.transform.average_color(self.alive_cell_asset)[:3]
+        self.dead_cell_color = pygame.transform.average_color(self.dead_cell_asset)[:3]
 
         # Scale the level's assets
-        self.alive_cell_image = pygame.transform.scale(self.alive_cell_image, (self.cell_width, self.cell_height))
-        self.dead_cell_image = pygame.transform.scale(self.dead_cell_image, (self.cell_width, self.cell_height))
+        self.scale_cell_images(self.cell_width, self.cell_height)
+
+    def scale_cell_images(self, cell_width: float, cell_height: float) -> None:
+        """
+        Scales the cell images to the given cell size, rounded up so that neighboring cells leave no gaps.
+        :param cell_width: float, the width of a cell.
+        :param cell_height: float, the height of a cell.
+        :return: None
+        """
+
+        size = (math.ceil(cell_width), math.ceil(cell_height))
+        self.alive_cell_image = pygame.transform.scale(self.alive_cell_asset, size)
+        self.dead_cell_image = pygame.transform.scale(self.dead_cell_asset, size)
 
     # ------------------------------------------------------------------------------------------------- #
 
@@ -66,14 +90,9 @@ class SandboxLevel(Level):
         :return: None
         """
 
-        copy_current_state = self.current_state.copy()
-        for cell_index in range(len(self.current_state)):
-            alive_neighbors = self.get_number_of_alive_neighbors(cell_index)
-            if self.current_state[cell_index] == 0 and alive_neighbors == 3:
-                copy_current_state[cell_index] = 1
-            elif self.current_state[cell_index] == 1 and (alive_neighbors < 2 or alive_neighbors > 3):
-                copy_current_state[cell_index] = 0
-        self.current_state = copy_current_state.copy()
+        changed = self.engine.step_into(self.current_state, self.next_state, self.nr_rows, self.nr_cols,
+                                        self.boundary)
+        self.advance_to(self.next_state, changed)
 
     # ------------------------------------------------------------------------------------------------- #
 
@@ -86,17 +105,13 @@ class SandboxLevel(Level):
         :return: None
         """
 
-        # Get the cell coordinates
-        cell_x = int((x_pos - self.x) // self.cell_width)
-        cell_y = int((y_pos - self.y) // self.cell_height)
-
-        # Check if the cell is in the level
-        if cell_x < 0 or cell_x >= self.nr_cols or cell_y < 0 or cell_y >= self.nr_rows:
+        # Get the cell under the mouse and check if it is in the level
+        cell_index = self.get_cell_index(x_pos, y_pos)
+        if cell_index is None:
             return
 
         # Toggle the cell
-        cell_index = cell_y * self.nr_cols + cell_x
-        self.toggle_cell(cell_index)
+        self.apply_edits([cell_index])
 
     # ------------------------------------------------------------------------------------------------- #
 
@@ -106,73 +121,163 @@ class SandboxLevel(Level):
         :return: None
         """
 
-        # Draw the cells
-        cell_x, cell_y = self.x, self.y
-        for row in range(self.nr_rows):
-            for col in range(self.nr_cols):
-                # Get the cell state
-                cell_state = self.current_state[row * self.nr_cols + col]
-                if cell_state == 0:
-                    self.window.blit(self.dead_cell_image, (cell_x, cell_y))
-                else:
-                    self.window.blit(self.alive_cell_image, (cell_x, cell_y))
+        self.draw_state(self.current_state, self.heatmap)
+
+    def draw_desired(self) -> None:
+        """
+        Draws the desired state of the level on the screen.
+        :return: None
+        """
+
+        self.draw_state(self.desired_state)
+
+    def draw_state(self, state: CellBuffer, heatmap: Heatmap = None) -> None:
+        """
+        Draws the part of the given state that the camera sees.
+        Big enough cells are drawn one by one, smaller ones as one pixel per block of cells.
+        :param state: CellBuffer, the state to draw.
+        :param heatmap: Heatmap, the heatmap to color the state by instead, if any.
+        :return: None
+        """
 
-                # Move to the next cell
-                cell_x += self.cell_width
+        clip = self.window.get_clip()
+        self.window.set_clip(pygame.Rect(self.x, self.y, self.width, self.height).clip(clip))
 
-            # Move to the next row
-            cell_x = self.x
-            cell_y += self.cell_height
+        if heatmap is not None:
+            self.draw_heatmap(state, heatmap)
+        elif self.camera.is_detailed():
+            self.draw_cells(state)
+        else:
+            self.draw_density(state)
 
-        # Draw the level's cells' borders
-        cell_x, cell_y = self.x, self.y
-        for row in range(self.nr_rows + 1):
-            pygame.draw.line(self.window, color.black, (cell_x, cell_y),
-                             (cell_x + self.nr_cols * self.cell_width, cell_y))
-            cell_y += self.cell_height
-
-        cell_x, cell_y = self.x, self.y
-        for col in range(self.nr_cols + 1):
-            pygame.draw.line(self.window, color.black, (cell_x, cell_y),
-                             (cell_x, cell_y + self.nr_rows * self.cell_height))
-            cell_x += self.cell_width
+        self.window.set_clip(clip)
 
-    def draw_desired(self) -> None:
+    def draw_cells(self, state: CellBuffer) -> None:
         """
-        Draws the desired state of the level on the screen.
+        Draws the visible cells of the given state one by one, with their borders.
+        :param state: CellBuffer, the state to draw.
         :return: None
         """
 
+        camera = self.camera
+        if self.alive_cell_image.get_size() != (math.ceil(camera.cell_width), math.ceil(camera.cell_height)):
+            self.scale_cell_images(camera.cell_width, camera.cell_height)
+
+        first_row, first_col, end_row, end_col = camera.get_visible_cells()
+        cell_xs = [camera.cell_to_screen(0, col)[0] for col in range(first_col, end_col + 1)]
+        cell_ys = [camera.cell_to_screen(row, 0)[1] for row in range(first_row, end_row + 1)]
+
         # Draw the cells
-        cell_x, cell_y = self.x, self.y
-        for row in range(self.nr_rows):
-            for col in range(self.nr_cols):
-                # Get the cell state
-                cell_state = self.desired_state[row * self.nr_cols + col]
-                if cell_state == 0:
-                    self.window.blit(self.dead_cell_image, (cell_x, cell_y))
+        cells = []
+        for row, cell_y in zip(range(first_row, end_row), cell_ys):
+            row_start = row * self.nr_cols
+            for col, cell_x in zip(range(first_col, end_col), cell_xs):
+                if state[row_start + col] == 0:
+                    cells.append((self.dead_cell_image, (cell_x, cell_y)))
                 else:
-                    self.window.blit(self.alive_cell_image, (cell_x, cell_y))
+                    cells.append((self.alive_cell_image, (cell_x, cell_y)))
+        self.window.blits(cells, False)
+
+        # Draw the level's cells' borders
+        for cell_y in cell_ys:
+            pygame.draw.line(self.window, color.black, (cell_xs[0], cell_y), (cell_xs[-1], cell_y))
+        for cell_x in cell_xs:
+            pygame.draw.line(self.window, color.black, (cell_x, cell_ys[0]), (cell_x, cell_ys[-1]))
+
+    def draw_density(self, state: CellBuffer) -> None:
+        """
+        Draws the visible part of the given state as one pixel per block of cells,
+        colored by the share of alive cells in the block.
+        :param state: CellBuffer, the state to draw.
+        :return: None
+        """
 
-                # Move to the next cell
-                cell_x += self.cell_width
+        camera = self.camera
+        first_row, first_col, end_row, end_col = camera.get_visible_cells()
+
+        # The number of cells per pixel, and the number of blocks that cover the visible cells
+        block_height, block_width = math.ceil(1 / camera.cell_height), math.ceil(1 / camera.cell_width)
+        nr_block_rows = math.ceil((end_row - first_row) / block_height)
+        nr_block_cols = math.ceil((end_col - first_col) / block_width)
+
+        if np is not None:
+            alive = self.count_blocks(state, first_row, first_col, end_row, end_col, block_height, block_width)
+
+            # The color of a block for every possible number of alive cells in it
+            density = np.linspace(0, 1, block_height * block_width + 1)[:, np.newaxis]
+            dead_cell_color = np.array(self.dead_cell_color, dtype=np.float64)
+            alive_cell_color = np.array(self.alive_cell_color, dtype=np.float64)
+            palette = (dead_cell_color + (alive_cell_color - dead_cell_color) * density).astype(np.uint8)
+
+            pixels = palette[alive]
+            surface = pygame.surfarray.make_surface(pixels.transpose(1, 0, 2))
+
+        else:
+            surface = pygame.Surface((nr_block_cols, nr_block_rows))
+            for block_row in range(nr_block_rows):
+                rows = range(first_row + block_row * block_height, min(end_row, first_row + (block_row + 1) * block_height))
+                for block_col in range(nr_block_cols):
+                    cols = range(first_col + block_col * block_width, min(end_col, first_col + (block_col + 1) * block_width))
+                    alive = sum(1 for row in rows for col in cols if state[row * self.nr_cols + col] != 0)
+                    density = alive / (block_height * block_width)
+                    surface.set_at((block_col, block_row), [round(dead + (alive - dead) * density) for dead, alive
+                                                            in zip(self.dead_cell_color, self.alive_cell_color)])
+
+        x, y = camera.cell_to_screen(first_row, first_col)
+        end_x, end_y = camera.cell_to_screen(first_row + nr_block_rows * block_height,
+                                             first_col + nr_block_cols * block_width)
+        self.window.blit(pygame.transform.scale(surface, (end_x - x, end_y - y)), (x, y))
+
+    def draw_heatmap(self, state: CellBuffer, heatmap: Heatmap) -> None:
+        """
+        Draws the visible part of the given state colored by a heatmap, in a single surface: one pixel per cell,
+        or per block of cells colored by its hottest cell when the cells are smaller than a pixel.
+        :param state: CellBuffer, the state to draw.
+        :param heatmap: Heatmap, the heatmap.
+        :return: None
+        """
 
-            # Move to the next row
-            cell_x = self.x
-            cell_y += self.cell_height
+        camera = self.camera
+        first_row, first_col, end_row, end_col = camera.get_visible_cells()
+        values = heatmap.get_values(state, first_row, first_col, end_row, end_col)
 
-        # Draw the level's cells' borders
-        cell_x, cell_y = self.x, self.y
-        for row in range(self.nr_rows + 1):
-            pygame.draw.line(self.window, color.black, (cell_x, cell_y),
-                             (cell_x + self.nr_cols * self.cell_width, cell_y))
-            cell_y += self.cell_height
-
-        cell_x, cell_y = self.x, self.y
-        for col in range(self.nr_cols + 1):
-            pygame.draw.line(self.window, color.black, (cell_x, cell_y),
-                             (cell_x, cell_y + self.nr_rows * self.cell_height))
-            cell_x += self.cell_width
+        block_height, block_width = 1, 1
+        if not camera.is_detailed():
+            block_height, block_width = math.ceil(1 / camera.cell_height), math.ceil(1 / camera.cell_width)
+            nr_block_rows = math.ceil((end_row - first_row) / block_height)
+            nr_block_cols = math.ceil((end_col - first_col) / block_width)
+            blocks = np.zeros((nr_block_rows * block_height, nr_block_cols * block_width), dtype=np.uint8)
+            blocks[:end_row - first_row, :end_col - first_col] = values
+            values = blocks.reshape(nr_block_rows, block_height, nr_block_cols, block_width).max(axis=(1, 3))
+
+        surface = pygame.surfarray.make_surface(heatmap.colors[values].transpose(1, 0, 2))
+
+        x, y = camera.cell_to_screen(first_row, first_col)
+        end_x, end_y = camera.cell_to_screen(first_row + values.shape[0] * block_height,
+                                             first_col + values.shape[1] * block_width)
+        self.window.blit(pygame.transform.scale(surface, (end_x - x, end_y - y)), (x, y))
+
+    def count_blocks(self, state: CellBuffer, first_row: int, first_col: int, end_row: int, end_col: int,
+                     block_height: int, block_width: int) -> 'np.ndarray':
+        """
+        Counts the alive cells of the visible blocks. Requires NumPy.
+        :param state: CellBuffer, the state.
+        :param first_row: int, the first visible row.
+        :param first_col: int, the first visible column.
+        :param end_row: int, the row after the last visible one.
+        :param end_col: int, the column after the last visible one.
+        :param block_height: int, the number of rows of a block.
+        :param block_width: int, the number of columns of a block.
+        :return: np.ndarray, the number of alive cells of every block.
+        """
+
+        nr_block_rows = math.ceil((end_row - first_row) / block_height)
+        nr_block_cols = math.ceil((end_col - first_col) / block_width)
+
+        board = np.asarray(state).reshape(self.nr_rows, self.nr_cols)
+        blocks = np.zeros((nr_block_rows * block_height, nr_block_cols * block_width), dtype=np.uint16)
+        blocks[:end_row - first_row, :end_col - first_col] = board[first_row:end_row, first_col:end_col] != 0
+        return blocks.reshape(nr_block_rows, block_height, nr_block_cols, block_width).sum(axis=(1, 3))
 
     # ------------------------------------------------------------------------------------------------- #
 
@@ -184,6 +289,10 @@ class SandboxLevel(Level):
 
         copy = SandboxLevel(self.x, self.y, self.width, self.height, self.data_file, self.assets_dir_path, self.window)
 
+        copy.engine = self.engine
+        copy.camera = self.camera
+        copy.generation = self.generation
+
         copy.initial_state = self.initial_state
         copy.current_state = self.current_state
         copy.desired_state = self.desired_state
@@ -199,8 +308,13 @@ class SandboxLevel(Level):
 
         copy = SandboxLevel(self.x, self.y, self.width, self.height, self.data_file, self.assets_dir_path, self.window)
 
-        copy.initial_state = self.initial_state.copy()
+        copy.engine = self.engine
+        copy.camera = self.camera
+        copy.generation = self.generation
+
+        # The initial and desired states are never written to, so they can be shared
+        copy.initial_state = self.initial_state
         copy.current_state = self.current_state.copy()
-        copy.desired_state = self.desired_state.copy()
+        copy.desired_state = self.desired_state
 
         return copy
@@ -0,0 +1,233 @@
+import threading
+from collections import deque
+
+from src.engine.cell_buffer import CellBuffer
+from src.engine.engine import Engine
+from src.engine.registry import get_engine
+from src.level.level_observer import LevelObserver
+
+
+# The memory taken by a changed cell of a cached generation: a slot of the list and an int object
+CHANGED_CELL_SIZE = 40
+
+
+class Speculator(LevelObserver):
+    """
+    Class for a speculative cache of the upcoming generations of a level.
+
+    While the game waits for input, idle or paused, a worker thread steps a snapshot of the level's state ahead,
+    up to depth generations or max_bytes of states, whichever comes first. A tick of the level is then served
+    from the cache instead of being computed. Only the engines that release the GIL for most of a step, the NumPy
+    and compiled ones, are run ahead, so the worker does not hold up the frame; a level stepped in pure Python,
+    including by the automatic engine when it selected the Python engine, is not.
+
+    The cache only holds while the level follows its own rules: any toggle, reset or restore of the level,
+    and adding the speculator to another level, drops it at once, along with what the worker is computing.
+    """
+
+    def __init__(self, depth: int, max_bytes: int) -> None:
+        """
+        :param depth: int, the number of generations computed ahead, or 0 to turn speculation off.
+        :param max_bytes: int, the most memory the cached generations can take.
+        """
+
+        self.depth = depth
+        self.max_bytes = max_bytes
+
+        # The cached generations, in order: their number, state and changed cells
+        self.generations: deque[tuple[int, CellBuffer, list[int]]] = deque()
+        self.nr_bytes = 0
+
+        # Bumped on every invalidation, so the worker knows its results are stale
+        self.epoch = 0
+        # The generation the level reached, so the worker does not cache generations it already passed
+        self.reached = 0
+        # The state the worker is stepping, which the level must not be handed as is
+        self.worker_state: CellBuffer = None
+        self.lock = threading.Lock()
+        self.thread = None
+
+        # The worker has its own engine, as engines keep scratch buffers between steps
+        self.engine: Engine = None
+
+        self.nr_hits, self.nr_misses = 0, 0
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def on_reset(self, level) -> None:
+        """
+        Drops the cache, as the level's state was replaced or the speculator was added to another level.
+        :param level: Level, the observed level.
+        :return: None
+        """
+
+        self.invalidate()
+
+    def on_toggle(self, level, cell_indices: list[int]) -> None:
+        """
+        Drops the cache, as the toggled cells change every upcoming generation.
+        :param level: Level, the observed level.
+        :param cell_indices: list[int], the indices of the toggled cells.
+        :return: None
+        """
+
+        self.invalidate()
+
+    def on_tick(self, level, changed: list[int]) -> None:
+        """
+        Drops the cached generations the level already reached without the cache.
+        :param level: Level, the observed level.
+        :param changed: list[int], the indices of the cells that changed.
+        :return: None
+        """
+
+        with self.lock:
+            self.drop_reached(level.generation)
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def invalidate(self) -> None:
+        """
+        Drops the cached generations and the ones the worker is computing.
+        :return: None
+        """
+
+        with self.lock:
+            self.epoch += 1
+            self.generations.clear()
+            self.nr_bytes = 0
+
+    def drop_reached(self, generation: int) -> None:
+        """
+        Drops the cached generations up to a generation. The lock must be held.
+        :param generation: int, the generation reached by the level.
+        :return: None
+        """
+
+        self.reached = generation
+        while self.generations and self.generations[0][0] <= generation:
+            _, state, changed = self.generations.popleft()
+            self.nr_bytes -= get_size(state, changed)
+
+    def has_room(self, size: int) -> bool:
+        """
+        Checks if another generation of some size fits in the cache. The lock must be held.
+        :param size: int, the memory taken by the generation, or only by its state if it is not computed yet.
+        :return: bool, True if the generation can be cached.
+        """
+
+        return len(self.generations) < self.depth and self.nr_bytes + size <= self.max_bytes
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def advance(self, level) -> bool:
+        """
+        Advances a level to its next generation from the cache, if it is there.
+        :param level: Level, the level to advance.
+        :return: bool, True if the level was advanced, False if it still has to be ticked.
+        """
+
+        if not level.in_memory:
+            return False
+
+        with self.lock:
+            self.drop_reached(level.generation)
+            if not self.generations or self.generations[0][0] != level.generation + 1:
+                self.nr_misses += 1
+                return False
+
+            _, state, changed = self.generations.popleft()
+            self.nr_bytes -= get_size(state, changed)
+
+            # The cached state becomes the level's, which writes to it two ticks later, so the one the worker
+            # is still stepping from is copied
+            if state is self.worker_state:
+                state = CellBuffer(state)
+        self.nr_hits += 1
+
+        level.advance_to(state, changed)
+        return True
+
+    def refill(self, level) -> None:
+        """
+        Starts computing the next generations of a level in the background, if the cache has room for them,
+        the level's engine releases the GIL while it steps and the worker is not already busy.
+        :param level: Level, the observed level.
+        :return: None
+        """
+
+        if self.depth <= 0 or not level.in_memory or not level.engine.releases_gil or self.is_speculating():
+            return
+
+        with self.lock:
+            if not self.has_room(len(level.current_state)):
+                return
+
+            # Continue from the last cached generation, whose state is never written to, or from a snapshot
+            if self.generations:
+                generation, state, _ = self.generations[-1]
+            else:
+                generation, state = level.generation, CellBuffer(level.current_state)
+            epoch = self.epoch
+            self.reached = level.generation
+            self.worker_state = state
+
+        if self.engine is None or self.engine.name != level.engine.name:
+            self.engine = get_engine(level.engine.name)
+
+        self.thread = threading.Thread(target=self.speculate, daemon=True,
+                                       args=(epoch, generation, state, level.nr_rows, level.nr_cols, level.boundary))
+        self.thread.start()
+
+    def is_speculating(self) -> bool:
+        """
+        Checks if the worker is computing generations.
+        :return: bool, True if the worker thread is still running.
+        """
+
+        return self.thread is not None and self.thread.is_alive()
+
+    def speculate(self, epoch: int, generation: int, state: CellBuffer, nr_rows: int, nr_cols: int,
+                  boundary: str) -> None:
+        """
+        Computes generations after a state until the cache is full or invalidated. Runs in the worker thread.
+        :param epoch: int, the epoch of the cache when the worker started.
+        :param generation: int, the generation of the state.
+        :param state: CellBuffer, the state to start from. It is not written to.
+        :param nr_rows: int, the number of rows of the level.
+        :param nr_cols: int, the number of columns of the level.
+        :param boundary: str, the boundary mode of the level.
+        :return: None
+        """
+
+        while True:
+            with self.lock:
+                if epoch != self.epoch or not self.has_room(len(state)):
+                    self.worker_state = None
+                    return
+
+            next_state = CellBuffer(len(state))
+            changed = self.engine.step_into(state, next_state, nr_rows, nr_cols, boundary)
+            generation += 1
+
+            with self.lock:
+                if epoch != self.epoch or not self.has_room(get_size(next_state, changed)):
+                    self.worker_state = None
+                    return
+                # A generation the level already reached by ticking is not cached, but stepped from
+                if generation > self.reached:
+                    self.generations.append((generation, next_state, changed))
+                    self.nr_bytes += get_size(next_state, changed)
+                self.worker_state = next_state
+            state = next_state
+
+
+def get_size(state: CellBuffer, changed: list[int]) -> int:
+    """
+    Returns the memory taken by a cached generation.
+    :param state: CellBuffer, the state of the generation.
+    :param changed: list[int], the indices of the cells that changed.
+    :return: int, the number of bytes.
+    """
+
+    return len(state) + CHANGED_CELL_SIZE * len(changed)
@@ -0,0 +1,246 @@
+import shutil
+import tempfile
+from collections import OrderedDict
+from typing import Iterator, Optional
+
+from src.engine.cell_buffer import CellBuffer
+from src.session.session import pack_state, unpack_state
+
+
+# A tile is identified by its tile row and tile column
+TileKey = tuple[int, int]
+
+
+class TileStore:
+    """
+    Class for the tiles of a board too big to keep in memory.
+
+    The board is split into square tiles of tile_size cells, cut short at the bottom and right edges. The tiles
+    live in a tile file, bit-packed 8 cells to a byte, one fixed-size slot per tile, and up to cache_size of them
+    are kept unpacked in an LRU cache. A tile is read from the file when it is first looked up, and written back
+    when it leaves the cache after being changed.
+
+    Empty tiles are never materialized: they have no slot and no cache entry, and looking one up returns None.
+    A tile that becomes empty gives its slot back when it leaves the cache.
+    """
+
+    def __init__(self, nr_rows: int, nr_cols: int, tile_size: int, cache_size: int,
+                 directory: Optional[str] = None) -> None:
+        """
+        :param nr_rows: int, the number of rows of the board.
+        :param nr_cols: int, the number of columns of the board.
+        :param tile_size: int, the number of rows and columns of a tile.
+        :param cache_size: int, the number of tiles kept in memory.
+        :param directory: str, the directory of the tile file, or None for the system's temporary directory.
+        """
+
+        self.nr_rows, self.nr_cols = nr_rows, nr_cols
+        self.tile_size = tile_size
+        self.cache_size = max(cache_size, 1)
+        self.directory = directory
+
+        self.nr_tile_rows = -(-nr_rows // tile_size)
+        self.nr_tile_cols = -(-nr_cols // tile_size)
+        self.slot_size = -(-tile_size * tile_size // 8)
+
+        # The tile file is deleted when it is closed
+        self.file = tempfile.TemporaryFile(dir=directory)
+        self.slots: dict[TileKey, int] = {}
+        self.free_slots: list[int] = []
+        self.nr_slots = 0
+
+        self.cache: OrderedDict[TileKey, CellBuffer] = OrderedDict()
+        self.dirty: set[TileKey] = set()
+
+        self.nr_reads, self.nr_writes = 0, 0
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def get_tile_shape(self, key: TileKey) -> tuple[int, int]:
+        """
+        Returns the number of rows and columns of a tile, which are fewer for the tiles on the bottom and right edges.
+        :param key: TileKey, the tile.
+        :return: tuple[int, int], the number of rows and columns of the tile.
+        """
+
+        tile_row, tile_col = key
+        return (min(self.tile_size, self.nr_rows - tile_row * self.tile_size),
+                min(self.tile_size, self.nr_cols - tile_col * self.tile_size))
+
+    def get_keys(self) -> list[TileKey]:
+        """
+        Returns the tiles that are materialized, in the file or in the cache. Some may have become empty.
+        :return: list[TileKey], the tiles, sorted by row and column.
+        """
+
+        return sorted(self.slots.keys() | self.cache.keys())
+
+    def get(self, key: TileKey) -> Optional[CellBuffer]:
+        """
+        Returns a tile, paging it in from the tile file if needed. The tile must not be written to directly.
+        :param key: TileKey, the tile.
+        :return: CellBuffer, the cells of the tile, or None if the tile is empty.
+        """
+
+        tile = self.cache.get(key)
+        if tile is not None:
+            self.cache.move_to_end(key)
+            return tile
+
+        slot = self.slots.get(key)
+        if slot is None:
+            return None
+
+        nr_tile_rows, nr_tile_cols = self.get_tile_shape(key)
+        self.file.seek(slot * self.slot_size)
+        tile = CellBuffer(unpack_state(self.file.read(self.slot_size), nr_tile_rows * nr_tile_cols))
+        self.nr_reads += 1
+        self.cache_tile(key, tile)
+        return tile
+
+    def get_for_writing(self, key: TileKey) -> CellBuffer:
+        """
+        Returns a tile that is about to be written to, materializing it if it is empty.
+        :param key: TileKey, the tile.
+        :return: CellBuffer, the cells of the tile.
+        """
+
+        tile = self.get(key)
+        if tile is None:
+            nr_tile_rows, nr_tile_cols = self.get_tile_shape(key)
+            tile = CellBuffer(nr_tile_rows * nr_tile_cols)
+            self.cache_tile(key, tile)
+        self.dirty.add(key)
+        return tile
+
+    def put(self, key: TileKey, tile: Optional[CellBuffer]) -> None:
+        """
+        Replaces a tile.
+        :param key: TileKey, the tile.
+        :param tile: CellBuffer, the new cells of the tile, or None if the tile is now empty.
+        :return: None
+        """
+
+        if tile is None or 1 not in tile:
+            # An empty tile is dropped right away, there is nothing to write back
+            self.cache.pop(key, None)
+            self.dirty.discard(key)
+            self.free(key)
+            return
+
+        self.cache_tile(key, tile)
+        self.dirty.add(key)
+
+    def clear(self) -> None:
+        """
+        Empties every tile.
+        :return: None
+        """
+
+        self.cache.clear()
+        self.dirty.clear()
+        self.slots.clear()
+        self.free_slots.clear()
+        self.nr_slots = 0
+        self.file.truncate(0)
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def cache_tile(self, key: TileKey, tile: CellBuffer) -> None:
+        """
+        Puts a tile in the cache as the most recently used one, evicting the least recently used tile if it is full.
+        :param key: TileKey, the tile.
+        :param tile: CellBuffer, the cells of the tile.
+        :return: None
+        """
+
+        self.cache[key] = tile
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.evict(next(iter(self.cache)))
+
+    def evict(self, key: TileKey) -> None:
+        """
+        Removes a tile from the cache, writing it back to the tile file if it changed.
+        :param key: TileKey, the tile.
+        :return: None
+        """
+
+        tile = self.cache.pop(key)
+        if key not in self.dirty:
+            return
+        self.dirty.discard(key)
+
+        if 1 not in tile:
+            self.free(key)
+            return
+
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self.free_slots.pop() if self.free_slots else self.nr_slots
+            self.nr_slots = max(self.nr_slots, slot + 1)
+            self.slots[key] = slot
+
+        self.file.seek(slot * self.slot_size)
+        self.file.write(pack_state(tile))
+        self.nr_writes += 1
+
+    def free(self, key: TileKey) -> None:
+        """
+        Gives the slot of a tile back, if it has one.
+        :param key: TileKey, the tile.
+        :return: None
+        """
+
+        slot = self.slots.pop(key, None)
+        if slot is not None:
+            self.free_slots.append(slot)
+
+    def flush(self) -> None:
+        """
+        Writes the changed tiles of the cache back to the tile file, keeping them cached.
+        :return: None
+        """
+
+        for key in list(self.dirty):
+            tile = self.cache[key]
+            self.evict(key)
+            self.cache[key] = tile
+        self.file.flush()
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def copy(self) -> 'TileStore':
+        """
+        Returns a copy of the store, with a copy of the tile file.
+        :return: TileStore, the copy.
+        """
+
+        self.flush()
+        copy = TileStore(self.nr_rows, self.nr_cols, self.tile_size, self.cache_size, self.directory)
+        self.file.seek(0)
+        shutil.copyfileobj(self.file, copy.file)
+
+        copy.slots = self.slots.copy()
+        copy.free_slots = self.free_slots.copy()
+        copy.nr_slots = self.nr_slots
+        return copy
+
+    def close(self) -> None:
+        """
+        Closes the tile file, which deletes it.
+        :return: None
+        """
+
+        self.file.close()
+
+    def __iter__(self) -> Iterator[tuple[TileKey, CellBuffer]]:
+        """
+        Iterates over the non-empty tiles, paging them in one by one.
+        :return: Iterator[tuple[TileKey, CellBuffer]], the tiles and their cells.
+        """
+
+        for key in self.get_keys():
+            tile = self.get(key)
+            if tile is not None and 1 in tile:
+                yield key, tile
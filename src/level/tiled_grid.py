@@ -0,0 +1,223 @@
+from typing import Iterator, Optional
+
+from src.engine.boundary import DEAD
+from src.engine.cell_buffer import CellBuffer
+from src.engine.engine import Engine
+from src.level.tile_store import TileKey, TileStore
+
+
+class TiledGrid:
+    """
+    Class for the state of a board kept in a tile store.
+    Has the same indexing API as a CellBuffer: cells are read and written by their row-major index, so the drawing,
+    editing and observing code works on it unchanged. Reading a cell of an empty tile does not materialize it.
+
+    A generation is computed tile by tile, on the frontier only: the non-empty tiles and the neighbors they can
+    spread to. Every tile is stepped by the level's engine as a small board, padded with the edges of its
+    neighbors. The tiles are visited by tile row, and the next tiles of a row are only written back once the row
+    below was computed, so every tile is computed from the current generation of its neighbors and at most
+    three rows of next tiles are held in memory.
+    """
+
+    def __init__(self, store: TileStore) -> None:
+        """
+        :param store: TileStore, the store of the tiles.
+        """
+
+        self.store = store
+        self.nr_rows, self.nr_cols = store.nr_rows, store.nr_cols
+        self.tile_size = store.tile_size
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def __len__(self) -> int:
+        return self.nr_rows * self.nr_cols
+
+    def __getitem__(self, cell_index: int) -> int:
+        key, local_index = self.locate(cell_index)
+        tile = self.store.get(key)
+        return 0 if tile is None else tile[local_index]
+
+    def __setitem__(self, cell_index: int, cell_state: int) -> None:
+        key, local_index = self.locate(cell_index)
+        if cell_state == 0 and self.store.get(key) is None:
+            return
+        self.store.get_for_writing(key)[local_index] = cell_state
+
+    def locate(self, cell_index: int) -> tuple[TileKey, int]:
+        """
+        Returns the tile of a cell and the index of the cell in the tile.
+        :param cell_index: int, the index of the cell in the board.
+        :return: tuple[TileKey, int], the tile and the index of the cell in it.
+        """
+
+        row, col = divmod(cell_index, self.nr_cols)
+        tile_row, local_row = divmod(row, self.tile_size)
+        tile_col, local_col = divmod(col, self.tile_size)
+        return (tile_row, tile_col), local_row * self.store.get_tile_shape((tile_row, tile_col))[1] + local_col
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def clear(self) -> None:
+        """
+        Kills every cell.
+        :return: None
+        """
+
+        self.store.clear()
+
+    def get_alive_cells(self) -> Iterator[int]:
+        """
+        Yields the indices of the alive cells, visiting the non-empty tiles only.
+        :return: Iterator[int], the indices of the alive cells.
+        """
+
+        for key, tile in self.store:
+            first_row, first_col = key[0] * self.tile_size, key[1] * self.tile_size
+            nr_tile_cols = self.store.get_tile_shape(key)[1]
+
+            local_index = tile.find(1)
+            while local_index != -1:
+                local_row, local_col = divmod(local_index, nr_tile_cols)
+                yield (first_row + local_row) * self.nr_cols + first_col + local_col
+                local_index = tile.find(1, local_index + 1)
+
+    def copy(self) -> 'TiledGrid':
+        """
+        Returns a copy of the grid, with a copy of the tile file.
+        :return: TiledGrid, the copy.
+        """
+
+        return TiledGrid(self.store.copy())
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def step(self, engine: Engine) -> list[int]:
+        """
+        Advances the grid to the next generation in place.
+        :param engine: Engine, the engine that steps the tiles.
+        :return: list[int], the indices of the cells that changed.
+        """
+
+        rows: dict[int, list[TileKey]] = {}
+        for key in sorted(self.get_frontier()):
+            rows.setdefault(key[0], []).append(key)
+
+        changed = []
+        pending: dict[int, list[tuple[TileKey, Optional[CellBuffer]]]] = {}
+        for tile_row, keys in rows.items():
+            pending[tile_row] = [(key, self.step_tile(key, engine, changed)) for key in keys]
+
+            # The rows above the previous one are not read by any tile left to compute
+            for done_row in [row for row in pending if row < tile_row - 1]:
+                self.commit(pending.pop(done_row))
+
+        for done_row in list(pending):
+            self.commit(pending.pop(done_row))
+        return changed
+
+    def get_frontier(self) -> set[TileKey]:
+        """
+        Returns the tiles whose next generation can have alive cells: the non-empty tiles, and the neighbors
+        of a non-empty tile with alive cells on the edge or corner they share.
+        :return: set[TileKey], the tiles.
+        """
+
+        frontier = set()
+        for (tile_row, tile_col), tile in self.store:
+            frontier.add((tile_row, tile_col))
+            nr_tile_rows, nr_tile_cols = self.store.get_tile_shape((tile_row, tile_col))
+            last_row = (nr_tile_rows - 1) * nr_tile_cols
+
+            top, bottom = 1 in tile[:nr_tile_cols], 1 in tile[last_row:]
+            left, right = 1 in tile[::nr_tile_cols], 1 in tile[nr_tile_cols - 1::nr_tile_cols]
+            touched = [(-1, 0, top), (1, 0, bottom), (0, -1, left), (0, 1, right),
+                       (-1, -1, tile[0] == 1), (-1, 1, tile[nr_tile_cols - 1] == 1),
+                       (1, -1, tile[last_row] == 1), (1, 1, tile[-1] == 1)]
+            for d_row, d_col, is_touched in touched:
+                neighbor_row, neighbor_col = tile_row + d_row, tile_col + d_col
+                if (is_touched and 0 <= neighbor_row < self.store.nr_tile_rows
+                        and 0 <= neighbor_col < self.store.nr_tile_cols):
+                    frontier.add((neighbor_row, neighbor_col))
+        return frontier
+
+    def step_tile(self, key: TileKey, engine: Engine, changed: list[int]) -> Optional[CellBuffer]:
+        """
+        Computes the next generation of a tile from its cells and the edges of its neighbors.
+        :param key: TileKey, the tile.
+        :param engine: Engine, the engine that steps the tile.
+        :param changed: list[int], the list to add the indices of the changed cells of the tile to.
+        :return: CellBuffer, the next cells of the tile, or None if they are all dead.
+        """
+
+        nr_tile_rows, nr_tile_cols = self.store.get_tile_shape(key)
+        padded_cols = nr_tile_cols + 2
+        padded = CellBuffer((nr_tile_rows + 2) * padded_cols)
+
+        # Copy the tile and the edges of its neighbors around it; the cells past the board's edges stay dead
+        for d_row in (-1, 0, 1):
+            for d_col in (-1, 0, 1):
+                neighbor = self.store.get((key[0] + d_row, key[1] + d_col))
+                if neighbor is not None:
+                    self.copy_edge(neighbor, (key[0] + d_row, key[1] + d_col), d_row, d_col, padded,
+                                   nr_tile_rows, nr_tile_cols)
+
+        next_padded = CellBuffer(len(padded))
+        padded_changed = engine.step_into(padded, next_padded, nr_tile_rows + 2, padded_cols, DEAD)
+
+        first_row, first_col = key[0] * self.tile_size, key[1] * self.tile_size
+        for padded_index in padded_changed:
+            padded_row, padded_col = divmod(padded_index, padded_cols)
+            if 0 < padded_row <= nr_tile_rows and 0 < padded_col <= nr_tile_cols:
+                changed.append((first_row + padded_row - 1) * self.nr_cols + first_col + padded_col - 1)
+
+        next_tile = CellBuffer(nr_tile_rows * nr_tile_cols)
+        for local_row in range(nr_tile_rows):
+            start = (local_row + 1) * padded_cols + 1
+            next_tile[local_row * nr_tile_cols:(local_row + 1) * nr_tile_cols] = next_padded[start:start + nr_tile_cols]
+        return next_tile if 1 in next_tile else None
+
+    def copy_edge(self, neighbor: CellBuffer, neighbor_key: TileKey, d_row: int, d_col: int, padded: CellBuffer,
+                  nr_tile_rows: int, nr_tile_cols: int) -> None:
+        """
+        Copies the cells of a tile or of one of its neighbors that fall in the tile's padded board.
+        :param neighbor: CellBuffer, the cells of the neighbor, or of the tile itself.
+        :param neighbor_key: TileKey, the neighbor.
+        :param d_row: int, the tile row of the neighbor relative to the tile, from -1 to 1.
+        :param d_col: int, the tile column of the neighbor relative to the tile, from -1 to 1.
+        :param padded: CellBuffer, the padded board of the tile.
+        :param nr_tile_rows: int, the number of rows of the tile.
+        :param nr_tile_cols: int, the number of columns of the tile.
+        :return: None
+        """
+
+        neighbor_rows, neighbor_cols = self.store.get_tile_shape(neighbor_key)
+        padded_cols = nr_tile_cols + 2
+
+        # The rows of the neighbor that are copied, and the row of the padded board they go to
+        if d_row == -1:
+            rows, padded_row = [neighbor_rows - 1], 0
+        elif d_row == 0:
+            rows, padded_row = range(neighbor_rows), 1
+        else:
+            rows, padded_row = [0], nr_tile_rows + 1
+
+        for row in rows:
+            start = row * neighbor_cols
+            padded_start = (padded_row + row if d_row == 0 else padded_row) * padded_cols
+            if d_col == -1:
+                padded[padded_start] = neighbor[start + neighbor_cols - 1]
+            elif d_col == 0:
+                padded[padded_start + 1:padded_start + 1 + nr_tile_cols] = neighbor[start:start + neighbor_cols]
+            else:
+                padded[padded_start + nr_tile_cols + 1] = neighbor[start]
+
+    def commit(self, results: list[tuple[TileKey, Optional[CellBuffer]]]) -> None:
+        """
+        Writes the next generation of some tiles to the store.
+        :param results: list[tuple[TileKey, CellBuffer]], the tiles and their next cells, or None if they are empty.
+        :return: None
+        """
+
+        for key, tile in results:
+            self.store.put(key, tile)
@@ -0,0 +1,201 @@
+import math
+import pygame
+
+from src.engine.boundary import DEAD
+from src.error import GameError
+from src.level.level import TILED
+from src.level.sandbox_level import SandboxLevel
+from src.level.tile_store import TileStore
+from src.level.tiled_grid import TiledGrid
+import src.constant.constant as const
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class TiledLevel(SandboxLevel):
+    """
+    Class for a sandbox level too big to keep in memory.
+    Selected by adding 'tiled' to the size line of a sandbox level file. The state is a TiledGrid, paged in
+    and out of a tile file, so only the tiles near alive cells take memory.
+
+    The lines after the size line list the alive cells of the initial state, one 'row column' pair per line.
+
+    Features that copy or serialize the whole board, such as sessions, recordings and the census, are not
+    available for tiled levels.
+    """
+
+    in_memory = False
+
+    def __init__(self, x: int, y: int, width: int, height: int,
+                 data_file: str, assets_dir_path: str, window: pygame.Surface) -> None:
+        """
+        :param x: int, the x position of the level.
+        :param y: int, the y position of the level.
+        :param width: int, the width of the level.
+        :param height: int, the height of the level.
+        :param data_file: str, the path to the file containing the level data.
+        :param assets_dir_path: str, the path to the assets' directory.
+        """
+
+        super().__init__(x, y, width, height, data_file, assets_dir_path, window)
+
+    @staticmethod
+    def is_tiled(data_file: str) -> bool:
+        """
+        Checks if the size line of a sandbox level file selects the tiled storage.
+        :param data_file: str, the path to the file containing the level data.
+        :return: bool, True if the level is tiled.
+        """
+
+        with open(data_file, 'r') as file:
+            return TILED in file.readline().split()[2:]
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def load_data(self) -> None:
+        """
+        Loads the level data from the level file.
+        :return: None
+        :raises: GameError if the boundary mode is not dead, or if an alive cell is outside the level.
+        """
+
+        with open(self.data_file, 'r') as file:
+            # Get the number of rows and columns, and the boundary mode
+            self.read_header(file.readline())
+
+            # Get the alive cells of the initial state
+            self.initial_state = []
+            for line in file:
+                if not line.strip():
+                    continue
+                row, col = map(int, line.split())
+                if not (0 <= row < self.nr_rows and 0 <= col < self.nr_cols):
+                    raise GameError(f'Cell ({row}, {col}) is outside the level!')
+                self.initial_state.append(row * self.nr_cols + col)
+
+        if self.boundary != DEAD:
+            raise GameError('Tiled levels only support the dead boundary mode!')
+
+        # The initial state is the list of its alive cells, the board is never held in memory
+        self.current_state = TiledGrid(TileStore(self.nr_rows, self.nr_cols, const.TILE_SIZE,
+                                                 const.TILE_CACHE_SIZE, const.TILE_DIR))
+        for cell_index in self.initial_state:
+            self.current_state[cell_index] = 1
+        self.desired_state = []
+
+    def reset(self) -> None:
+        """
+        Resets the level to its initial state.
+        :return: None
+        """
+
+        self.current_state.clear()
+        for cell_index in self.initial_state:
+            self.current_state[cell_index] = 1
+        self.generation = 0
+        self.history.clear()
+
+        for observer in self.observers:
+            observer.on_reset(self)
+
+    def restore(self, state: bytes, generation: int) -> None:
+        """
+        Tiled levels are not saved, so there is no state to restore.
+        :raises: GameError always.
+        """
+
+        raise GameError('Tiled levels cannot restore a saved state!')
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def tick(self) -> None:
+        """
+        Updates the level's state, stepping the tiles on the frontier in place.
+        :return: None
+        """
+
+        changed = self.current_state.step(self.engine)
+        self.advance_to(self.current_state, changed)
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def draw_desired(self) -> None:
+        """
+        Tiled levels have no goal, so the current state is drawn instead.
+        :return: None
+        """
+
+        self.draw_current()
+
+    def count_blocks(self, state: TiledGrid, first_row: int, first_col: int, end_row: int, end_col: int,
+                     block_height: int, block_width: int) -> 'np.ndarray':
+        """
+        Counts the alive cells of the visible blocks, visiting only the non-empty tiles that overlap them.
+        :param state: TiledGrid, the state.
+        :param first_row: int, the first visible row.
+        :param first_col: int, the first visible column.
+        :param end_row: int, the row after the last visible one.
+        :param end_col: int, the column after the last visible one.
+        :param block_height: int, the number of rows of a block.
+        :param block_width: int, the number of columns of a block.
+        :return: np.ndarray, the number of alive cells of every block.
+        """
+
+        nr_block_rows = math.ceil((end_row - first_row) / block_height)
+        nr_block_cols = math.ceil((end_col - first_col) / block_width)
+        alive = np.zeros((nr_block_rows, nr_block_cols), dtype=np.int64)
+
+        store = state.store
+        for tile_row in range(first_row // store.tile_size, (end_row - 1) // store.tile_size + 1):
+            for tile_col in range(first_col // store.tile_size, (end_col - 1) // store.tile_size + 1):
+                tile = store.get((tile_row, tile_col))
+                if tile is None:
+                    continue
+
+                rows, cols = np.divmod(np.flatnonzero(np.frombuffer(tile, dtype=np.uint8)),
+                                       store.get_tile_shape((tile_row, tile_col))[1])
+                rows += tile_row * store.tile_size - first_row
+                cols += tile_col * store.tile_size - first_col
+                visible = (rows >= 0) & (rows < end_row - first_row) & (cols >= 0) & (cols < end_col - first_col)
+                np.add.at(alive, (rows[visible] // block_height, cols[visible] // block_width), 1)
+        return alive
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def __copy__(self) -> 'TiledLevel':
+        """
+        Creates a shallow copy of the level.
+        :return: TiledLevel, the shallow copy of the level.
+        """
+
+        copy = TiledLevel(self.x, self.y, self.width, self.height, self.data_file, self.assets_dir_path, self.window)
+
+        copy.engine = self.engine
+        copy.camera = self.camera
+        copy.generation = self.generation
+
+        copy.current_state.store.close()
+        copy.current_state = self.current_state
+
+        return copy
+
+    def __deepcopy__(self, memodict = {}) -> 'TiledLevel':
+        """
+        Creates a deep copy of the level, with a copy of the tile file.
+        :param memodict: dict, the memo dictionary.
+        :return: TiledLevel, the deep copy of the level.
+        """
+
+        copy = TiledLevel(self.x, self.y, self.width, self.height, self.data_file, self.assets_dir_path, self.window)
+
+        copy.engine = self.engine
+        copy.camera = self.camera
+        copy.generation = self.generation
+
+        copy.current_state.store.close()
+        copy.current_state = self.current_state.copy()
+
+        return copy
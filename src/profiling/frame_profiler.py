@@ -0,0 +1,181 @@
+import csv
+import time
+
+
+class FrameProfiler:
+    """
+    Class for a frame profiler.
+    Records how long each phase of a frame took, for the last frames only, in a fixed-size ring buffer.
+    Every method returns immediately while the profiler is disabled. A frame is only recorded if the profiler
+    was enabled when it began, so the frame it is enabled in, whose start was not marked, is left out.
+    """
+
+    def __init__(self, phases: list[str], capacity: int) -> None:
+        """
+        :param phases: list[str], the names of the phases of a frame, in the order they run.
+        :param capacity: int, the number of frames kept in the ring buffer.
+        """
+
+        self.phases = phases
+        self.capacity = capacity
+        self.enabled = False
+
+        self.frame_starts = [0.0] * capacity
+        self.frame_times = [0.0] * capacity
+        self.phase_times = {phase: [0.0] * capacity for phase in phases}
+        self.ticks = [0] * capacity
+
+        # The slot of the current frame and the number of recorded frames
+        self.index = 0
+        self.nr_frames = 0
+
+        self.frame_start = 0.0
+        self.last_mark = 0.0
+        self.frame_ticks = 0
+        # Whether the start of the current frame was marked
+        self.in_frame = False
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def toggle(self) -> None:
+        """
+        Enables or disables the profiler. Enabling it clears the recorded frames.
+        :return: None
+        """
+
+        self.enabled = not self.enabled
+        self.in_frame = False
+        if self.enabled:
+            self.index = 0
+            self.nr_frames = 0
+
+    def begin_frame(self) -> None:
+        """
+        Marks the start of a frame.
+        :return: None
+        """
+
+        if not self.enabled:
+            return
+
+        self.frame_start = self.last_mark = time.perf_counter()
+        self.frame_ticks = 0
+        self.in_frame = True
+        for phase in self.phases:
+            self.phase_times[phase][self.index] = 0.0
+
+    def mark(self, phase: str) -> None:
+        """
+        Marks the end of a phase. The phase lasted since the previous mark or the start of the frame.
+        :param phase: str, the name of the phase.
+        :return: None
+        """
+
+        if not self.in_frame:
+            return
+
+        now = time.perf_counter()
+        self.phase_times[phase][self.index] += now - self.last_mark
+        self.last_mark = now
+
+    def count_tick(self) -> None:
+        """
+        Counts a level tick in the current frame.
+        :return: None
+        """
+
+        if not self.enabled:
+            return
+
+        self.frame_ticks += 1
+
+    def end_frame(self) -> None:
+        """
+        Marks the end of a frame and moves to the next slot of the ring buffer.
+        :return: None
+        """
+
+        if not self.in_frame:
+            return
+
+        self.in_frame = False
+        self.frame_starts[self.index] = self.frame_start
+        self.frame_times[self.index] = time.perf_counter() - self.frame_start
+        self.ticks[self.index] = self.frame_ticks
+
+        self.index = (self.index + 1) % self.capacity
+        self.nr_frames = min(self.nr_frames + 1, self.capacity)
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def get_slots(self) -> list[int]:
+        """
+        Returns the slots of the recorded frames, from the oldest to the newest.
+        :return: list[int], the slots of the recorded frames.
+        """
+
+        start = (self.index - self.nr_frames) % self.capacity
+        return [(start + offset) % self.capacity for offset in range(self.nr_frames)]
+
+    def get_summary(self) -> dict:
+        """
+        Summarizes the recorded frames.
+        :return: dict, the 50th, 95th and 99th percentiles of the frame time in milliseconds ('p50', 'p95', 'p99'),
+                 the ticks per second ('tps'), and the phase with the highest mean time ('slowest_phase')
+                 with that mean in milliseconds ('slowest_phase_time').
+        """
+
+        slots = self.get_slots()
+        if not slots:
+            return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'tps': 0.0, 'slowest_phase': '-', 'slowest_phase_time': 0.0}
+
+        frame_times = sorted(self.frame_times[slot] for slot in slots)
+        percentile = lambda p: frame_times[min(len(frame_times) - 1, int(p * len(frame_times)))] * 1000
+
+        duration = self.frame_starts[slots[-1]] + self.frame_times[slots[-1]] - self.frame_starts[slots[0]]
+        ticks = sum(self.ticks[slot] for slot in slots)
+
+        phase_totals = {phase: sum(self.phase_times[phase][slot] for slot in slots) for phase in self.phases}
+        slowest_phase = max(phase_totals, key=phase_totals.get)
+
+        return {
+            'p50': percentile(0.50),
+            'p95': percentile(0.95),
+            'p99': percentile(0.99),
+            'tps': ticks / duration if duration > 0 else 0.0,
+            'slowest_phase': slowest_phase,
+            'slowest_phase_time': phase_totals[slowest_phase] / len(slots) * 1000,
+        }
+
+    def get_phase_report(self) -> dict[str, dict[str, float]]:
+        """
+        Summarizes the time of every phase over the recorded frames.
+        :return: dict[str, dict[str, float]], for every phase, its mean, 95th percentile and total time
+                 in milliseconds ('mean', 'p95', 'total').
+        """
+
+        slots = self.get_slots()
+        report = {}
+        for phase in self.phases:
+            times = sorted(self.phase_times[phase][slot] for slot in slots) or [0.0]
+            report[phase] = {
+                'mean': sum(times) / len(times) * 1000,
+                'p95': times[min(len(times) - 1, int(0.95 * len(times)))] * 1000,
+                'total': sum(times) * 1000,
+            }
+        return report
+
+    def dump_csv(self, path: str) -> None:
+        """
+        Writes the recorded frames to a CSV file, from the oldest to the newest. Times are in milliseconds.
+        :param path: str, the path of the CSV file.
+        :return: None
+        """
+
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['frame', 'start', 'frame_time', *self.phases, 'ticks'])
+            for frame, slot in enumerate(self.get_slots()):
+                writer.writerow([frame, f'{self.frame_starts[slot]:.6f}', f'{self.frame_times[slot] * 1000:.3f}',
+                                 *(f'{self.phase_times[phase][slot] * 1000:.3f}' for phase in self.phases),
+                                 self.ticks[slot]])
@@ -0,0 +1,330 @@
+import gc
+import sys
+import tracemalloc
+from collections import deque
+from typing import Optional
+
+import pygame
+
+from src.engine.engine import Engine
+from src.level.level import Level
+import src.constant.constant as const
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class MemorySample:
+    """
+    Class for the memory taken by the game at some point, in bytes.
+    The level, the snapshot Advance goes back to and the caches are broken down by part. An object shared by
+    several of them, such as the initial state of a level and of its snapshot, is only counted once.
+    """
+
+    def __init__(self, label: str, level: dict[str, int], snapshot: dict[str, int], caches: dict[str, int],
+                 nr_levels: int, nr_surfaces: int, surface_bytes: int, traced_bytes: int) -> None:
+        """
+        :param label: str, what the game was doing when the sample was taken.
+        :param level: dict[str, int], the bytes of the states, surfaces and edit history of the level.
+        :param snapshot: dict[str, int], the same for the snapshot Advance goes back to, empty if not advancing.
+        :param caches: dict[str, int], the bytes of every cache of the game.
+        :param nr_levels: int, the number of level objects alive, wherever they are held.
+        :param nr_surfaces: int, the number of surfaces alive, wherever they are held.
+        :param surface_bytes: int, the bytes of the pixels of those surfaces.
+        :param traced_bytes: int, the bytes allocated by Python, as traced by tracemalloc, or 0 if it is not tracing.
+        """
+
+        self.label = label
+        self.level = level
+        self.snapshot = snapshot
+        self.caches = caches
+        self.nr_levels = nr_levels
+        self.nr_surfaces = nr_surfaces
+        self.surface_bytes = surface_bytes
+        self.traced_bytes = traced_bytes
+
+    def describe(self) -> str:
+        """
+        Describes the sample in one line.
+        :return: str, the description.
+        """
+
+        caches = ', '.join(f'{name} {format_bytes(size)}' for name, size in self.caches.items())
+        return (f'level {format_bytes(sum(self.level.values()))}, snapshot {format_bytes(sum(self.snapshot.values()))}, '
+                f'{caches}, {self.nr_levels} levels, {self.nr_surfaces} surfaces ({format_bytes(self.surface_bytes)}), '
+                f'traced {format_bytes(self.traced_bytes)}')
+
+
+class MemoryProfiler:
+    """
+    Class for a memory profiler.
+    Samples the memory of the game: the bytes of its level, snapshot and caches, the level objects and surfaces
+    that are still alive, and, while tracing, all the memory allocated by Python. Surfaces keep their pixels outside
+    of Python's allocator, so they are counted from their size instead.
+
+    Comparing the samples taken after every round of a repeated action, such as switching levels or toggling Advance,
+    shows if the action leaks: after the first round, nothing should keep growing.
+    """
+
+    def __init__(self, nr_frames: int = const.MEMORY_TRACE_FRAMES, warm_up: int = 1) -> None:
+        """
+        :param nr_frames: int, the number of stack frames tracemalloc keeps for every allocation.
+        :param warm_up: int, the number of first samples that warm up the caches, which growth is not checked from.
+        """
+
+        self.nr_frames = nr_frames
+        self.warm_up = warm_up
+        self.samples: list[MemorySample] = []
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def start(self) -> None:
+        """
+        Starts tracing the memory allocated by Python.
+        :return: None
+        """
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.nr_frames)
+        self.samples = []
+        self.baseline = None
+
+    def stop(self) -> None:
+        """
+        Stops tracing the memory allocated by Python.
+        :return: None
+        """
+
+        tracemalloc.stop()
+        self.baseline = None
+
+    @staticmethod
+    def is_tracing() -> bool:
+        """
+        Checks if the memory allocated by Python is traced.
+        :return: bool, True if tracemalloc is tracing.
+        """
+
+        return tracemalloc.is_tracing()
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def sample(self, game, label: str = '') -> MemorySample:
+        """
+        Samples the memory of a game, after collecting the garbage so that only what is still held is counted.
+        :param game: Game, the game.
+        :param label: str, what the game was doing when the sample was taken.
+        :return: MemorySample, the sample.
+        """
+
+        gc.collect()
+
+        seen: set[int] = set()
+        level = measure_level(game.level, game.window, seen)
+        snapshot = measure_level(game.level_copy, game.window, seen) if game.is_ticking else {}
+        caches = measure_caches(game, seen)
+        nr_levels, nr_surfaces, surface_bytes = count_live_objects()
+
+        traced_bytes = 0
+        if tracemalloc.is_tracing():
+            traced_bytes = tracemalloc.get_traced_memory()[0]
+            if len(self.samples) == self.warm_up:
+                self.baseline = take_snapshot()
+
+        sample = MemorySample(label, level, snapshot, caches, nr_levels, nr_surfaces, surface_bytes, traced_bytes)
+        self.samples.append(sample)
+        return sample
+
+    def check_growth(self, tolerance: int) -> list[str]:
+        """
+        Checks if the memory grew between the first sample after the warm-up and the last one.
+        :param tolerance: int, the number of bytes the traced memory and the surfaces can grow by.
+        :return: list[str], a description of every growth, empty if nothing grew.
+        """
+
+        if len(self.samples) < self.warm_up + 2:
+            return []
+        first, last = self.samples[self.warm_up], self.samples[-1]
+
+        growths = []
+        if last.nr_levels > first.nr_levels:
+            growths.append(f'{last.nr_levels - first.nr_levels} more levels alive ({first.nr_levels} -> {last.nr_levels})')
+        if last.nr_surfaces > first.nr_surfaces:
+            growths.append(f'{last.nr_surfaces - first.nr_surfaces} more surfaces alive '
+                           f'({first.nr_surfaces} -> {last.nr_surfaces})')
+        if last.surface_bytes - first.surface_bytes > tolerance:
+            growths.append(f'surfaces grew by {format_bytes(last.surface_bytes - first.surface_bytes)}')
+        if last.traced_bytes - first.traced_bytes > tolerance:
+            growths.append(f'traced memory grew by {format_bytes(last.traced_bytes - first.traced_bytes)}')
+        return growths
+
+    def get_top_growth(self, nr_sites: int) -> list[str]:
+        """
+        Returns the lines of code whose allocations grew the most since the first sample after the warm-up.
+        :param nr_sites: int, the number of lines to return.
+        :return: list[str], the lines and how much their allocations grew, empty if not tracing.
+        """
+
+        if self.baseline is None or not tracemalloc.is_tracing():
+            return []
+
+        differences = take_snapshot().compare_to(self.baseline, 'lineno')
+        return [f'{difference.traceback[0]}: {format_bytes(difference.size_diff)} in {difference.count_diff} blocks'
+                for difference in differences[:nr_sites] if difference.size_diff > 0]
+
+
+# ------------------------------------------------------------------------------------------------- #
+
+def take_snapshot() -> tracemalloc.Snapshot:
+    """
+    Takes a snapshot of the traced memory, leaving out the memory of the profiler itself, such as its samples.
+    :return: tracemalloc.Snapshot, the snapshot.
+    """
+
+    return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, __file__),
+                                                      tracemalloc.Filter(False, tracemalloc.__file__)])
+
+
+def measure_level(level: Level, window: pygame.Surface, seen: set[int]) -> dict[str, int]:
+    """
+    Measures the states, surfaces and edit history of a level.
+    :param level: Level, the level.
+    :param window: pygame.Surface, the window, which is not counted as a surface of the level.
+    :param seen: set[int], the ids of the objects already counted, which are skipped.
+    :return: dict[str, int], the bytes of every part of the level.
+    """
+
+    states = [getattr(level, name, None)
+              for name in ('initial_state', 'current_state', 'next_state', 'desired_state', 'current_toggles')]
+    if not level.in_memory:
+        # The tiles of a tiled level live in a file, only the cached ones take memory
+        store = level.current_state.store
+        states.extend([store.cache, store.slots])
+
+    surfaces = [value for value in vars(level).values() if isinstance(value, pygame.Surface) and value is not window]
+
+    return {
+        'states': sum(get_size(state, seen) for state in states),
+        'surfaces': sum(get_size(surface, seen) for surface in surfaces),
+        'history': get_size(level.history.entries, seen),
+    }
+
+
+def measure_caches(game, seen: set[int]) -> dict[str, int]:
+    """
+    Measures the caches of a game: the speculated generations, the cycle detector's hashes and cycle,
+    the scratch buffers of the engine and the heatmap.
+    :param game: Game, the game.
+    :param seen: set[int], the ids of the objects already counted, which are skipped.
+    :return: dict[str, int], the bytes of every cache.
+    """
+
+    detector = game.cycle_detector
+    with game.speculator.lock:
+        speculated = get_size(game.speculator.generations, seen)
+
+    return {
+        'speculator': speculated,
+        'cycle detector': sum(get_size(part, seen) for part in (detector.keys, detector.table, detector.history,
+                                                                 detector.cycle)),
+        'engine': get_engine_size(game.level.engine, seen),
+        'heatmap': 0 if game.heatmap is None else sum(get_size(value, seen) for value in vars(game.heatmap).values()
+                                                      if np is not None and isinstance(value, np.ndarray)),
+    }
+
+
+def get_engine_size(engine: Engine, seen: set[int]) -> int:
+    """
+    Measures the buffers an engine keeps between steps, and those of the engines it delegates to.
+    :param engine: Engine, the engine.
+    :param seen: set[int], the ids of the objects already counted, which are skipped.
+    :return: int, the number of bytes.
+    """
+
+    if id(engine) in seen:
+        return 0
+    seen.add(id(engine))
+
+    size = 0
+    for value in vars(engine).values():
+        if isinstance(value, Engine):
+            size += get_engine_size(value, seen)
+        elif isinstance(value, dict) and any(isinstance(item, Engine) for item in value.values()):
+            size += sum(get_engine_size(item, seen) for item in value.values())
+        elif np is not None and isinstance(value, np.ndarray):
+            size += get_size(value, seen)
+    return size
+
+
+def get_size(value, seen: set[int]) -> int:
+    """
+    Measures an object and, for containers, the objects in them. Surfaces are measured by their pixels, and NumPy
+    arrays by their data. Other objects are not followed into.
+    :param value: the object.
+    :param seen: set[int], the ids of the objects already counted, which are skipped and to which value is added.
+    :return: int, the number of bytes.
+    """
+
+    if value is None or id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, pygame.Surface):
+        return get_surface_size(value)
+    if np is not None and isinstance(value, np.ndarray):
+        return value.nbytes if value.base is None else 0
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(get_size(key, seen) + get_size(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset, deque)):
+        size += sum(get_size(item, seen) for item in value)
+    return size
+
+
+def get_surface_size(surface: pygame.Surface) -> int:
+    """
+    Returns the bytes of the pixels of a surface. A subsurface shares the pixels of its parent and takes none.
+    :param surface: pygame.Surface, the surface.
+    :return: int, the number of bytes.
+    """
+
+    if surface.get_parent() is not None:
+        return 0
+    return surface.get_pitch() * surface.get_height()
+
+
+def count_live_objects() -> tuple[int, int, int]:
+    """
+    Counts the level objects and surfaces alive in the whole process. Surfaces are not tracked by the garbage
+    collector, so they are found among the objects referred to by the tracked ones.
+    :return: tuple[int, int, int], the number of levels, the number of surfaces and the bytes of their pixels.
+    """
+
+    nr_levels = 0
+    surfaces: dict[int, pygame.Surface] = {}
+    for obj in gc.get_objects():
+        if isinstance(obj, Level):
+            nr_levels += 1
+        for referent in gc.get_referents(obj):
+            if isinstance(referent, pygame.Surface):
+                surfaces[id(referent)] = referent
+
+    return nr_levels, len(surfaces), sum(get_surface_size(surface) for surface in surfaces.values())
+
+
+def format_bytes(size: int) -> str:
+    """
+    Formats a number of bytes with a binary unit.
+    :param size: int, the number of bytes.
+    :return: str, the formatted size.
+    """
+
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(size) < 1024:
+            return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024
+    return f'{size:.1f} GiB'
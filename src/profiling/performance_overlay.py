@@ -0,0 +1,66 @@
+import pygame
+
+from src.profiling.frame_profiler import FrameProfiler
+import src.constant.constant as const
+import src.constant.color as color
+
+
+class PerformanceOverlay:
+    """
+    Class for the performance overlay.
+    Shows a summary of the frame profiler on top of the window.
+    """
+
+    def __init__(self, x: int, y: int, profiler: FrameProfiler, window: pygame.Surface) -> None:
+        """
+        :param x: int, the x position of the overlay.
+        :param y: int, the y position of the overlay.
+        :param profiler: FrameProfiler, the profiler to summarize.
+        :param window: pygame.Surface, the surface to draw the overlay on.
+        """
+
+        self.x, self.y = x, y
+        self.profiler = profiler
+        self.window = window
+
+        self.font = pygame.font.SysFont(const.OVERLAY_FONT, const.OVERLAY_FONT_SIZE)
+        self.image = None
+        self.frames_since_refresh = 0
+
+    def refresh(self) -> None:
+        """
+        Renders the profiler's summary.
+        :return: None
+        """
+
+        summary = self.profiler.get_summary()
+        lines = [
+            f'frame p50 {summary["p50"]:.1f} ms  p95 {summary["p95"]:.1f} ms  p99 {summary["p99"]:.1f} ms',
+            f'ticks per second {summary["tps"]:.1f}',
+            f'slowest phase {summary["slowest_phase"]} ({summary["slowest_phase_time"]:.2f} ms)',
+        ]
+        texts = [self.font.render(line, True, color.white) for line in lines]
+
+        padding = 5
+        width = max(text.get_width() for text in texts) + 2 * padding
+        height = sum(text.get_height() for text in texts) + 2 * padding
+
+        self.image = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.image.fill((*color.black, 180))
+        text_y = padding
+        for text in texts:
+            self.image.blit(text, (padding, text_y))
+            text_y += text.get_height()
+
+    def draw(self) -> None:
+        """
+        Draws the overlay on the window. The summary is refreshed only every few frames.
+        :return: None
+        """
+
+        if self.image is None or self.frames_since_refresh >= const.OVERLAY_REFRESH_FRAMES:
+            self.refresh()
+            self.frames_since_refresh = 0
+        self.frames_since_refresh += 1
+
+        self.window.blit(self.image, (self.x, self.y))
@@ -0,0 +1,74 @@
+"""
+Replay of input logs.
+
+Feeds an input log recorded with `python main.py --record-input PATH` back to the game, profiles every frame
+and checks that the replay reaches the same level as the logged run. Without --realtime, the replay runs
+without a window and as fast as possible.
+
+Usage (from the repository root):
+    python -m src.replay input.log
+    python -m src.replay input.log --realtime
+    python -m src.replay input.log --report frames.csv
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT_DIR_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Replays an input log of the game and reports its frame times.')
+    parser.add_argument('log', help='the input log to replay')
+    parser.add_argument('--realtime', action='store_true',
+                        help='replay in a window, as fast as the frames were logged')
+    parser.add_argument('--report', help='the CSV file to write the time of every phase of every frame to')
+    args = parser.parse_args()
+
+    if not args.realtime:
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+    # The game is imported once the video driver is chosen
+    import pygame
+    from src.game import Game
+    from src.session.input_log import InputReplay
+    import src.constant.constant as const
+
+    pygame.init()
+    levels = InputReplay(args.log).levels
+    game = Game(const.WIDTH, const.HEIGHT, const.TITLE, const.FPS, os.path.join(ROOT_DIR_PATH, 'data'),
+                os.path.join(ROOT_DIR_PATH, 'assets'), levels)
+    game.start_replay(args.log, args.realtime)
+
+    start = time.perf_counter()
+    game.run()
+    elapsed = time.perf_counter() - start
+
+    matches = game.input_replay.check(game.level)
+    pygame.quit()
+
+    profiler = game.profiler
+    summary = profiler.get_summary()
+    print(f'Replayed {profiler.nr_frames} frames in {elapsed:.2f} s '
+          f'({profiler.nr_frames / max(elapsed, 1e-9):.0f} frames/s), {summary["tps"]:.1f} ticks/s.')
+    print(f'Frame time: p50 {summary["p50"]:.2f} ms, p95 {summary["p95"]:.2f} ms, p99 {summary["p99"]:.2f} ms.')
+    print(f'{"phase":<10} {"mean ms":>9} {"p95 ms":>9} {"total ms":>10}')
+    for phase, times in profiler.get_phase_report().items():
+        print(f'{phase:<10} {times["mean"]:>9.3f} {times["p95"]:>9.3f} {times["total"]:>10.1f}')
+
+    if args.report:
+        profiler.dump_csv(args.report)
+
+    if matches is None:
+        print('The log has no final level to compare with.')
+    elif matches:
+        print(f'The replay reached the logged level at generation {game.level.generation}.')
+    else:
+        print('The replay did NOT reach the logged level!')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
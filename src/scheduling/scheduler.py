@@ -0,0 +1,249 @@
+import asyncio
+import concurrent.futures
+import math
+import time
+from typing import Callable, Optional
+
+
+# The callback of a job does the part of the job that must run between frames, such as taking a snapshot,
+# and returns the part that can run in a worker thread, such as writing the snapshot, if there is one
+JobCallback = Callable[[], Optional[Callable[[], None]]]
+
+
+class Job:
+    """
+    Class for a periodic job of the scheduler.
+    """
+
+    def __init__(self, name: str, interval: float, callback: JobCallback,
+                 on_error: Optional[Callable[[Exception], None]]) -> None:
+        """
+        :param name: str, the name of the job.
+        :param interval: float, the number of seconds between two runs of the job.
+        :param callback: JobCallback, the callback running the job.
+        :param on_error: Callable[[Exception], None], called between frames with the error of the worker thread part
+                         of the job, or None to raise the error from the scheduler.
+        """
+
+        self.name = name
+        self.interval = interval
+        self.callback = callback
+        self.on_error = on_error
+
+        self.due_time = time.perf_counter() + interval
+        # Unknown until the first run, which therefore waits until the game is idle
+        self.cost = math.inf
+        self.future: Optional[concurrent.futures.Future] = None
+        self.nr_runs = 0
+
+    def is_offloaded(self) -> bool:
+        """
+        Checks if the worker thread part of the previous run of the job is still running.
+        :return: bool, True if it is still running.
+        """
+
+        return self.future is not None and not self.future.done()
+
+
+class Scheduler:
+    """
+    Class for a scheduler of periodic jobs around the frames of the game, on an asyncio event loop.
+
+    The game awaits wait_frame() between two frames, and the jobs that are due run while it waits, as long as their
+    cost fits in the time left before the frame plus the frame budget. The cost of a job is measured on its
+    previous runs, so a job delays a frame by at most the budget, and a job that costs more than the budget waits
+    until the game is idle. A job that has not run yet has an unknown cost, so its first run waits until the game
+    is idle too. A game that does not get idle would starve these jobs, so a job overdue by a whole interval runs
+    between the next frames whatever its cost. The part of a job returned by its callback runs in a thread pool;
+    the job does not run again before that part is done, so the writes of a job stay in order.
+    """
+
+    def __init__(self, budget: float, nr_workers: int) -> None:
+        """
+        :param budget: float, the number of seconds the jobs can delay a frame by.
+        :param nr_workers: int, the number of worker threads.
+        """
+
+        self.budget = budget
+        self.nr_workers = nr_workers
+
+        self.jobs: list[Job] = []
+        self.executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self.tasks: set[asyncio.Task] = set()
+        self.error: Optional[Exception] = None
+
+        # The longest a frame was held up by the jobs, in seconds
+        self.max_delay = 0.0
+
+    def add_job(self, name: str, interval: float, callback: JobCallback,
+                on_error: Optional[Callable[[Exception], None]] = None) -> Job:
+        """
+        Adds a periodic job, first run after one interval.
+        :param name: str, the name of the job.
+        :param interval: float, the number of seconds between two runs of the job.
+        :param callback: JobCallback, the callback running the job.
+        :param on_error: Callable[[Exception], None], called with the error of the worker thread part of the job,
+                         or None to raise the error from the scheduler.
+        :return: Job, the job.
+        """
+
+        job = Job(name, interval, callback, on_error)
+        self.jobs.append(job)
+        return job
+
+    def get_job(self, name: str) -> Optional[Job]:
+        """
+        Returns a job by its name.
+        :param name: str, the name of the job.
+        :return: Job, the job, or None if there is no such job.
+        """
+
+        return next((job for job in self.jobs if job.name == name), None)
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    async def wait_frame(self, deadline: float) -> None:
+        """
+        Waits for the next frame, running the due jobs in the meantime.
+        :param deadline: float, the time the next frame should start at, as given by time.perf_counter().
+        :return: None
+        :raises: the error of a worker thread part of a job without an error callback.
+        """
+
+        self.raise_error()
+
+        start = time.perf_counter()
+        self.run_due(max(deadline - start, 0.0) + self.budget, idle=False)
+        self.max_delay = max(self.max_delay, time.perf_counter() - max(deadline, start))
+
+        # The finished worker thread parts are reported while the loop sleeps
+        await asyncio.sleep(max(deadline - time.perf_counter(), 0.0))
+
+    async def run_idle(self) -> None:
+        """
+        Runs all the due jobs, as the game is idle and no frame is waiting.
+        :return: None
+        :raises: the error of a worker thread part of a job without an error callback.
+        """
+
+        self.raise_error()
+        self.run_due(math.inf, idle=True)
+        await asyncio.sleep(0)
+
+    def get_time_until_due(self) -> float:
+        """
+        Returns the time until the next job is due. The jobs whose worker thread part is still running are left out.
+        :return: float, the number of seconds, negative if a job is overdue, or infinity if there are no such jobs.
+        """
+
+        due_times = [job.due_time for job in self.jobs if not job.is_offloaded()]
+        return min(due_times, default=math.inf) - time.perf_counter()
+
+    def has_pending_reports(self) -> bool:
+        """
+        Checks if the worker thread part of a job is yet to be reported, which needs the event loop to run.
+        :return: bool, True if a report is pending.
+        """
+
+        return bool(self.tasks)
+
+    def run_due(self, allowance: float, idle: bool) -> None:
+        """
+        Runs the due jobs, the most overdue first, whose cost fits in the allowance, and the jobs overdue by
+        a whole interval.
+        :param allowance: float, the number of seconds the jobs can take in total.
+        :param idle: bool, whether the game is idle, in which case the jobs over the budget can run too.
+        :return: None
+        """
+
+        start = time.perf_counter()
+        for job in sorted(self.jobs, key=lambda job: job.due_time):
+            now = time.perf_counter()
+            if job.due_time > now:
+                break
+            if job.is_offloaded():
+                continue
+            if now - job.due_time < job.interval:
+                if not idle and job.cost > self.budget:
+                    continue
+                if now - start + job.cost > allowance:
+                    continue
+            self.run_job(job)
+
+    def run_job(self, job: Job) -> None:
+        """
+        Runs a job, handing the part returned by its callback to the thread pool.
+        :param job: Job, the job.
+        :return: None
+        """
+
+        start = time.perf_counter()
+        job.due_time = start + job.interval
+        offloaded = job.callback()
+        job.nr_runs += 1
+
+        # A slow run raises the cost at once, and it comes back down over the next fast runs
+        elapsed = time.perf_counter() - start
+        job.cost = elapsed if job.nr_runs == 1 else max(elapsed, job.cost / 2)
+
+        if offloaded is not None:
+            if self.executor is None:
+                self.executor = concurrent.futures.ThreadPoolExecutor(self.nr_workers, thread_name_prefix='job')
+            job.future = self.executor.submit(offloaded)
+            task = asyncio.get_running_loop().create_task(self.report(job, job.future))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def report(self, job: Job, future: concurrent.futures.Future) -> None:
+        """
+        Waits for the worker thread part of a job and reports its error, if any.
+        :param job: Job, the job.
+        :param future: concurrent.futures.Future, the future of the worker thread part.
+        :return: None
+        """
+
+        try:
+            await asyncio.wrap_future(future)
+        except Exception as error:
+            if job.on_error is not None:
+                job.on_error(error)
+            elif self.error is None:
+                self.error = error
+
+    def raise_error(self) -> None:
+        """
+        Raises the error of a worker thread part of a job without an error callback.
+        :return: None
+        """
+
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def wait(self, name: str) -> None:
+        """
+        Waits for the worker thread part of a job to finish. Its error is still reported by the scheduler.
+        :param name: str, the name of the job.
+        :return: None
+        """
+
+        job = self.get_job(name)
+        if job is not None and job.future is not None:
+            concurrent.futures.wait([job.future])
+
+    async def stop(self) -> None:
+        """
+        Waits for the worker thread parts of the jobs to finish and shuts the thread pool down.
+        The jobs are kept, and run again with the next frames.
+        :return: None
+        :raises: the error of a worker thread part of a job without an error callback.
+        """
+
+        if self.tasks:
+            await asyncio.gather(*self.tasks)
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        self.raise_error()
@@ -0,0 +1,69 @@
+import threading
+
+from src.session.session import Session
+
+
+class Autosaver:
+    """
+    Class for a background saver of sessions.
+    The caller takes a snapshot of the session, and a worker thread compresses and writes it, so saving
+    a big board does not hold up the frame. zlib and file writes release the GIL while they work.
+    """
+
+    def __init__(self, path: str, interval: float, compression_level: int) -> None:
+        """
+        :param path: str, the path of the session file.
+        :param interval: float, the number of seconds between two autosaves, or 0 to turn autosaving off.
+        :param compression_level: int, the zlib compression level, from 0 to 9.
+        """
+
+        self.path = path
+        self.interval = interval
+        self.compression_level = compression_level
+
+        self.thread = None
+        self.error = None
+
+    def is_saving(self) -> bool:
+        """
+        Checks if a save is in progress.
+        :return: bool, True if the worker thread is still writing.
+        """
+
+        return self.thread is not None and self.thread.is_alive()
+
+    def save(self, session: Session) -> bool:
+        """
+        Starts writing a session in the background, unless a save is already in progress.
+        :param session: Session, the snapshot to write. It must not be changed while it is written.
+        :return: bool, True if the save started.
+        """
+
+        if self.is_saving():
+            return False
+
+        self.thread = threading.Thread(target=self.write, args=(session,), daemon=True)
+        self.thread.start()
+        return True
+
+    def write(self, session: Session) -> None:
+        """
+        Writes a session. Runs in the worker thread; errors are kept for the caller.
+        :param session: Session, the session to write.
+        :return: None
+        """
+
+        try:
+            session.save(self.path, self.compression_level)
+            self.error = None
+        except OSError as error:
+            self.error = error
+
+    def wait(self) -> None:
+        """
+        Waits for the save in progress to finish.
+        :return: None
+        """
+
+        if self.thread is not None:
+            self.thread.join()
@@ -0,0 +1,184 @@
+import base64
+import gzip
+import hashlib
+import json
+from array import array
+from typing import Optional
+
+import pygame
+
+from src.error import SessionError
+
+
+# The input of a frame: its time in milliseconds, the mouse position, whether the game was idle, and the events
+InputFrame = tuple[int, int, int, bool, list[pygame.event.Event]]
+
+
+class InputLog:
+    """
+    Class for a log of the input of the game, written while it runs.
+
+    The log is a gzip-compressed file of JSON lines: a header with the game's levels and its session when the log
+    started, one line per frame with the frame's time, the mouse position, whether the game was idle and the
+    events it handled, and a footer with a digest of the level when the log was closed. The game reads no other
+    input and its simulation uses no clock but the frame time, so replaying the frames reaches the same level.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str, levels: list[str], level_index: int, session: Optional[bytes]) -> None:
+        """
+        :param path: str, the path of the log file.
+        :param levels: list[str], the levels of the game.
+        :param level_index: int, the index of the level being played.
+        :param session: bytes, the serialized session of the game, or None if the level cannot be saved.
+        """
+
+        self.path = path
+        self.nr_frames = 0
+
+        self.file = gzip.open(path, 'wt', encoding='utf-8')
+        self.write_line({
+            'version': self.VERSION,
+            'levels': levels,
+            'level_index': level_index,
+            'session': None if session is None else base64.b64encode(session).decode('ascii'),
+        })
+
+    def write_line(self, line) -> None:
+        """
+        Writes a line of the log.
+        :param line: the JSON value of the line.
+        :return: None
+        """
+
+        self.file.write(json.dumps(line, separators=(',', ':')))
+        self.file.write('\n')
+
+    def append(self, frame_time: int, x_pos: int, y_pos: int, idle: bool, events: list[pygame.event.Event]) -> None:
+        """
+        Logs the input of a frame.
+        :param frame_time: int, the time of the frame in milliseconds.
+        :param x_pos: int, the x position of the mouse.
+        :param y_pos: int, the y position of the mouse.
+        :param idle: bool, whether the game was idle during the frame.
+        :param events: list[pygame.event.Event], the events handled in the frame.
+        :return: None
+        """
+
+        self.write_line([frame_time, x_pos, y_pos, int(idle), [encode_event(event) for event in events]])
+        self.nr_frames += 1
+
+    def close(self, level) -> None:
+        """
+        Writes the digest of the level and closes the log.
+        :param level: Level, the level being played.
+        :return: None
+        """
+
+        self.write_line({'generation': level.generation, 'digest': get_digest(level)})
+        self.file.close()
+
+
+class InputReplay:
+    """
+    Class for the replay of an input log, read frame by frame.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: str, the path of the log file.
+        :raises: SessionError if the file is not an input log.
+        """
+
+        self.path = path
+        lines = []
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as file:
+                for line in file:
+                    lines.append(json.loads(line))
+        except EOFError:
+            # The log of a game that crashed is cut short, its frames up to the cut are replayed
+            pass
+        except (OSError, ValueError) as error:
+            raise SessionError(f'Not an input log: {error}')
+
+        if not lines or not isinstance(lines[0], dict) or lines[0].get('version') != InputLog.VERSION:
+            raise SessionError('Not an input log, or of an unsupported version!')
+
+        header = lines[0]
+        self.levels: list[str] = header['levels']
+        self.level_index: int = header['level_index']
+        self.session: Optional[bytes] = None if header['session'] is None else base64.b64decode(header['session'])
+
+        # A log whose game did not quit cleanly has no footer
+        self.footer: Optional[dict] = lines[-1] if len(lines) > 1 and isinstance(lines[-1], dict) else None
+        self.frames = lines[1:-1] if self.footer is not None else lines[1:]
+        self.index = 0
+
+    def next_frame(self) -> Optional[InputFrame]:
+        """
+        Returns the input of the next frame.
+        :return: InputFrame, the input of the frame, or None after the last frame.
+        """
+
+        if self.index == len(self.frames):
+            return None
+
+        frame_time, x_pos, y_pos, idle, events = self.frames[self.index]
+        self.index += 1
+        return frame_time, x_pos, y_pos, bool(idle), [decode_event(event) for event in events]
+
+    def check(self, level) -> Optional[bool]:
+        """
+        Checks if the replay reached the same level as the logged run.
+        :param level: Level, the level being played at the end of the replay.
+        :return: bool, True if the level matches the footer of the log, or None if the log has no footer.
+        """
+
+        if self.footer is None:
+            return None
+        return self.footer == {'generation': level.generation, 'digest': get_digest(level)}
+
+
+# ------------------------------------------------------------------------------------------------- #
+
+def encode_event(event: pygame.event.Event) -> list:
+    """
+    Encodes an event as JSON. Only the attributes that are numbers, strings or sequences of numbers are kept;
+    the others, such as the window of the event, are not read by the game.
+    :param event: pygame.event.Event, the event.
+    :return: list, the type of the event and its attributes.
+    """
+
+    attributes = {}
+    for name, value in event.dict.items():
+        if isinstance(value, (bool, int, float, str)):
+            attributes[name] = value
+        elif isinstance(value, (tuple, list)) and all(isinstance(item, (int, float)) for item in value):
+            attributes[name] = list(value)
+    return [event.type, attributes]
+
+
+def decode_event(encoded: list) -> pygame.event.Event:
+    """
+    Decodes an event encoded by encode_event.
+    :param encoded: list, the type of the event and its attributes.
+    :return: pygame.event.Event, the event.
+    """
+
+    event_type, attributes = encoded
+    return pygame.event.Event(event_type, {name: tuple(value) if isinstance(value, list) else value
+                                           for name, value in attributes.items()})
+
+
+def get_digest(level) -> str:
+    """
+    Returns a digest of a level: its size and the alive cells of its current state.
+    :param level: Level, the level.
+    :return: str, the hexadecimal digest.
+    """
+
+    digest = hashlib.blake2b(f'{level.nr_rows}x{level.nr_cols}'.encode('ascii'), digest_size=16)
+    digest.update(array('q', sorted(level.get_alive_cells())).tobytes())
+    return digest.hexdigest()
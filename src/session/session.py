@@ -0,0 +1,230 @@
+import json
+import os
+import struct
+import zlib
+from typing import Optional
+
+from src.error import SessionError
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class Keyframe:
+    """
+    Class for a saved level state: the cells, the generation and the toggles.
+    """
+
+    def __init__(self, state: bytes, generation: int, toggles: list[int]) -> None:
+        """
+        :param state: bytes, the state of the level, one byte per cell.
+        :param generation: int, the generation of the state.
+        :param toggles: list[int], the indices of the toggled cells of a pricey level.
+        """
+
+        self.state = state
+        self.generation = generation
+        self.toggles = toggles
+
+
+class Session:
+    """
+    Class for a saved game session.
+    Holds the level being played, its current state, its edit history and, while the level is advancing,
+    the state it advanced from, which Advance goes back to.
+
+    A session file is a magic number followed by the zlib-compressed session: a JSON header and the states,
+    bit-packed 8 cells to a byte.
+    """
+
+    MAGIC = b'GOLS'
+    VERSION = 1
+
+    def __init__(self, level_index: int, level_file: str, nr_rows: int, nr_cols: int, current: Keyframe,
+                 history: list[list[int]], advanced_from: Optional[Keyframe]) -> None:
+        """
+        :param level_index: int, the index of the level in the game's list of levels.
+        :param level_file: str, the file name of the level.
+        :param nr_rows: int, the number of rows of the level.
+        :param nr_cols: int, the number of columns of the level.
+        :param current: Keyframe, the current state of the level.
+        :param history: list[list[int]], the edits that can be undone, the oldest first.
+        :param advanced_from: Keyframe, the state the level is advancing from, or None if it is not advancing.
+        """
+
+        self.level_index = level_index
+        self.level_file = level_file
+        self.nr_rows, self.nr_cols = nr_rows, nr_cols
+        self.current = current
+        self.history = history
+        self.advanced_from = advanced_from
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def to_bytes(self, compression_level: int) -> bytes:
+        """
+        Serializes the session.
+        :param compression_level: int, the zlib compression level, from 0 to 9.
+        :return: bytes, the serialized session.
+        """
+
+        keyframes = [self.current] if self.advanced_from is None else [self.current, self.advanced_from]
+        header = json.dumps({
+            'version': self.VERSION,
+            'level_index': self.level_index,
+            'level_file': self.level_file,
+            'nr_rows': self.nr_rows,
+            'nr_cols': self.nr_cols,
+            'history': self.history,
+            'keyframes': [{'generation': keyframe.generation, 'toggles': keyframe.toggles} for keyframe in keyframes],
+        }).encode('utf-8')
+
+        payload = b''.join([struct.pack('<I', len(header)), header,
+                            *(pack_state(keyframe.state) for keyframe in keyframes)])
+        return self.MAGIC + zlib.compress(payload, compression_level)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Session':
+        """
+        Deserializes a session.
+        :param data: bytes, the serialized session.
+        :return: Session, the session.
+        :raises: SessionError if the data is not a valid session.
+        """
+
+        if not data.startswith(cls.MAGIC):
+            raise SessionError('Not a session file!')
+        try:
+            payload = zlib.decompress(data[len(cls.MAGIC):])
+            header_length, = struct.unpack_from('<I', payload)
+            header = json.loads(payload[4:4 + header_length])
+        except (zlib.error, struct.error, ValueError) as error:
+            raise SessionError(f'Corrupted session file: {error}')
+        check_header(header, cls.VERSION)
+
+        nr_cells = header['nr_rows'] * header['nr_cols']
+        packed_size = (nr_cells + 7) // 8
+        offset = 4 + header_length
+        if len(payload) != offset + packed_size * len(header['keyframes']):
+            raise SessionError('Corrupted session file: wrong size.')
+
+        keyframes = []
+        for keyframe in header['keyframes']:
+            state = unpack_state(payload[offset:offset + packed_size], nr_cells)
+            keyframes.append(Keyframe(state, keyframe['generation'], keyframe['toggles']))
+            offset += packed_size
+
+        return cls(header['level_index'], header['level_file'], header['nr_rows'], header['nr_cols'],
+                   keyframes[0], header['history'], keyframes[1] if len(keyframes) > 1 else None)
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def save(self, path: str, compression_level: int) -> None:
+        """
+        Writes the session to a file atomically: to a temporary file first, which then replaces the file,
+        so a crash during the save never leaves a half-written session behind.
+        :param path: str, the path of the session file.
+        :param compression_level: int, the zlib compression level, from 0 to 9.
+        :return: None
+        """
+
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(self.to_bytes(compression_level))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'Session':
+        """
+        Reads a session from a file.
+        :param path: str, the path of the session file.
+        :return: Session, the session.
+        :raises: SessionError if the file is not a valid session.
+        """
+
+        with open(path, 'rb') as file:
+            return cls.from_bytes(file.read())
+
+
+def check_header(header, version: int) -> None:
+    """
+    Checks that the header of a session has all its fields, of the right types, and at least one keyframe.
+    :param header: the decoded JSON header.
+    :param version: int, the supported version of the session format.
+    :return: None
+    :raises: SessionError if the header is not the one of a valid session.
+    """
+
+    def is_int(value) -> bool:
+        return isinstance(value, int) and not isinstance(value, bool)
+
+    def is_cell_list(value) -> bool:
+        return isinstance(value, list) and all(is_int(cell_index) and 0 <= cell_index < nr_cells
+                                               for cell_index in value)
+
+    if not isinstance(header, dict):
+        raise SessionError('Corrupted session file: the header is not an object.')
+    if header.get('version') != version:
+        raise SessionError(f'Unsupported session version {header.get("version")}!')
+
+    fields = {'level_index': is_int, 'level_file': lambda value: isinstance(value, str),
+              'nr_rows': is_int, 'nr_cols': is_int, 'history': lambda value: isinstance(value, list),
+              'keyframes': lambda value: isinstance(value, list)}
+    for name, is_valid in fields.items():
+        if name not in header or not is_valid(header[name]):
+            raise SessionError(f'Corrupted session file: missing or invalid {name}.')
+    if header['level_index'] < 0 or header['nr_rows'] <= 0 or header['nr_cols'] <= 0:
+        raise SessionError('Corrupted session file: negative level index or empty board.')
+
+    nr_cells = header['nr_rows'] * header['nr_cols']
+    if not all(is_cell_list(entry) for entry in header['history']):
+        raise SessionError('Corrupted session file: invalid history.')
+    if not 1 <= len(header['keyframes']) <= 2:
+        raise SessionError('Corrupted session file: there must be one or two keyframes.')
+    for keyframe in header['keyframes']:
+        if (not isinstance(keyframe, dict) or not is_int(keyframe.get('generation'))
+                or keyframe['generation'] < 0 or not is_cell_list(keyframe.get('toggles'))):
+            raise SessionError('Corrupted session file: invalid keyframe.')
+
+
+def pack_state(state: bytes) -> bytes:
+    """
+    Packs a state of one byte per cell into 8 cells per byte, the first cell in the most significant bit.
+    :param state: bytes, the state, with cells of 0 or 1.
+    :return: bytes, the packed state, padded with 0s to a whole byte.
+    """
+
+    if np is not None:
+        return np.packbits(np.frombuffer(state, dtype=np.uint8)).tobytes()
+
+    if not state:
+        return b''
+    # Read the cells as the binary digits of one big integer
+    padding = -len(state) % 8
+    digits = state.translate(BYTE_TO_DIGIT) + b'0' * padding
+    return int(digits, 2).to_bytes((len(state) + padding) // 8, 'big')
+
+
+def unpack_state(packed: bytes, nr_cells: int) -> bytes:
+    """
+    Unpacks a state packed by pack_state.
+    :param packed: bytes, the packed state.
+    :param nr_cells: int, the number of cells of the state.
+    :return: bytes, the state, one byte per cell.
+    """
+
+    if np is not None:
+        return np.unpackbits(np.frombuffer(packed, dtype=np.uint8), count=nr_cells).tobytes()
+
+    if nr_cells == 0:
+        return b''
+    digits = format(int.from_bytes(packed, 'big'), 'b').zfill(len(packed) * 8)
+    return digits[:nr_cells].encode('ascii').translate(DIGIT_TO_BYTE)
+
+
+BYTE_TO_DIGIT = bytes.maketrans(b'\x00\x01', b'01')
+DIGIT_TO_BYTE = bytes.maketrans(b'01', b'\x00\x01')
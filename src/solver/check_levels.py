@@ -0,0 +1,70 @@
+"""
+Offline checker that every shipped pricey level can be solved.
+
+Usage (from the repository root):
+    python -m src.solver.check_levels
+    python -m src.solver.check_levels --max-generations 50 --workers 4 data/pricey_level_1.txt
+"""
+
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import argparse
+import sys
+
+import pygame
+
+from src.level.pricey_level import PriceyLevel
+from src.solver.pricey_solver import PriceySolver
+import src.constant.constant as const
+
+
+ROOT_DIR_PATH = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DATA_DIR_PATH = os.path.join(ROOT_DIR_PATH, 'data')
+LEVEL_ASSETS_DIR_PATH = os.path.join(ROOT_DIR_PATH, 'assets', 'level')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Checks that pricey levels can be solved.')
+    parser.add_argument('levels', nargs='*',
+                        help='the level files to check (default: every pricey level of the data directory)')
+    parser.add_argument('--max-generations', type=int, default=const.SOLVER_MAX_GENERATIONS,
+                        help='the maximum number of ticks to reach the desired state')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='the number of worker processes (default: one per core)')
+    parser.add_argument('--engine', default='python', help='the engine used to simulate the toggle sets')
+    args = parser.parse_args()
+
+    level_file_paths = args.levels or [os.path.join(DATA_DIR_PATH, file_name)
+                                       for file_name in sorted(os.listdir(DATA_DIR_PATH))
+                                       if file_name.startswith('pricey')]
+
+    pygame.init()
+    window = pygame.Surface((0, 0))
+
+    unsolvable = []
+    for level_file_path in level_file_paths:
+        level = PriceyLevel(0, 0, 0, 0, level_file_path, LEVEL_ASSETS_DIR_PATH, window)
+        solver = PriceySolver.from_level(level, args.max_generations, args.engine)
+        result = solver.solve(args.workers, stop_at_first=True)
+
+        name = os.path.basename(level_file_path)
+        if result.solutions:
+            toggles, generation = result.solutions[0]
+            cells = ', '.join(f'({toggle // level.nr_cols}, {toggle % level.nr_cols})' for toggle in toggles)
+            print(f'{name}: solvable, toggle [{cells}] and tick {generation} times.')
+        else:
+            unsolvable.append(name)
+            print(f'{name}: NOT solvable within {args.max_generations} generations.')
+
+        print(f'    {result.nr_candidates} candidates in {result.elapsed:.2f} s '
+              f'({result.candidates_per_second:.0f} candidates/s), {result.nr_simulated} simulated, '
+              f'{result.nr_pruned_light_cone} pruned by light cone, {result.nr_pruned_memo} cut short by memo')
+
+    pygame.quit()
+    if unsolvable:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
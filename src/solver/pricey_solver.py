@@ -0,0 +1,309 @@
+import hashlib
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from src.engine.boundary import DEAD, get_neighbors
+from src.engine.cell_buffer import CellBuffer
+from src.engine.registry import get_engine
+
+
+class SolverResult:
+    """
+    Class for the result of a solver search.
+    """
+
+    def __init__(self, solutions: list[tuple[tuple[int, ...], int]], nr_candidates: int, nr_simulated: int,
+                 nr_pruned_light_cone: int, nr_pruned_memo: int, elapsed: float) -> None:
+        """
+        :param solutions: list[tuple[tuple[int, ...], int]], the found toggle sets and the generation at which each
+                          reaches the desired state.
+        :param nr_candidates: int, the number of toggle sets considered.
+        :param nr_simulated: int, the number of toggle sets that were simulated.
+        :param nr_pruned_light_cone: int, the number of toggle sets skipped by the light cone check.
+        :param nr_pruned_memo: int, the number of simulations cut short by reaching an already explored state.
+        :param elapsed: float, the duration of the search in seconds.
+        """
+
+        self.solutions = solutions
+        self.nr_candidates = nr_candidates
+        self.nr_simulated = nr_simulated
+        self.nr_pruned_light_cone = nr_pruned_light_cone
+        self.nr_pruned_memo = nr_pruned_memo
+        self.elapsed = elapsed
+
+    @property
+    def candidates_per_second(self) -> float:
+        return self.nr_candidates / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class PriceySolver:
+    """
+    Class for the pricey level solver.
+    Searches the sets of at most max_toggles cells that, toggled in the initial state, make the level reach
+    its desired state within max_generations ticks.
+
+    Toggle sets are pruned with the light cone of the toggles: a toggle can only change the cells within a
+    distance of g of it after g generations, so every cell where the untouched level misses the goal at
+    generation g must be that close to one of the toggles. Simulations stop as soon as they reach a state
+    that an earlier simulation already reached no later and failed from. The search is spread over a
+    process pool, one task per first toggle.
+    """
+
+    def __init__(self, initial_state: CellBuffer, desired_state: list[int], nr_rows: int, nr_cols: int,
+                 max_toggles: int, max_generations: int, engine_name: str = 'python', boundary: str = DEAD) -> None:
+        """
+        :param initial_state: CellBuffer, the initial state of the level.
+        :param desired_state: list[int], the desired state of the level. Cells of -1 can have any state.
+        :param nr_rows: int, the number of rows of the level.
+        :param nr_cols: int, the number of columns of the level.
+        :param max_toggles: int, the maximum number of toggled cells.
+        :param max_generations: int, the maximum number of ticks to reach the desired state.
+        :param engine_name: str, the name of the engine used to simulate the toggle sets.
+        :param boundary: str, the boundary mode of the level.
+        """
+
+        self.initial_state = CellBuffer(initial_state)
+        self.desired_state = desired_state
+        self.nr_rows, self.nr_cols = nr_rows, nr_cols
+        self.max_toggles = max_toggles
+        self.max_generations = max_generations
+        self.engine_name = engine_name
+        self.boundary = boundary
+
+        # For every generation, the bitmask of the goal misses of the untouched level that each cell's light cone
+        # covers, and the bitmask of all the goal misses
+        self.light_cones: list[list[int]] = []
+        self.misses: list[int] = []
+        self.compute_light_cones()
+
+    @classmethod
+    def from_level(cls, level, max_generations: int, engine_name: str = 'python') -> 'PriceySolver':
+        """
+        Creates a solver for the given pricey level.
+        :param level: PriceyLevel, the level to solve.
+        :param max_generations: int, the maximum number of ticks to reach the desired state.
+        :param engine_name: str, the name of the engine used to simulate the toggle sets.
+        :return: PriceySolver, the solver.
+        """
+
+        return cls(level.initial_state, level.desired_state, level.nr_rows, level.nr_cols,
+                   level.max_toggles, max_generations, engine_name, level.boundary)
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def compute_light_cones(self) -> None:
+        """
+        Evolves the untouched level and computes, for every generation, which of its goal misses each cell can reach.
+        :return: None
+        """
+
+        engine = get_engine(self.engine_name)
+        nr_cells = self.nr_rows * self.nr_cols
+        distances = self.compute_distances()
+
+        state = self.initial_state
+        for generation in range(1, self.max_generations + 1):
+            state, _ = engine.step(state, self.nr_rows, self.nr_cols, self.boundary)
+            misses = [cell_index for cell_index in range(nr_cells)
+                      if self.desired_state[cell_index] != -1 and state[cell_index] != self.desired_state[cell_index]]
+
+            light_cones = []
+            for cell_index in range(nr_cells):
+                mask = 0
+                for bit, miss in enumerate(misses):
+                    if distances(cell_index, miss) <= generation:
+                        mask |= 1 << bit
+                light_cones.append(mask)
+
+            self.light_cones.append(light_cones)
+            self.misses.append((1 << len(misses)) - 1)
+
+    def compute_distances(self) -> callable:
+        """
+        Returns the number of generations a change takes to travel between two cells.
+        With a dead boundary, it is the Chebyshev distance. With the other boundaries the board wraps around,
+        so the distances are found with a breadth-first search from every cell.
+        :return: callable, the distance between two cell indices.
+        """
+
+        nr_rows, nr_cols = self.nr_rows, self.nr_cols
+        if self.boundary == DEAD:
+            def distance(cell_index: int, other_cell_index: int) -> int:
+                row, col = divmod(cell_index, nr_cols)
+                other_row, other_col = divmod(other_cell_index, nr_cols)
+                return max(abs(row - other_row), abs(col - other_col))
+            return distance
+
+        nr_cells = nr_rows * nr_cols
+        neighbors = [get_neighbors(cell_index, nr_rows, nr_cols, self.boundary) for cell_index in range(nr_cells)]
+        table = []
+        for cell_index in range(nr_cells):
+            cell_distances = [-1] * nr_cells
+            cell_distances[cell_index] = 0
+            frontier = [cell_index]
+            while frontier:
+                next_frontier = []
+                for frontier_cell in frontier:
+                    for neighbor in neighbors[frontier_cell]:
+                        if cell_distances[neighbor] == -1:
+                            cell_distances[neighbor] = cell_distances[frontier_cell] + 1
+                            next_frontier.append(neighbor)
+                frontier = next_frontier
+            table.append(cell_distances)
+        return lambda cell_index, other_cell_index: table[cell_index][other_cell_index]
+
+    def get_candidates(self, first_toggle: int) -> list[tuple[int, ...]]:
+        """
+        Returns the toggle sets whose smallest cell is the given one. The empty set belongs to the first cell.
+        :param first_toggle: int, the index of the smallest toggled cell.
+        :return: list[tuple[int, ...]], the toggle sets.
+        """
+
+        nr_cells = self.nr_rows * self.nr_cols
+        candidates = [()] if first_toggle == 0 else []
+        for nr_toggles in range(self.max_toggles):
+            for rest in itertools.combinations(range(first_toggle + 1, nr_cells), nr_toggles):
+                candidates.append((first_toggle, *rest))
+        return candidates
+
+    def solve(self, workers: int = None, stop_at_first: bool = False) -> SolverResult:
+        """
+        Searches the toggle sets that solve the level.
+        :param workers: int, the number of worker processes. None uses every core, 1 searches in this process.
+        :param stop_at_first: bool, whether to stop the search at the first solution.
+        :return: SolverResult, the solutions and the search statistics.
+        """
+
+        start = time.perf_counter()
+        first_toggles = range(self.nr_rows * self.nr_cols) if self.max_toggles > 0 else [0]
+        totals = [[], 0, 0, 0, 0]
+
+        def collect(result: tuple) -> None:
+            totals[0].extend(result[0])
+            for index in range(1, 5):
+                totals[index] += result[index]
+
+        if workers == 1:
+            init_worker(self)
+            for first_toggle in first_toggles:
+                collect(search(first_toggle, stop_at_first))
+                if stop_at_first and totals[0]:
+                    break
+
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(self,)) as executor:
+                pending = {executor.submit(search, first_toggle, stop_at_first) for first_toggle in first_toggles}
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future.result())
+                    if stop_at_first and totals[0]:
+                        for future in pending:
+                            future.cancel()
+                        break
+
+        solutions = sorted(totals[0], key=lambda solution: (len(solution[0]), solution[1], solution[0]))
+        return SolverResult(solutions, *totals[1:], time.perf_counter() - start)
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def in_light_cone(self, toggles: tuple[int, ...]) -> bool:
+        """
+        Checks if the toggles can reach every goal miss of the untouched level at some generation.
+        :param toggles: tuple[int, ...], the toggled cells.
+        :return: bool, False if the toggle set cannot solve the level.
+        """
+
+        for light_cones, misses in zip(self.light_cones, self.misses):
+            covered = 0
+            for toggle in toggles:
+                covered |= light_cones[toggle]
+            if covered == misses:
+                return True
+        return False
+
+    def matches(self, state: CellBuffer) -> bool:
+        """
+        Checks if the given state reaches the desired state.
+        :param state: CellBuffer, the state to check.
+        :return: bool, True if every cell with a desired state has that state.
+        """
+
+        return all(desired_cell_state == -1 or cell_state == desired_cell_state
+                   for cell_state, desired_cell_state in zip(state, self.desired_state))
+
+
+# The solver and the explored states of the current worker process
+worker_solver: PriceySolver = None
+worker_memo: dict[bytes, int] = {}
+
+
+def init_worker(solver: PriceySolver) -> None:
+    """
+    Sets up the solver of a worker process.
+    :param solver: PriceySolver, the solver.
+    :return: None
+    """
+
+    global worker_solver, worker_memo
+    worker_solver = solver
+    worker_memo = {}
+
+
+def search(first_toggle: int, stop_at_first: bool) -> tuple[list, int, int, int, int]:
+    """
+    Searches the toggle sets whose smallest cell is the given one.
+    Uses the solver and the memo of the worker process, so explored states are shared between its tasks.
+    :param first_toggle: int, the index of the smallest toggled cell.
+    :param stop_at_first: bool, whether to stop at the first solution.
+    :return: tuple, the solutions, the number of candidates, simulated candidates, candidates pruned by
+             the light cone check and simulations cut short by the memo.
+    """
+
+    solver, memo = worker_solver, worker_memo
+    engine = get_engine(solver.engine_name)
+
+    solutions = []
+    nr_simulated = nr_pruned_light_cone = nr_pruned_memo = 0
+    candidates = solver.get_candidates(first_toggle)
+    for toggles in candidates:
+        if not solver.in_light_cone(toggles):
+            nr_pruned_light_cone += 1
+            continue
+        nr_simulated += 1
+
+        state, next_state = solver.initial_state.copy(), CellBuffer(len(solver.initial_state))
+        for toggle in toggles:
+            state[toggle] = 1 - state[toggle]
+
+        trajectory = []
+        solved = False
+        for generation in range(1, solver.max_generations + 1):
+            engine.step_into(state, next_state, solver.nr_rows, solver.nr_cols, solver.boundary)
+            state, next_state = next_state, state
+
+            if solver.matches(state):
+                solutions.append((toggles, generation))
+                solved = True
+                break
+
+            key = hashlib.blake2b(state, digest_size=16).digest()
+            if memo.get(key, solver.max_generations + 1) <= generation:
+                nr_pruned_memo += 1
+                break
+
+            # The state repeats, so the following generations cannot match either
+            if key in trajectory:
+                break
+            trajectory.append(key)
+            memo[key] = generation
+
+        if solved:
+            # The explored states lead to a solution, so they must not prune other candidates
+            for key in trajectory:
+                del memo[key]
+            if stop_at_first:
+                break
+
+    return solutions, len(candidates), nr_simulated, nr_pruned_light_cone, nr_pruned_memo
@@ -0,0 +1,462 @@
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Iterator, Optional
+
+from src.analysis.census import Census
+from src.analysis.cycle_detector import CycleDetector
+from src.engine.auto_engine import AutoEngine
+from src.engine.batch_engine import BatchEngine
+from src.engine.boundary import DEAD
+from src.engine.cell_buffer import CellBuffer
+from src.engine.engine import Engine
+from src.engine.numpy_engine import NumpyEngine
+from src.engine.registry import get_engine
+from src.level.level_observer import LevelObserver
+import src.constant.constant as const
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class SoupRecord:
+    """
+    Class for the outcome of a soup: how long it lived and what it left.
+    """
+
+    def __init__(self, index: int, lifespan: Optional[int], period: Optional[int], population: int,
+                 census: dict[str, int]) -> None:
+        """
+        :param index: int, the index of the soup in the RNG streams of the seed.
+        :param lifespan: int, the generation from which the soup repeats, or None if it did not stabilize.
+        :param period: int, the period of the final state, 1 for a still life, or None if it did not stabilize.
+        :param population: int, the number of alive cells of the final state.
+        :param census: dict[str, int], the number of objects of every type of the final state.
+        """
+
+        self.index = index
+        self.lifespan = lifespan
+        self.period = period
+        self.population = population
+        self.census = census
+
+
+class SoupResult:
+    """
+    Class for the result of a soup search.
+    """
+
+    def __init__(self, nr_soups: int, nr_left: int, nr_skipped: int, nr_generations: int, nr_unstable: int,
+                 longest: Optional[SoupRecord], census: dict[str, int], nr_workers: int, elapsed: float) -> None:
+        """
+        :param nr_soups: int, the number of soups run.
+        :param nr_left: int, the number of soups left to run, 0 once the search is done.
+        :param nr_skipped: int, the number of soups skipped as already in the results file.
+        :param nr_generations: int, the number of generations run over all the soups.
+        :param nr_unstable: int, the number of soups that did not stabilize within the maximum number of generations.
+        :param longest: SoupRecord, the soup that lived the longest, or None if no soup stabilized.
+        :param census: dict[str, int], the number of objects of every type left by all the soups, most common first.
+        :param nr_workers: int, the number of worker processes.
+        :param elapsed: float, the duration of the search in seconds.
+        """
+
+        self.nr_soups = nr_soups
+        self.nr_left = nr_left
+        self.nr_skipped = nr_skipped
+        self.nr_generations = nr_generations
+        self.nr_unstable = nr_unstable
+        self.longest = longest
+        self.census = census
+        self.nr_workers = nr_workers
+        self.elapsed = elapsed
+
+    @property
+    def soups_per_second(self) -> float:
+        return self.nr_soups / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def soups_per_second_per_core(self) -> float:
+        return self.soups_per_second / self.nr_workers
+
+
+class SoupBoard:
+    """
+    Class for the board a soup runs on. Keeps the state like a level does, so the level observers,
+    such as the cycle detector, can follow it, but has nothing to draw.
+    """
+
+    in_memory = True
+
+    def __init__(self, nr_rows: int, nr_cols: int, boundary: str, engine: Engine) -> None:
+        """
+        :param nr_rows: int, the number of rows of the board.
+        :param nr_cols: int, the number of columns of the board.
+        :param boundary: str, the boundary mode of the board.
+        :param engine: Engine, the engine that steps the board.
+        """
+
+        self.nr_rows, self.nr_cols = nr_rows, nr_cols
+        self.boundary = boundary
+        self.engine = engine
+
+        self.current_state = CellBuffer(nr_rows * nr_cols)
+        self.next_state = CellBuffer(nr_rows * nr_cols)
+        self.generation = 0
+        self.observers: list[LevelObserver] = []
+
+    def restore(self, state: bytes, generation: int) -> None:
+        """
+        Replaces the current state.
+        :param state: bytes, the state, one byte per cell.
+        :param generation: int, the generation of the state.
+        :return: None
+        """
+
+        self.current_state[:] = state
+        self.generation = generation
+        for observer in self.observers:
+            observer.on_reset(self)
+
+    def tick(self) -> None:
+        """
+        Advances the board to the next state and notifies the observers.
+        :return: None
+        """
+
+        changed = self.engine.step_into(self.current_state, self.next_state, self.nr_rows, self.nr_cols,
+                                        self.boundary)
+        self.current_state, self.next_state = self.next_state, self.current_state
+        self.generation += 1
+        for observer in self.observers:
+            observer.on_tick(self, changed)
+
+    def add_observer(self, observer: LevelObserver) -> None:
+        """
+        Adds an observer to the board and lets it read the current state.
+        :param observer: LevelObserver, the observer to add.
+        :return: None
+        """
+
+        self.observers.append(observer)
+        observer.on_reset(self)
+
+    def get_alive_cells(self) -> Iterator[int]:
+        """
+        Yields the indices of the alive cells of the current state.
+        :return: Iterator[int], the indices of the alive cells.
+        """
+
+        current_state = self.current_state
+        cell_index = current_state.find(1)
+        while cell_index != -1:
+            yield cell_index
+            cell_index = current_state.find(1, cell_index + 1)
+
+
+class BatchBoard:
+    """
+    Class for one of the boards of a batch engine, seen like a level, so that a cycle detector can follow it.
+    """
+
+    in_memory = True
+
+    def __init__(self, batch: BatchEngine, board_index: int) -> None:
+        """
+        :param batch: BatchEngine, the batch engine holding the board.
+        :param board_index: int, the index of the board in the batch.
+        """
+
+        self.batch = batch
+        self.board_index = board_index
+
+    @property
+    def generation(self) -> int:
+        return self.batch.generation
+
+    @property
+    def current_state(self) -> CellBuffer:
+        return self.batch.get_state(self.board_index)
+
+    def get_alive_cells(self) -> Iterator[int]:
+        """
+        Yields the indices of the alive cells of the board.
+        :return: Iterator[int], the indices of the alive cells.
+        """
+
+        yield from np.flatnonzero(self.batch.boards[self.board_index]).tolist()
+
+
+class SoupSearch:
+    """
+    Class for a random soup search.
+    Runs random soups, squares of soup_size cells filled at the given density in the middle of a dead board,
+    until they stabilize, to find the long-lived ones (methuselahs) and the objects they leave behind.
+
+    Every soup is drawn from its own RNG stream, seeded by the seed of the search and the index of the soup,
+    so a soup is found again from those two numbers alone, whichever worker ran it. A soup stops once the cycle
+    detector sees its state repeat, and its lifespan is the generation from which it repeats. The final state
+    is counted by a census. The outcome of every soup is appended to a results file of JSON lines, which is only
+    written by the main process, and the soups already in it are skipped, so a search can be stopped and resumed.
+    The soups are spread over a process pool in batches of batch_size. With the NumPy or the automatic engine,
+    a batch is stepped as one block by a batch engine, and every soup leaves the block once its cycle detector
+    sees it repeat. With the other engines, the soups of a batch are stepped one by one.
+    """
+
+    def __init__(self, seed: int, soup_size: int, density: float, margin: int, max_generations: int,
+                 max_period: int, engine_name: str, batch_size: int) -> None:
+        """
+        :param seed: int, the seed of the search.
+        :param soup_size: int, the number of rows and columns of a soup.
+        :param density: float, the probability of a cell of a soup to be alive.
+        :param margin: int, the number of dead cells around a soup, the room the soup has to grow in.
+        :param max_generations: int, the number of generations after which a soup that did not stabilize stops.
+        :param max_period: int, the longest period of a final state that can be detected.
+        :param engine_name: str, the name of the engine that runs the soups.
+        :param batch_size: int, the number of soups of a task of the process pool.
+        """
+
+        self.seed = seed
+        self.soup_size = soup_size
+        self.density = density
+        self.margin = margin
+        self.max_generations = max_generations
+        self.max_period = max_period
+        self.engine_name = engine_name
+        self.batch_size = batch_size
+
+        self.nr_rows = self.nr_cols = soup_size + 2 * margin
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def make_soup(self, index: int) -> CellBuffer:
+        """
+        Draws a soup from its RNG stream and places it in the middle of an empty board.
+        :param index: int, the index of the soup.
+        :return: CellBuffer, the state of the board.
+        """
+
+        rng = random.Random(f'{self.seed}:{index}')
+        state = CellBuffer(self.nr_rows * self.nr_cols)
+        for row in range(self.margin, self.margin + self.soup_size):
+            first_cell = row * self.nr_cols + self.margin
+            state[first_cell:first_cell + self.soup_size] = bytes(int(rng.random() < self.density)
+                                                                  for _ in range(self.soup_size))
+        return state
+
+    def get_key(self) -> dict:
+        """
+        Returns the parameters that, with its index, make a soup and its outcome.
+        :return: dict, the parameters, as written in every line of the results file.
+        """
+
+        return {'seed': self.seed, 'size': self.soup_size, 'density': self.density, 'margin': self.margin,
+                'max_generations': self.max_generations}
+
+    def read_done(self, results_file_path: str) -> set[int]:
+        """
+        Reads the indices of the soups of this search that are already in a results file.
+        :param results_file_path: str, the path of the results file.
+        :return: set[int], the indices of the soups.
+        """
+
+        if not os.path.exists(results_file_path):
+            return set()
+
+        key = self.get_key()
+        done = set()
+        with open(results_file_path, 'r') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # The last line of a search that was killed while writing it
+                    continue
+                if all(record.get(name) == value for name, value in key.items()):
+                    done.add(record['soup'])
+        return done
+
+    # ------------------------------------------------------------------------------------------------- #
+
+    def run(self, nr_soups: int, results_file_path: str, workers: int = None,
+            report_interval: float = None) -> Iterator[SoupResult]:
+        """
+        Runs the soups 0 to nr_soups - 1 that are not in the results file yet, and appends their outcomes to it.
+        Yields the statistics of the soups run so far every report_interval seconds, and once more at the end.
+        :param nr_soups: int, the number of soups of the search.
+        :param results_file_path: str, the path of the results file.
+        :param workers: int, the number of worker processes. None uses every core, 1 runs the soups in this process.
+        :param report_interval: float, the number of seconds between two progress results, or None for the final
+                                result only.
+        :return: Iterator[SoupResult], the statistics of the soups run, the last one with no soups left.
+        """
+
+        start = time.perf_counter()
+        nr_workers = workers or os.cpu_count() or 1
+        done = self.read_done(results_file_path)
+        indices = [index for index in range(nr_soups) if index not in done]
+        nr_skipped = nr_soups - len(indices)
+        batches = [indices[offset:offset + self.batch_size] for offset in range(0, len(indices), self.batch_size)]
+
+        key = self.get_key()
+        totals = {'soups': 0, 'generations': 0, 'unstable': 0}
+        census: dict[str, int] = {}
+        longest: list[Optional[SoupRecord]] = [None]
+        last_report = start
+
+        def collect(records: list[SoupRecord], nr_generations: int, file) -> None:
+            for record in records:
+                file.write(json.dumps({**key, 'soup': record.index, 'lifespan': record.lifespan,
+                                       'period': record.period, 'population': record.population,
+                                       'census': record.census}, separators=(',', ':')))
+                file.write('\n')
+
+                if record.lifespan is None:
+                    totals['unstable'] += 1
+                elif longest[0] is None or record.lifespan > longest[0].lifespan:
+                    longest[0] = record
+                for name, count in record.census.items():
+                    census[name] = census.get(name, 0) + count
+            # A batch is written whole, so a search stopped in between resumes after the last batch
+            file.flush()
+            totals['soups'] += len(records)
+            totals['generations'] += nr_generations
+
+        def get_result() -> SoupResult:
+            return SoupResult(totals['soups'], len(indices) - totals['soups'], nr_skipped, totals['generations'],
+                              totals['unstable'], longest[0],
+                              dict(sorted(census.items(), key=lambda item: (-item[1], item[0]))),
+                              nr_workers, time.perf_counter() - start)
+
+        def is_report_due() -> bool:
+            nonlocal last_report
+            now = time.perf_counter()
+            if report_interval is None or now - last_report < report_interval or totals['soups'] == len(indices):
+                return False
+            last_report = now
+            return True
+
+        with open(results_file_path, 'a') as file:
+            if workers == 1:
+                init_worker(self)
+                for batch in batches:
+                    collect(*run_soups(batch), file)
+                    if is_report_due():
+                        yield get_result()
+
+            else:
+                with ProcessPoolExecutor(max_workers=nr_workers, initializer=init_worker, initargs=(self,)) as executor:
+                    # Only a few batches per worker are queued, so the results are written as they come
+                    batches.reverse()
+                    pending = set()
+                    while batches or pending:
+                        while batches and len(pending) < 2 * nr_workers:
+                            pending.add(executor.submit(run_soups, batches.pop()))
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            collect(*future.result(), file)
+                        if is_report_due():
+                            yield get_result()
+
+        yield get_result()
+
+
+# The search, board, cycle detector and census of the current worker process
+worker_search: SoupSearch = None
+worker_board: SoupBoard = None
+worker_detector: CycleDetector = None
+worker_census: Census = None
+worker_batched = False
+
+
+def init_worker(search: SoupSearch) -> None:
+    """
+    Sets up the board of a worker process, reused by all its soups, so that the census keeps its table of shapes.
+    :param search: SoupSearch, the search.
+    :return: None
+    """
+
+    global worker_search, worker_board, worker_detector, worker_census, worker_batched
+    worker_search = search
+    worker_batched = np is not None and search.engine_name in (NumpyEngine.name, AutoEngine.name)
+    worker_board = SoupBoard(search.nr_rows, search.nr_cols, DEAD, get_engine(search.engine_name))
+    worker_detector = CycleDetector(search.max_period)
+    worker_board.add_observer(worker_detector)
+    worker_census = Census(const.CENSUS_MAX_PERIOD, const.CENSUS_MAX_CELLS)
+
+
+def run_soups(indices: list[int]) -> tuple[list[SoupRecord], int]:
+    """
+    Runs a batch of soups until they stabilize or reach the maximum number of generations.
+    :param indices: list[int], the indices of the soups.
+    :return: tuple[list[SoupRecord], int], the outcome of every soup and the number of generations run.
+    """
+
+    if worker_batched:
+        return run_soups_batched(indices)
+
+    search, board, detector = worker_search, worker_board, worker_detector
+
+    records = []
+    nr_generations = 0
+    for index in indices:
+        board.restore(search.make_soup(index), 0)
+        while detector.period is None and board.generation < search.max_generations:
+            board.tick()
+        nr_generations += board.generation
+
+        census = worker_census.count(board.current_state, board.nr_rows, board.nr_cols)
+        records.append(SoupRecord(index, detector.cycle_start, detector.period,
+                                  board.current_state.count(1), census))
+    return records, nr_generations
+
+
+def run_soups_batched(indices: list[int]) -> tuple[list[SoupRecord], int]:
+    """
+    Runs a batch of soups as one block of a batch engine, until they stabilize or reach the maximum number
+    of generations. Every soup has its own cycle detector, fed with the cells that changed on its board.
+    :param indices: list[int], the indices of the soups.
+    :return: tuple[list[SoupRecord], int], the outcome of every soup and the number of generations run.
+    """
+
+    search = worker_search
+
+    batch = BatchEngine([search.make_soup(index) for index in indices], search.nr_rows, search.nr_cols,
+                        stop_on_death=False)
+    boards = [BatchBoard(batch, board_index) for board_index in range(len(indices))]
+    detectors = [CycleDetector(search.max_period) for _ in indices]
+    for board, detector in zip(boards, detectors):
+        detector.on_reset(board)
+
+    while batch.generation < search.max_generations:
+        running = np.flatnonzero(batch.active)
+        if not len(running):
+            break
+        previous = batch.boards[running]
+        batch.step()
+
+        # The changed cells of all the running boards at once, split by board
+        board_indices, cell_indices = np.nonzero((batch.boards[running] != previous).reshape(len(running), -1))
+        splits = np.searchsorted(board_indices, np.arange(1, len(running)))
+        repeated = []
+        for board_index, changed in zip(running.tolist(), np.split(cell_indices, splits)):
+            detector = detectors[board_index]
+            detector.on_tick(boards[board_index], changed.tolist())
+            if detector.period is not None:
+                repeated.append(board_index)
+        batch.stop(np.array(repeated, dtype=np.int64), batch.REPEATED)
+
+    records = []
+    nr_generations = 0
+    for board_index, index in enumerate(indices):
+        exit_generation = int(batch.exit_generations[board_index])
+        nr_generations += exit_generation if exit_generation != -1 else batch.generation
+
+        state = batch.get_state(board_index)
+        census = worker_census.count(state, search.nr_rows, search.nr_cols)
+        detector = detectors[board_index]
+        records.append(SoupRecord(index, detector.cycle_start, detector.period, state.count(1), census))
+    return records, nr_generations
@@ -1,10 +1,14 @@
+from typing import Optional
+
 import pygame
 
 from src.game import Game
 import src.constant.constant as const
 
 
-def start(data_dir_path: str, assets_dir_path: str) -> None:
+def start(data_dir_path: str, assets_dir_path: str, input_log_path: Optional[str] = None) -> None:
     pygame.init()
     game = Game(const.WIDTH, const.HEIGHT, const.TITLE, const.FPS, data_dir_path, assets_dir_path, const.LEVELS)
+    if input_log_path is not None:
+        game.start_input_log(input_log_path)
     game.run()
@@ -0,0 +1,61 @@
+import pygame
+
+
+class Container:
+    """
+    Class for a container.
+    A node of the widget tree: holds widgets, like buttons or other containers, inside a rectangle.
+    Children are drawn in the order they were added, so later children are on top.
+    """
+
+    def __init__(self, x: int, y: int, width: int, height: int) -> None:
+        """
+        :param x: int, the x position of the container.
+        :param y: int, the y position of the container.
+        :param width: int, the width of the container.
+        :param height: int, the height of the container.
+        """
+
+        self.rect = pygame.Rect(x, y, width, height)
+        self.children = []
+
+    def add(self, child):
+        """
+        Adds a widget or a container at the end of the container.
+        :param child: the widget or container to add.
+        :return: the added child.
+        """
+
+        self.children.append(child)
+        return child
+
+    def clear(self) -> None:
+        """
+        Removes every child of the container.
+        :return: None
+        """
+
+        self.children = []
+
+    def get_widgets(self) -> list:
+        """
+        Returns the widgets of the subtree, depth first, in drawing order.
+        :return: list, the widgets of the subtree.
+        """
+
+        widgets = []
+        for child in self.children:
+            if isinstance(child, Container):
+                widgets.extend(child.get_widgets())
+            else:
+                widgets.append(child)
+        return widgets
+
+    def draw(self) -> None:
+        """
+        Draws the children of the container.
+        :return: None
+        """
+
+        for child in self.children:
+            child.draw()
@@ -0,0 +1,70 @@
+from src.ui.container import Container
+from src.ui.hit_test_index import HitTestIndex
+
+
+class EventRouter:
+    """
+    Class for an event router.
+    Dispatches the mouse to the widgets of a widget tree through a hit-test index.
+    Widgets are told when the mouse enters or leaves them only when the hovered widget changes.
+    """
+
+    def __init__(self, root: Container, bucket_size: int) -> None:
+        """
+        :param root: Container, the root of the widget tree.
+        :param bucket_size: int, the bucket size of the hit-test index in pixels.
+        """
+
+        self.root = root
+        self.bucket_size = bucket_size
+        self.index = None
+        self.hovered = None
+
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """
+        Indexes the widgets of the tree again. Must be called after the layout changes.
+        :return: None
+        """
+
+        self.index = HitTestIndex(self.bucket_size)
+        for widget in self.root.get_widgets():
+            self.index.insert(widget)
+
+        if self.hovered is not None and self.hovered not in self.root.get_widgets():
+            self.hovered = None
+
+    def hover(self, x_pos: int, y_pos: int) -> bool:
+        """
+        Moves the mouse to the given position.
+        :param x_pos: int, the x position of the mouse.
+        :param y_pos: int, the y position of the mouse.
+        :return: bool, True if the hovered widget changed.
+        """
+
+        widget = self.index.query(x_pos, y_pos)
+        if widget is self.hovered:
+            return False
+
+        if self.hovered is not None:
+            self.hovered.on_leave()
+        if widget is not None:
+            widget.on_enter()
+        self.hovered = widget
+        return True
+
+    def click(self, x_pos: int, y_pos: int) -> bool:
+        """
+        Clicks the widget at the given position.
+        :param x_pos: int, the x position of the mouse.
+        :param y_pos: int, the y position of the mouse.
+        :return: bool, True if a widget was clicked.
+        """
+
+        widget = self.index.query(x_pos, y_pos)
+        if widget is None:
+            return False
+
+        widget.click()
+        return True
@@ -0,0 +1,43 @@
+class HitTestIndex:
+    """
+    Class for a hit-test index.
+    Buckets widgets by the cells of a uniform grid that their rectangles overlap,
+    so finding the widget under a point only checks the widgets of one bucket.
+    """
+
+    def __init__(self, bucket_size: int) -> None:
+        """
+        :param bucket_size: int, the width and height of a grid cell in pixels.
+        """
+
+        self.bucket_size = bucket_size
+        self.buckets: dict[tuple[int, int], list] = {}
+
+    def insert(self, widget) -> None:
+        """
+        Adds a widget to every bucket its rectangle overlaps. Widgets inserted later are on top.
+        :param widget: the widget, with a rect attribute.
+        :return: None
+        """
+
+        rect = widget.rect
+        if rect.width <= 0 or rect.height <= 0:
+            return
+
+        for bucket_x in range(rect.left // self.bucket_size, (rect.right - 1) // self.bucket_size + 1):
+            for bucket_y in range(rect.top // self.bucket_size, (rect.bottom - 1) // self.bucket_size + 1):
+                self.buckets.setdefault((bucket_x, bucket_y), []).append(widget)
+
+    def query(self, x_pos: int, y_pos: int):
+        """
+        Returns the topmost widget under the given point.
+        :param x_pos: int, the x position of the point.
+        :param y_pos: int, the y position of the point.
+        :return: the widget under the point, or None if there is none.
+        """
+
+        bucket = self.buckets.get((x_pos // self.bucket_size, y_pos // self.bucket_size), ())
+        for widget in reversed(bucket):
+            if widget.rect.collidepoint(x_pos, y_pos):
+                return widget
+        return None
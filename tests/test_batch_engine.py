@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from src.engine.batch_engine import BatchEngine
+from src.engine.boundary import BOUNDARIES
+from src.engine.cell_buffer import CellBuffer
+from src.engine.python_engine import PythonEngine
+from src.solver.soup_search import SoupSearch, init_worker, run_soups
+
+pytest.importorskip('numpy')
+
+
+def random_state(rng: random.Random, nr_cells: int) -> CellBuffer:
+    return CellBuffer(bytes(int(rng.random() < 0.4) for _ in range(nr_cells)))
+
+
+@pytest.mark.parametrize('boundary', BOUNDARIES)
+def test_matches_python_engine(boundary: str) -> None:
+    rng = random.Random(1)
+    nr_rows, nr_cols = 9, 13
+    states = [random_state(rng, nr_rows * nr_cols) for _ in range(5)]
+    batch = BatchEngine(states, nr_rows, nr_cols, stop_on_death=False, boundary=boundary)
+
+    engine = PythonEngine()
+    for _ in range(20):
+        batch.step()
+        states = [engine.step(state, nr_rows, nr_cols, boundary)[0] for state in states]
+        assert batch.get_states() == states
+
+
+def test_stops_dead_and_matching_boards() -> None:
+    blinker = CellBuffer(bytes([0, 0, 0, 1, 1, 1, 0, 0, 0]))
+    vertical = CellBuffer(bytes([0, 1, 0, 0, 1, 0, 0, 1, 0]))
+    lonely = CellBuffer(bytes([0, 0, 0, 0, 1, 0, 0, 0, 0]))
+    batch = BatchEngine([blinker, lonely], 3, 3, target=vertical)
+
+    batch.run(10)
+
+    assert batch.exit_reasons.tolist() == [BatchEngine.MATCHED, BatchEngine.DIED]
+    assert batch.exit_generations.tolist() == [1, 1]
+    assert not batch.active.any()
+
+
+@pytest.mark.parametrize('max_generations', [40, 5000])
+def test_batched_soups_match_python_engine(max_generations: int) -> None:
+    indices = list(range(6))
+    search = SoupSearch(7, 8, 0.5, 8, max_generations, 30, PythonEngine.name, len(indices))
+    init_worker(search)
+    expected, expected_generations = run_soups(indices)
+
+    search.engine_name = 'numpy'
+    init_worker(search)
+    records, nr_generations = run_soups(indices)
+
+    assert nr_generations == expected_generations
+    assert [record.__dict__ for record in records] == [record.__dict__ for record in expected]
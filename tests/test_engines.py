@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from src.engine.auto_engine import AutoEngine
+from src.engine.boundary import BOUNDARIES
+from src.engine.cell_buffer import CellBuffer
+from src.engine.jit_engine import JitEngine
+from src.engine.numpy_engine import NumpyEngine
+from src.engine.python_engine import PythonEngine
+
+SHAPES = [(1, 1), (1, 5), (2, 2), (17, 9)]
+
+
+def make_engine(name: str, tmp_path):
+    if name == AutoEngine.name:
+        return AutoEngine(str(tmp_path / 'calibration.json'))
+    engine_class = {NumpyEngine.name: NumpyEngine, JitEngine.name: JitEngine}[name]
+    if not engine_class.is_available():
+        pytest.skip(f'the {name} engine is not available')
+    return engine_class()
+
+
+@pytest.mark.parametrize('name', [NumpyEngine.name, JitEngine.name, AutoEngine.name])
+@pytest.mark.parametrize('boundary', BOUNDARIES)
+@pytest.mark.parametrize('nr_rows, nr_cols', SHAPES)
+def test_matches_python_engine(name: str, boundary: str, nr_rows: int, nr_cols: int, tmp_path) -> None:
+    engine = make_engine(name, tmp_path)
+    reference = PythonEngine()
+
+    rng = random.Random(f'{nr_rows}x{nr_cols}')
+    for _ in range(3):
+        state = CellBuffer(bytes(int(rng.random() < 0.5) for _ in range(nr_rows * nr_cols)))
+        expected = CellBuffer(state)
+        for _ in range(12):
+            state, changed = engine.step(state, nr_rows, nr_cols, boundary)
+            expected, expected_changed = reference.step(expected, nr_rows, nr_cols, boundary)
+            assert state == expected
+            assert sorted(changed) == sorted(expected_changed)
+
+
+@pytest.mark.parametrize('boundary', BOUNDARIES)
+def test_step_into_overwrites_next_state(boundary: str) -> None:
+    state = CellBuffer(bytes([0, 1, 0, 0, 1, 0, 0, 1, 0]))
+    next_state = CellBuffer(b'\x01' * 9)
+
+    expected, _ = PythonEngine().step(state, 3, 3, boundary)
+    PythonEngine().step_into(state, next_state, 3, 3, boundary)
+
+    assert next_state == expected
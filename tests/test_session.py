@@ -0,0 +1,102 @@
+import json
+import struct
+import zlib
+
+import pytest
+
+from src.error import SessionError
+from src.session.session import Keyframe, Session, pack_state
+
+
+def make_session(advancing: bool) -> Session:
+    current = Keyframe(bytes([1, 0, 1, 1, 0, 0, 1, 0, 1, 1, 1, 0]), 7, [2, 3])
+    advanced_from = Keyframe(bytes([0, 1, 0, 0, 1, 1, 0, 1, 0, 0, 0, 1]), 0, [3]) if advancing else None
+    return Session(1, 'pricey_level_1.txt', 3, 4, current, [[2], [3, 5]], advanced_from)
+
+
+def make_data(header: dict, states: list[bytes]) -> bytes:
+    encoded = json.dumps(header).encode('utf-8')
+    payload = b''.join([struct.pack('<I', len(encoded)), encoded, *(pack_state(state) for state in states)])
+    return Session.MAGIC + zlib.compress(payload)
+
+
+def make_header(**fields) -> dict:
+    header = {'version': Session.VERSION, 'level_index': 0, 'level_file': 'sandbox.txt', 'nr_rows': 2, 'nr_cols': 3,
+              'history': [], 'keyframes': [{'generation': 0, 'toggles': []}]}
+    header.update(fields)
+    return header
+
+
+@pytest.mark.parametrize('advancing', [False, True])
+def test_round_trip(advancing: bool) -> None:
+    session = make_session(advancing)
+
+    loaded = Session.from_bytes(session.to_bytes(6))
+
+    assert (loaded.level_index, loaded.level_file, loaded.nr_rows, loaded.nr_cols, loaded.history) == \
+           (session.level_index, session.level_file, session.nr_rows, session.nr_cols, session.history)
+    keyframes = [(session.current, loaded.current)]
+    if advancing:
+        keyframes.append((session.advanced_from, loaded.advanced_from))
+    else:
+        assert loaded.advanced_from is None
+    for keyframe, loaded_keyframe in keyframes:
+        assert bytes(loaded_keyframe.state) == keyframe.state
+        assert loaded_keyframe.generation == keyframe.generation
+        assert loaded_keyframe.toggles == keyframe.toggles
+
+
+def test_save_and_load(tmp_path) -> None:
+    path = str(tmp_path / 'session.gol')
+    make_session(True).save(path, 1)
+
+    assert Session.load(path).current.generation == 7
+
+
+@pytest.mark.parametrize('data', [
+    b'',
+    b'NOPE' + zlib.compress(b'{}'),
+    Session.MAGIC + b'not zlib',
+    Session.MAGIC + zlib.compress(b'\x01'),
+    Session.MAGIC + zlib.compress(struct.pack('<I', 5) + b'{"ver'),
+    make_session(False).to_bytes(6)[:-1],
+])
+def test_rejects_corrupted_data(data: bytes) -> None:
+    with pytest.raises(SessionError):
+        Session.from_bytes(data)
+
+
+@pytest.mark.parametrize('fields', [
+    {'version': Session.VERSION + 1},
+    {'level_index': -1},
+    {'level_index': '0'},
+    {'level_file': None},
+    {'nr_rows': 0},
+    {'nr_cols': True},
+    {'history': {}},
+    {'history': [[6]]},
+    {'history': [['1']]},
+    {'keyframes': []},
+    {'keyframes': [{'generation': 0}]},
+    {'keyframes': [{'generation': -1, 'toggles': []}]},
+    {'keyframes': [{'generation': 0, 'toggles': [6]}]},
+    {'keyframes': [{'generation': 0, 'toggles': []}] * 3},
+])
+def test_rejects_malformed_header(fields: dict) -> None:
+    header = make_header(**fields)
+    nr_keyframes = len(header['keyframes']) if isinstance(header['keyframes'], list) else 1
+    data = make_data(header, [bytes(6)] * nr_keyframes)
+
+    with pytest.raises(SessionError):
+        Session.from_bytes(data)
+
+
+def test_rejects_header_that_is_not_an_object() -> None:
+    with pytest.raises(SessionError):
+        Session.from_bytes(make_data([], [bytes(6)]))
+
+
+def test_accepts_valid_header() -> None:
+    session = Session.from_bytes(make_data(make_header(), [bytes([1, 0, 0, 0, 0, 1])]))
+
+    assert bytes(session.current.state) == bytes([1, 0, 0, 0, 0, 1])
@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from src.engine.cell_buffer import CellBuffer
+from src.engine.python_engine import PythonEngine
+from src.level.tile_store import TileStore
+from src.level.tiled_grid import TiledGrid
+
+
+@pytest.fixture
+def grid(tmp_path):
+    # Tiles cut short at the bottom and right edges, and a cache too small to hold a row of tiles
+    store = TileStore(21, 18, 4, 2, str(tmp_path))
+    yield TiledGrid(store)
+    store.close()
+
+
+def test_step_matches_python_engine(grid: TiledGrid) -> None:
+    nr_rows, nr_cols = grid.nr_rows, grid.nr_cols
+    rng = random.Random(3)
+    state = CellBuffer(nr_rows * nr_cols)
+    for row in range(4, 15):
+        for col in range(3, 13):
+            if rng.random() < 0.4:
+                state[row * nr_cols + col] = grid[row * nr_cols + col] = 1
+
+    engine = PythonEngine()
+    for _ in range(30):
+        changed = grid.step(engine)
+        state, expected_changed = engine.step(state, nr_rows, nr_cols)
+        assert sorted(changed) == sorted(expected_changed)
+        assert sorted(grid.get_alive_cells()) == [cell_index for cell_index, cell in enumerate(state) if cell]
+
+
+def test_reads_and_writes_cells(grid: TiledGrid) -> None:
+    last_cell = len(grid) - 1
+    grid[last_cell] = 1
+    grid[0] = 1
+    grid[0] = 0
+
+    assert grid[last_cell] == 1
+    assert grid[0] == 0
+    assert list(grid.get_alive_cells()) == [last_cell]
+
+    grid.clear()
+    assert list(grid.get_alive_cells()) == []